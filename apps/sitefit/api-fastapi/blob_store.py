@@ -0,0 +1,81 @@
+"""Object storage reads for offloaded results (Azure Blob, or local filesystem stand-in)"""
+import logging
+import zlib
+from typing import Iterator
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Bytes per chunk when streaming stored objects
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class BlobUnavailable(Exception):
+    """A stored object could not be opened"""
+
+
+class BlobStore:
+    """Read-side object store used by the API
+
+    Objects are addressed by the URL the worker recorded in `artifact.url`:
+    https://<account>.blob.core.windows.net/... or file://... for local runs.
+    """
+
+    def __init__(self):
+        self._credential = None
+
+    def _get_credential(self):
+        if self._credential is None:
+            from azure.identity import DefaultAzureCredential
+            self._credential = DefaultAzureCredential()
+        return self._credential
+
+    def open_stream(self, url: str) -> Iterator[bytes]:
+        """Open an object and return its stored bytes in chunks, without buffering it whole
+
+        The object is opened before this returns, so a missing or
+        unreadable object raises BlobUnavailable here rather than midway
+        through a response whose headers were already sent.
+        """
+        parsed = urlparse(url)
+
+        if parsed.scheme == "file":
+            try:
+                f = open(unquote(parsed.path), "rb")
+            except OSError as e:
+                raise BlobUnavailable(str(e)) from e
+            return _file_chunks(f)
+
+        from azure.core.exceptions import AzureError
+        from azure.storage.blob import BlobClient
+
+        try:
+            blob = BlobClient.from_blob_url(url, credential=self._get_credential())
+            return blob.download_blob().chunks()
+        except AzureError as e:
+            raise BlobUnavailable(str(e)) from e
+
+
+def _file_chunks(f) -> Iterator[bytes]:
+    with f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def gunzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Incrementally decompress a gzip byte stream"""
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+# Global blob store instance
+blob_store = BlobStore()
@@ -0,0 +1,91 @@
+"""Geometry-aware canonical form of job inputs (feeds the idempotency hash only)
+
+Equivalent SiteFit geometry - a different starting vertex, reversed winding,
+a missing/extra closing point, or float noise below the tolerance - maps to
+the same canonical form, so it hashes alike and reuses cached results.
+The payload sent to the AppServer is never rewritten.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from config import CANONICAL_TOLERANCE
+
+Ring = List[List[int]]
+
+
+def _quantize(value: float, tolerance: float) -> int:
+    """Coordinate as an integer number of tolerance units"""
+    return int(round(value / tolerance))
+
+
+def _signed_area2(ring: Ring) -> int:
+    """Twice the signed area (shoelace); positive for counter-clockwise"""
+    area = 0
+    for i in range(len(ring)):
+        x1, y1 = ring[i]
+        x2, y2 = ring[(i + 1) % len(ring)]
+        area += x1 * y2 - x2 * y1
+    return area
+
+
+def canonicalize_ring(coordinates: List[List[float]], tolerance: float = CANONICAL_TOLERANCE) -> Optional[Ring]:
+    """Normalize a polygon ring: quantize, open, dedupe, CCW, start at min vertex
+
+    Returns None if the coordinates are not a list of [x, y] pairs, so
+    unexpected shapes are hashed verbatim rather than guessed at.
+    """
+    try:
+        ring = [[_quantize(float(x), tolerance), _quantize(float(y), tolerance)] for x, y in coordinates]
+    except (TypeError, ValueError):
+        return None
+
+    # Drop consecutive duplicates (including ones created by quantization) and the closing point
+    deduped: Ring = []
+    for point in ring:
+        if not deduped or point != deduped[-1]:
+            deduped.append(point)
+    while len(deduped) > 1 and deduped[0] == deduped[-1]:
+        deduped.pop()
+
+    if len(deduped) < 3:
+        return deduped
+
+    if _signed_area2(deduped) < 0:
+        deduped.reverse()
+
+    start = min(range(len(deduped)), key=lambda i: deduped[i])
+    return deduped[start:] + deduped[:start]
+
+
+def normalize_scalars(value: Any) -> Any:
+    """Integral floats as ints so 20 and 20.0 serialize identically"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: normalize_scalars(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize_scalars(v) for v in value]
+    return value
+
+
+def canonicalize_sitefit(inputs: Dict[str, Any], tolerance: float = CANONICAL_TOLERANCE) -> Dict[str, Any]:
+    """Canonical form of SiteFit inputs (parcel/house rings; other fields as-is)"""
+    canonical = normalize_scalars(inputs)
+    for key in ("parcel", "house"):
+        shape = canonical.get(key)
+        if isinstance(shape, dict) and "coordinates" in shape:
+            ring = canonicalize_ring(inputs[key]["coordinates"], tolerance)
+            if ring is not None:
+                canonical[key] = {**shape, "coordinates": ring, "quantum": tolerance}
+    return canonical
+
+
+# Per-definition canonicalizers; definitions without one hash their inputs verbatim
+CANONICALIZERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "sitefit": canonicalize_sitefit,
+}
+
+
+def canonicalize_inputs(definition: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of inputs for hashing"""
+    canonicalizer = CANONICALIZERS.get(definition)
+    return canonicalizer(inputs) if canonicalizer else inputs
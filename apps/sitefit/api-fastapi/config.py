@@ -7,6 +7,8 @@ DATABASE_URL = os.getenv("DATABASE_URL", "")
 # Service Bus
 SERVICEBUS_CONN = os.getenv("SERVICEBUS_CONNECTION_STRING", os.getenv("SERVICEBUS_CONN", ""))
 SERVICEBUS_QUEUE = os.getenv("QUEUE_NAME", os.getenv("SERVICEBUS_QUEUE", "sitefit-queue"))
+# Larger message bodies drop the inline payload; the worker reads job.payload_json instead
+QUEUE_INLINE_MAX_BYTES = int(os.getenv("QUEUE_INLINE_MAX_BYTES", "65536"))
 
 # AppServer (for fallback/testing)
 APP_SERVER_URL = os.getenv("APPSERVER_URL", os.getenv("APP_SERVER_URL", "http://kuduso-dev-appserver:8080/gh/{definition}:{version}/solve"))
@@ -17,3 +19,33 @@ BLOB_SAS_SIGNING_KEY = os.getenv("BLOB_SAS_SIGNING", "")
 
 # General
 RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "300"))
+
+# Contracts (manifest.json / inputs.schema.json lookup); the image copies them to /app/contracts
+CONTRACTS_DIR = os.getenv("CONTRACTS_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "..", "contracts"))
+
+# Default job deadline (seconds from submission) when a manifest has no timeout_sec
+JOB_DEADLINE_SEC = int(os.getenv("JOB_DEADLINE_SEC", "240"))
+
+# Geometry-aware canonical hashing (ring normalization + quantization, in CRS units)
+CANONICAL_HASH = os.getenv("CANONICAL_HASH", "true").lower() == "true"
+CANONICAL_TOLERANCE = float(os.getenv("CANONICAL_TOLERANCE", "1e-6"))
+
+# Translation-invariant result reuse (shape_result table + in-process LRU)
+SHAPE_CACHE = os.getenv("SHAPE_CACHE", "true").lower() == "true"
+SHAPE_CACHE_SIZE = int(os.getenv("SHAPE_CACHE_SIZE", "1024"))
+
+# Preview solves (POST /jobs/run with "preview": true): ceiling on the manifest's budget_ms
+PREVIEW_MAX_BUDGET_MS = int(os.getenv("PREVIEW_MAX_BUDGET_MS", "500"))
+
+# Dashboards: max ids per POST /jobs/status:bulk and max page size for GET /jobs
+BULK_STATUS_MAX_IDS = int(os.getenv("BULK_STATUS_MAX_IDS", "500"))
+JOB_LIST_MAX_LIMIT = int(os.getenv("JOB_LIST_MAX_LIMIT", "200"))
+
+# Tracing (OpenTelemetry): none | console | file | otlp
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "/tmp/kuduso-traces.jsonl")
+
+# Logging: root level, per-event level overrides and sample rates ("event=value,...")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_EVENT_LEVELS = os.getenv("LOG_EVENT_LEVELS", "")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
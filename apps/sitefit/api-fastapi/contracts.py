@@ -0,0 +1,217 @@
+"""Contract lookup (manifest.json, inputs.schema.json) for submit-time decisions"""
+import copy
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from jsonschema.validators import validator_for
+
+from config import CONTRACTS_DIR, JOB_DEADLINE_SEC
+from logs import EventLogger
+
+# Cap on errors reported back to the client for one payload
+MAX_REPORTED_ERRORS = 20
+
+# definition/version are path components under CONTRACTS_DIR
+CONTRACT_NAME = re.compile(r"^[A-Za-z0-9._-]+$")
+
+log = EventLogger(__name__)
+
+
+def check_contracts_dir() -> bool:
+    """Log an error at startup when CONTRACTS_DIR is missing (deadlines, input validation, previews and sweeps depend on it)"""
+    if os.path.isdir(CONTRACTS_DIR):
+        return True
+    log.error("contracts.missing", contracts_dir=os.path.abspath(CONTRACTS_DIR))
+    return False
+
+
+def is_contract_name(name: str) -> bool:
+    """Whether `name` is safe as a definition/version directory (no separators, not '.' or '..')"""
+    return bool(isinstance(name, str) and CONTRACT_NAME.match(name) and name.strip("."))
+
+
+def contract_path(definition: str, version: str, filename: str) -> str:
+    """Path of a contract file; raises ValueError for names that could leave CONTRACTS_DIR"""
+    if not (is_contract_name(definition) and is_contract_name(version)):
+        raise ValueError(f"Invalid contract name: {definition!r}@{version!r}")
+    return os.path.join(CONTRACTS_DIR, definition, version, filename)
+
+
+@lru_cache(maxsize=64)
+def load_manifest(definition: str, version: str) -> Dict[str, Any]:
+    """Load manifest.json for a definition/version (cached per process)"""
+    try:
+        manifest_path = contract_path(definition, version, "manifest.json")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        # Without it the manifest-driven behaviour silently reverts to defaults
+        log.error(
+            "manifest.unavailable",
+            definition=definition,
+            version=version,
+            error=str(e)
+        )
+        return {}
+
+
+def get_timeout_sec(definition: str, version: str) -> int:
+    """Get manifest timeout_sec, falling back to JOB_DEADLINE_SEC"""
+    manifest = load_manifest(definition, version)
+    try:
+        return int(manifest.get("timeout_sec", JOB_DEADLINE_SEC))
+    except (TypeError, ValueError):
+        return JOB_DEADLINE_SEC
+
+
+def get_preview_config(definition: str, version: str) -> Optional[Dict[str, Any]]:
+    """Manifest `preview` section when the definition supports in-process previews, else None"""
+    preview = load_manifest(definition, version).get("preview")
+    if isinstance(preview, dict) and preview.get("supported"):
+        return preview
+    return None
+
+
+def get_sweep_config(definition: str, version: str) -> Optional[Dict[str, Any]]:
+    """Manifest `sweep` section when the definition supports sweep jobs, else None"""
+    sweep = load_manifest(definition, version).get("sweep")
+    if isinstance(sweep, dict) and sweep.get("supported"):
+        return sweep
+    return None
+
+
+def get_sweep_timeout_sec(definition: str, version: str, variants: int) -> int:
+    """Timeout of a sweep job: timeout_sec per variant, capped by sweep.timeout_sec"""
+    timeout_sec = get_timeout_sec(definition, version) * max(variants, 1)
+    sweep = get_sweep_config(definition, version) or {}
+    try:
+        return min(timeout_sec, int(sweep.get("timeout_sec", timeout_sec)))
+    except (TypeError, ValueError):
+        return timeout_sec
+
+
+def get_internal_inputs(definition: str, version: str) -> List[str]:
+    """Manifest `internal_inputs.names`: inputs only the worker or API may set"""
+    internal = load_manifest(definition, version).get("internal_inputs")
+    names = internal.get("names") if isinstance(internal, dict) else None
+    return [name for name in names or [] if isinstance(name, str)]
+
+
+class InputValidationError(Exception):
+    """Inputs do not match the contract inputs.schema.json"""
+
+    def __init__(self, definition: str, version: str, errors: List[Dict[str, Any]]):
+        self.definition = definition
+        self.version = version
+        self.errors = errors
+        super().__init__(f"Inputs failed validation for {definition}@{version}")
+
+
+@lru_cache(maxsize=64)
+def get_inputs_validator(definition: str, version: str):
+    """Compile the inputs.schema.json validator once per definition/version
+
+    Returns None when the contract schema is not available to this service
+    (unknown definition/version, or a deployment without contracts).
+    """
+    try:
+        schema_path = contract_path(definition, version, "inputs.schema.json")
+        with open(schema_path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+    except (OSError, ValueError) as e:
+        log.error(
+            "schema.unavailable",
+            definition=definition,
+            version=version,
+            error=str(e)
+        )
+        return None
+
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def materialize_defaults(schema: Dict[str, Any], instance: Any) -> Any:
+    """Return a copy of `instance` with schema `default`s filled in for absent properties"""
+    if isinstance(instance, dict):
+        result = dict(instance)
+        for name, prop_schema in (schema.get("properties") or {}).items():
+            if not isinstance(prop_schema, dict):
+                continue
+            if name in result:
+                result[name] = materialize_defaults(prop_schema, result[name])
+            elif "default" in prop_schema:
+                result[name] = copy.deepcopy(prop_schema["default"])
+        return result
+
+    if isinstance(instance, list) and isinstance(schema.get("items"), dict):
+        return [materialize_defaults(schema["items"], item) for item in instance]
+
+    return instance
+
+
+def reject_internal_inputs(
+    definition: str,
+    version: str,
+    inputs: Dict[str, Any],
+    allow: Tuple[str, ...] = ()
+) -> None:
+    """Raise InputValidationError if `inputs` sets an internal input not in `allow`"""
+    internal = [
+        name for name in get_internal_inputs(definition, version)
+        if name in inputs and name not in allow
+    ]
+    if internal:
+        raise InputValidationError(definition, version, [
+            {
+                "path": f"/{name}",
+                "message": f"'{name}' is set by the service and can't be submitted",
+                "validator": "internal"
+            }
+            for name in internal
+        ])
+
+
+def prepare_inputs(
+    definition: str,
+    version: str,
+    inputs: Dict[str, Any],
+    allow_internal: Tuple[str, ...] = ()
+) -> Dict[str, Any]:
+    """Materialize schema defaults and validate inputs against the contract
+
+    Raises InputValidationError with per-path errors on failure, when
+    there is no schema to validate against, and when the inputs set an
+    internal input (manifest `internal_inputs`) other than `allow_internal`.
+    """
+    reject_internal_inputs(definition, version, inputs, allow=allow_internal)
+
+    validator = get_inputs_validator(definition, version)
+    if validator is None:
+        raise InputValidationError(definition, version, [{
+            "path": "/",
+            "message": f"No inputs schema for {definition}@{version}",
+            "validator": "contract"
+        }])
+
+    materialized = materialize_defaults(validator.schema, inputs)
+
+    errors = sorted(
+        validator.iter_errors(materialized),
+        key=lambda e: "/".join(str(p) for p in e.absolute_path)
+    )
+    if errors:
+        raise InputValidationError(definition, version, [
+            {
+                "path": "/" + "/".join(str(p) for p in e.absolute_path),
+                "message": e.message,
+                "validator": e.validator
+            }
+            for e in errors[:MAX_REPORTED_ERRORS]
+        ])
+
+    return materialized
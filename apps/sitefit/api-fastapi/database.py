@@ -2,15 +2,19 @@
 import psycopg2
 import psycopg2.extras
 import psycopg2.extensions
+from psycopg2 import sql
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 import uuid
 import logging
 
 from config import DATABASE_URL
+from metrics import track_db
+from logs import EventLogger
 
 logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
 
 # Register UUID adapter for psycopg2
 psycopg2.extras.register_uuid()
@@ -26,6 +30,7 @@ class Database:
         """Get database connection"""
         return psycopg2.connect(self.conn_string)
     
+    @track_db
     def insert_job(
         self,
         job_id: str,
@@ -34,9 +39,15 @@ class Database:
         definition: str,
         version: str,
         inputs_hash: str,
-        payload_json: Dict[str, Any]
+        payload_json: Dict[str, Any],
+        correlation_id: Optional[str] = None,
+        preview_json: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Insert a new job into the database"""
+        """Insert a new job and its job_status projection row
+
+        A preview is stored as the job's first job_progress snapshot, so the
+        status endpoint shows it until the worker publishes its own.
+        """
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
@@ -59,14 +70,89 @@ class Database:
                         0,
                         100
                     ))
+                    cur.execute("""
+                        INSERT INTO job_status (job_id, job_created_at, status, correlation_id)
+                        SELECT id, created_at, status, %s
+                        FROM job
+                        WHERE id = %s
+                    """, (correlation_id, uuid.UUID(job_id)))
+                    if preview_json is not None:
+                        cur.execute("""
+                            INSERT INTO job_progress (job_id, job_created_at, progress, evaluated, partial_json)
+                            SELECT id, created_at, 0, 0, %s
+                            FROM job
+                            WHERE id = %s
+                        """, (json.dumps(preview_json), uuid.UUID(job_id)))
                 conn.commit()
                 
-            logger.info(f"Job {job_id} inserted into database")
+            log.debug("db.job_inserted", job_id=job_id, preview=preview_json is not None)
             
         except Exception as e:
             logger.error(f"Failed to insert job {job_id}: {e}")
             raise
     
+    @track_db
+    def insert_sweep(
+        self,
+        job_id: str,
+        tenant_id: Optional[str],
+        app_id: str,
+        definition: str,
+        version: str,
+        inputs_hash: str,
+        payload_json: Dict[str, Any],
+        variant_jobs: List[Tuple[str, str, Dict[str, Any]]],
+        correlation_id: Optional[str] = None
+    ) -> None:
+        """Insert a sweep job and its variant jobs ((job_id, inputs_hash, payload)) in one transaction
+
+        Variant jobs reference the sweep through parent_job_id and are never
+        enqueued themselves; each carries its own inputs hash, so a later
+        identical /jobs/run submission is answered from its result.
+        """
+        jobs = [(job_id, inputs_hash, payload_json, None)] + [
+            (variant_id, variant_hash, variant_payload, uuid.UUID(job_id))
+            for variant_id, variant_hash, variant_payload in variant_jobs
+        ]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    for row_id, row_hash, row_payload, parent_id in jobs:
+                        cur.execute("""
+                            INSERT INTO job (
+                                id, tenant_id, app_id, definition, version,
+                                status, inputs_hash, payload_json, attempts, priority, parent_job_id
+                            ) VALUES (
+                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                            )
+                        """, (
+                            uuid.UUID(row_id),
+                            uuid.UUID(tenant_id) if tenant_id else None,
+                            app_id,
+                            definition,
+                            version,
+                            'queued',
+                            row_hash,
+                            json.dumps(row_payload),
+                            0,
+                            100,
+                            parent_id
+                        ))
+                    cur.execute("""
+                        INSERT INTO job_status (job_id, job_created_at, status, correlation_id)
+                        SELECT id, created_at, status, %s
+                        FROM job
+                        WHERE id = ANY(%s)
+                    """, (correlation_id, [uuid.UUID(row[0]) for row in jobs]))
+                conn.commit()
+                
+            log.debug("db.sweep_inserted", job_id=job_id, variants=len(variant_jobs))
+            
+        except Exception as e:
+            logger.error(f"Failed to insert sweep {job_id}: {e}")
+            raise
+    
+    @track_db
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job by ID"""
         try:
@@ -91,7 +177,7 @@ class Database:
                             r.outputs_json,
                             r.score
                         FROM job j
-                        LEFT JOIN result r ON r.job_id = j.id
+                        LEFT JOIN result r ON r.job_id = j.id AND r.job_created_at = j.created_at
                         WHERE j.id = %s
                     """, (uuid.UUID(job_id),))
                     
@@ -104,22 +190,22 @@ class Database:
             logger.error(f"Failed to get job {job_id}: {e}")
             raise
     
+    @track_db
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get job status"""
+        """Get job status from the job_status projection (index-only on its primary key)"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                     cur.execute("""
                         SELECT 
-                            id::text as job_id,
+                            job_id::text as job_id,
                             status,
                             attempts,
-                            last_error,
-                            created_at,
-                            started_at,
-                            ended_at
-                        FROM job
-                        WHERE id = %s
+                            has_result,
+                            correlation_id,
+                            job_created_at as created_at
+                        FROM job_status
+                        WHERE job_id = %s
                     """, (uuid.UUID(job_id),))
                     
                     row = cur.fetchone()
@@ -131,8 +217,150 @@ class Database:
             logger.error(f"Failed to get job status {job_id}: {e}")
             raise
     
+    @track_db
+    def get_job_statuses(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get status rows for many jobs in one query (unknown ids are omitted)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("""
+                        SELECT 
+                            job_id::text as job_id,
+                            status,
+                            attempts,
+                            has_result,
+                            correlation_id,
+                            job_created_at as created_at
+                        FROM job_status
+                        WHERE job_id = ANY(%s)
+                    """, ([uuid.UUID(job_id) for job_id in job_ids],))
+                    
+                    return [dict(row) for row in cur.fetchall()]
+                    
+        except Exception as e:
+            logger.error(f"Failed to get statuses for {len(job_ids)} jobs: {e}")
+            raise
+    
+    @track_db
+    def get_job_progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest partial-result snapshot the worker published for a job"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("""
+                        SELECT progress, evaluated, partial_json, updated_at
+                        FROM job_progress
+                        WHERE job_id = %s
+                    """, (uuid.UUID(job_id),))
+                    
+                    row = cur.fetchone()
+                    if row:
+                        return dict(row)
+                    return None
+                    
+        except Exception as e:
+            logger.error(f"Failed to get job progress {job_id}: {e}")
+            raise
+    
+    @track_db
+    def cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; returns its status row, or None if not cancellable
+
+        Workers stop a running job at its next checkpoint and never move a
+        cancelled job to another status. Cancelling a sweep job also cancels
+        its unfinished variant jobs.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("""
+                        WITH j AS (
+                            UPDATE job
+                            SET status = 'cancelled',
+                                ended_at = now(),
+                                lease_owner = NULL,
+                                lease_expires_at = NULL
+                            WHERE (id = %s OR parent_job_id = %s)
+                            AND status IN ('queued', 'running')
+                            RETURNING id, status, ended_at
+                        )
+                        UPDATE job_status s
+                        SET status = j.status,
+                            ended_at = j.ended_at,
+                            updated_at = now()
+                        FROM j
+                        WHERE s.job_id = j.id
+                        RETURNING
+                            s.job_id::text as job_id,
+                            s.status,
+                            s.attempts,
+                            s.has_result,
+                            s.correlation_id,
+                            s.job_created_at as created_at
+                    """, (uuid.UUID(job_id), uuid.UUID(job_id)))
+                    rows = [dict(row) for row in cur.fetchall()]
+                conn.commit()
+            # Rows for a sweep's variant jobs come back too; answer with the requested job
+            return next((row for row in rows if row['job_id'] == str(uuid.UUID(job_id))), None)
+            
+        except Exception as e:
+            logger.error(f"Failed to cancel job {job_id}: {e}")
+            raise
+    
+    @track_db
+    def list_jobs(
+        self,
+        filters: Dict[str, Optional[str]],
+        after: Optional[Tuple[datetime, str]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        List jobs newest first, filtered on app_id/definition/version/status
+        
+        Keyset pagination: `after` is the (created_at, id) of the last row of
+        the previous page, matching the (..., created_at DESC, id DESC) order
+        of job_app_def_ver_idx / job_status_idx.
+        """
+        conditions = []
+        params: List[Any] = []
+        for column in ("app_id", "definition", "version", "status"):
+            if filters.get(column) is not None:
+                conditions.append(sql.SQL("j.{} = %s").format(sql.Identifier(column)))
+                params.append(filters[column])
+        if after:
+            conditions.append(sql.SQL("(j.created_at, j.id) < (%s, %s)"))
+            params.extend([after[0], uuid.UUID(after[1])])
+        
+        where = sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("true")
+        params.append(limit)
+        
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute(sql.SQL("""
+                        SELECT 
+                            j.id::text as job_id,
+                            j.status,
+                            j.attempts,
+                            COALESCE(s.has_result, false) as has_result,
+                            s.correlation_id,
+                            j.created_at
+                        FROM job j
+                        LEFT JOIN job_status s ON s.job_id = j.id
+                        WHERE {}
+                        ORDER BY j.created_at DESC, j.id DESC
+                        LIMIT %s
+                    """).format(where), params)
+                    
+                    return [dict(row) for row in cur.fetchall()]
+                    
+        except Exception as e:
+            logger.error(f"Failed to list jobs: {e}")
+            raise
+    
+    @track_db
     def get_job_result(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get job result"""
+        """Get job result metadata (not the body): result id, stored size, offload pointer"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
@@ -140,11 +368,14 @@ class Database:
                         SELECT 
                             j.id::text as job_id,
                             j.status,
-                            r.outputs_json,
+                            r.id::text as result_id,
+                            r.job_created_at,
+                            pg_column_size(r.outputs_json) as stored_size,
+                            r.outputs_json -> '_offload' as offload,
                             r.score,
                             r.created_at as result_created_at
                         FROM job j
-                        LEFT JOIN result r ON r.job_id = j.id
+                        LEFT JOIN result r ON r.job_id = j.id AND r.job_created_at = j.created_at
                         WHERE j.id = %s
                     """, (uuid.UUID(job_id),))
                     
@@ -157,6 +388,32 @@ class Database:
             logger.error(f"Failed to get job result {job_id}: {e}")
             raise
     
+    @track_db
+    def get_result_body(self, result_id: str, job_created_at: datetime) -> Optional[bytes]:
+        """Get the serialized result JSON as bytes, without parsing it in Python
+
+        Looked up by primary key (id, job_created_at) from get_job_result, so
+        only the job's monthly partition is read.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT outputs_json::text
+                        FROM result
+                        WHERE id = %s AND job_created_at = %s
+                    """, (uuid.UUID(result_id), job_created_at))
+                    
+                    row = cur.fetchone()
+                    if row:
+                        return row[0].encode("utf-8")
+                    return None
+                    
+        except Exception as e:
+            logger.error(f"Failed to get result body {result_id}: {e}")
+            raise
+    
+    @track_db
     def check_duplicate_by_hash(self, inputs_hash: str) -> Optional[Dict[str, Any]]:
         """Check if a job with this inputs_hash already exists"""
         try:
@@ -183,6 +440,93 @@ class Database:
             logger.error(f"Failed to check duplicate hash {inputs_hash}: {e}")
             raise
 
+    
+    @track_db
+    def get_shape_result(self, shape_key: str) -> Optional[Dict[str, Any]]:
+        """Get a stored local-frame result by shape key"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("""
+                        SELECT 
+                            outputs_json,
+                            score,
+                            offset_x,
+                            offset_y
+                        FROM shape_result
+                        WHERE shape_key = %s
+                    """, (shape_key,))
+                    
+                    row = cur.fetchone()
+                    if row:
+                        return dict(row)
+                    return None
+                    
+        except Exception as e:
+            logger.error(f"Failed to get shape result {shape_key}: {e}")
+            raise
+    
+    @track_db
+    def insert_cached_job(
+        self,
+        job_id: str,
+        tenant_id: Optional[str],
+        app_id: str,
+        definition: str,
+        version: str,
+        inputs_hash: str,
+        payload_json: Dict[str, Any],
+        outputs_json: Dict[str, Any],
+        score: Optional[float] = None,
+        correlation_id: Optional[str] = None
+    ) -> None:
+        """Insert an already-succeeded job, its result and status row in one transaction"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        INSERT INTO job (
+                            id, tenant_id, app_id, definition, version,
+                            status, inputs_hash, payload_json, attempts, priority,
+                            started_at, ended_at
+                        ) VALUES (
+                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, now(), now()
+                        )
+                    """, (
+                        uuid.UUID(job_id),
+                        uuid.UUID(tenant_id) if tenant_id else None,
+                        app_id,
+                        definition,
+                        version,
+                        'succeeded',
+                        inputs_hash,
+                        json.dumps(payload_json),
+                        0,
+                        100
+                    ))
+                    cur.execute("""
+                        INSERT INTO result (job_id, job_created_at, outputs_json, score)
+                        SELECT id, created_at, %s, %s
+                        FROM job
+                        WHERE id = %s
+                    """, (json.dumps(outputs_json), score, uuid.UUID(job_id)))
+                    cur.execute("""
+                        INSERT INTO job_status (
+                            job_id, job_created_at, status, has_result,
+                            correlation_id, started_at, ended_at
+                        )
+                        SELECT id, created_at, status, true, %s, started_at, ended_at
+                        FROM job
+                        WHERE id = %s
+                    """, (correlation_id, uuid.UUID(job_id)))
+                conn.commit()
+                
+            log.debug("db.job_inserted", job_id=job_id, cached=True)
+            
+        except Exception as e:
+            logger.error(f"Failed to insert cached job {job_id}: {e}")
+            raise
+
 
 # Global database instance
 db = Database()
@@ -1,13 +1,16 @@
 """Service Bus queue producer"""
 import json
-import logging
 from datetime import datetime
 from azure.servicebus import ServiceBusClient, ServiceBusMessage
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from opentelemetry.trace import SpanKind
 
-from config import SERVICEBUS_CONN, SERVICEBUS_QUEUE
+from config import SERVICEBUS_CONN, SERVICEBUS_QUEUE, QUEUE_INLINE_MAX_BYTES
+from tracing import inject_context, tracer
+from message_codec import pack_coordinates, PAYLOAD_REF_JOB
+from logs import EventLogger
 
-logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
 
 
 class QueueProducer:
@@ -27,9 +30,17 @@ class QueueProducer:
         inputs_hash: str,
         payload: Dict[str, Any],
         correlation_id: str,
-        priority: int = 100
+        priority: int = 100,
+        deadline: Optional[datetime] = None,
+        shape_frame: Optional[Dict[str, Any]] = None,
+        variant_job_ids: Optional[List[str]] = None
     ) -> None:
-        """Enqueue a job message to Service Bus"""
+        """Enqueue a job message to Service Bus
+
+        `payload` must already be stored in job.payload_json: it is sent inline
+        (coordinate rings packed) only while the message fits QUEUE_INLINE_MAX_BYTES.
+        Sweep jobs pass the jobs that receive each variant's results.
+        """
         
         message_body = {
             "job_id": job_id,
@@ -39,41 +50,63 @@ class QueueProducer:
             "version": version,
             "inputs_hash": inputs_hash,
             "requested_at": datetime.utcnow().isoformat(),
-            "payload": payload,
-            "priority": priority
+            "payload": pack_coordinates(payload),
+            "priority": priority,
+            "deadline": deadline.isoformat() if deadline else None,
+            "shape_frame": shape_frame,
+            "variant_job_ids": variant_job_ids
+        }
+        
+        encoded = json.dumps(message_body, separators=(",", ":"))
+        claim_check = len(encoded) > QUEUE_INLINE_MAX_BYTES
+        if claim_check:
+            del message_body["payload"]
+            message_body["payload_ref"] = PAYLOAD_REF_JOB
+            encoded = json.dumps(message_body, separators=(",", ":"))
+        
+        application_properties = {
+            "x-correlation-id": correlation_id,
+            "job_id": job_id,
+            "app_id": app_id,
+            "definition": definition,
+            "version": version
         }
+        if deadline:
+            application_properties["x-deadline"] = deadline.isoformat()
         
         try:
-            with ServiceBusClient.from_connection_string(self.conn_string) as client:
+            with tracer.start_as_current_span(
+                f"{self.queue_name} send",
+                kind=SpanKind.PRODUCER,
+                attributes={"messaging.system": "servicebus", "messaging.destination.name": self.queue_name, "job.id": job_id}
+            ), ServiceBusClient.from_connection_string(self.conn_string) as client:
+                # The worker continues this trace from the message properties
+                inject_context(application_properties)
                 with client.get_queue_sender(self.queue_name) as sender:
                     # Create message with application properties
                     message = ServiceBusMessage(
-                        body=json.dumps(message_body),
-                        application_properties={
-                            "x-correlation-id": correlation_id,
-                            "job_id": job_id,
-                            "app_id": app_id,
-                            "definition": definition,
-                            "version": version
-                        }
+                        body=encoded,
+                        application_properties=application_properties
                     )
                     
                     sender.send_messages(message)
                     
-            logger.info(json.dumps({
-                "event": "queue.enqueued",
-                "job_id": job_id,
-                "correlation_id": correlation_id,
-                "queue": self.queue_name
-            }))
+            log.info(
+                "queue.enqueued",
+                job_id=job_id,
+                correlation_id=correlation_id,
+                queue=self.queue_name,
+                message_bytes=len(encoded),
+                claim_check=claim_check
+            )
             
         except Exception as e:
-            logger.error(json.dumps({
-                "event": "queue.enqueue_failed",
-                "job_id": job_id,
-                "correlation_id": correlation_id,
-                "error": str(e)
-            }))
+            log.error(
+                "queue.enqueue_failed",
+                job_id=job_id,
+                correlation_id=correlation_id,
+                error=str(e)
+            )
             raise
 
 
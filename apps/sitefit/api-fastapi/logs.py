@@ -0,0 +1,164 @@
+"""Structured JSON logging
+
+Every record is written as one JSON object per line. Event logs carry their
+fields as top-level keys:
+
+    log = EventLogger(__name__)
+    log.info("job.claim", job_id=job_id, deadline=deadline)
+
+- Formatting and I/O run on a QueueListener thread; callers only enqueue
+- LOG_LEVEL sets the root level; LOG_EVENT_LEVELS overrides it per event
+  ("worker.poll=DEBUG,job.claim=WARNING")
+- LOG_SAMPLE_RATES keeps a fraction of high-frequency events
+  ("job.slots_acquired=0.1"); sampled lines carry "sample_rate"
+- Field values may be zero-argument callables, evaluated only when the
+  event is actually emitted
+"""
+import atexit
+import json
+import logging
+import math
+import queue
+import random
+from datetime import date, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Tuple
+
+from opentelemetry import trace
+
+from config import LOG_LEVEL, LOG_EVENT_LEVELS, LOG_SAMPLE_RATES
+
+
+def _parse_pairs(spec: str) -> Dict[str, str]:
+    """"a=1,b=2" -> {"a": "1", "b": "2"} (blank and malformed entries are ignored)"""
+    pairs = {}
+    for item in spec.split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+EVENT_LEVELS = {
+    event: logging.getLevelName(level.upper())
+    for event, level in _parse_pairs(LOG_EVENT_LEVELS).items()
+    if isinstance(logging.getLevelName(level.upper()), int)
+}
+
+
+def _parse_rates(spec: str) -> Tuple[Dict[str, float], List[str]]:
+    """LOG_SAMPLE_RATES -> ({event: rate clamped to 0..1}, entries whose rate isn't a number)"""
+    rates, invalid = {}, []
+    for event, rate in _parse_pairs(spec).items():
+        try:
+            value = float(rate)
+        except ValueError:
+            value = math.nan
+        if math.isnan(value):
+            invalid.append(f"{event}={rate}")
+        else:
+            rates[event] = min(max(value, 0.0), 1.0)
+    return rates, invalid
+
+
+SAMPLE_RATES, INVALID_SAMPLE_RATES = _parse_rates(LOG_SAMPLE_RATES)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, then event fields or msg"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name
+        }
+        fields = getattr(record, "fields", None)
+        if fields is not None:
+            entry["event"] = record.msg
+            entry.update(fields)
+        else:
+            entry["msg"] = record.getMessage()
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=_json_default, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records without formatting them on the calling thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames; render them before the record changes threads
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Route all logging through a background queue to a JSON stdout handler"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [_DeferredQueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+
+    listener.start()
+    atexit.register(listener.stop)
+
+    if INVALID_SAMPLE_RATES:
+        # Parsed at import, before there was a handler to report them to
+        EventLogger(__name__).warning("logs.sample_rates_ignored", entries=INVALID_SAMPLE_RATES)
+
+
+class EventLogger:
+    """Emit named events with structured fields, honouring per-event levels and sampling"""
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(name)
+
+    def log(self, level: int, event: str, **fields: Any) -> None:
+        level = EVENT_LEVELS.get(event, level)
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = SAMPLE_RATES.get(event)
+        if rate is not None:
+            if random.random() >= rate:
+                return
+            fields["sample_rate"] = rate
+
+        for key, value in fields.items():
+            if callable(value):
+                fields[key] = value()
+        span_context = trace.get_current_span().get_span_context()
+        if span_context.is_valid:
+            fields["trace_id"] = format(span_context.trace_id, "032x")
+
+        self.logger.log(level, event, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self.log(logging.ERROR, event, **fields)
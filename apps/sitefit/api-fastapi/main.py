@@ -5,26 +5,77 @@ Handles job submission, status, and result retrieval
 Stage 3: Service Bus producer with Supabase database persistence
 """
 
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from typing import Optional, Tuple
+import base64
 import hashlib
+import importlib.util
 import json
 import uuid
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 
-from models import RunEnvelope, JobStatusResponse, HealthResponse
+from opentelemetry.trace import SpanKind
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from models import (
+    RunEnvelope,
+    JobStatusResponse,
+    HealthResponse,
+    BulkStatusRequest,
+    BulkStatusResponse,
+    JobListResponse,
+    SweepEnvelope,
+    SweepResponse
+)
 from database import db
 from job_queue import queue_producer
-from config import DATABASE_URL, SERVICEBUS_CONN, SERVICEBUS_QUEUE
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s", "logger": "%(name)s"}'
+from metrics import SUBMIT_SECONDS, CACHE_HITS_TOTAL, PREVIEW_SECONDS
+from tracing import init_tracing, extract_context, tracer
+from logs import EventLogger, setup_logging
+from contracts import (
+    get_timeout_sec,
+    get_preview_config,
+    get_sweep_config,
+    get_sweep_timeout_sec,
+    check_contracts_dir,
+    prepare_inputs,
+    reject_internal_inputs,
+    InputValidationError
+)
+from preview import solve_preview
+from canonical import canonicalize_inputs
+from shape_cache import compute_shape_frame, reproject_outputs, shape_cache
+from blob_store import BlobUnavailable
+from result_http import (
+    supported_encodings,
+    negotiate_encoding,
+    choose_inline_encoding,
+    make_etag,
+    etag_matches,
+    not_modified,
+    inline_result_response,
+    offloaded_result_response
+)
+from config import (
+    DATABASE_URL,
+    SERVICEBUS_CONN,
+    SERVICEBUS_QUEUE,
+    CANONICAL_HASH,
+    SHAPE_CACHE,
+    JOB_LIST_MAX_LIMIT,
+    PREVIEW_MAX_BUDGET_MS
 )
+
+setup_logging()
 logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
+
+init_tracing("kuduso-api")
+check_contracts_dir()
 
 # FastAPI app
 app = FastAPI(
@@ -50,12 +101,101 @@ app.add_middleware(
 
 
 def compute_inputs_hash(payload: dict, definition: str, version: str) -> str:
-    """Compute deterministic hash of inputs for idempotency"""
+    """Compute deterministic hash of (defaults-materialized) inputs for idempotency
+
+    With CANONICAL_HASH enabled, equivalent geometry (vertex order, winding,
+    closing point, sub-tolerance float noise) hashes identically.
+    """
+    if CANONICAL_HASH:
+        payload = canonicalize_inputs(definition, payload)
     normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
     combined = f"{normalized}{definition}{version}"
     return hashlib.sha256(combined.encode()).hexdigest()
 
 
+def compute_deadline(
+    definition: str,
+    version: str,
+    client_timeout_sec: Optional[float] = None,
+    timeout_sec: Optional[float] = None
+) -> datetime:
+    """Absolute deadline for a job: manifest timeout_sec (or `timeout_sec`), shortened by the client's own budget"""
+    timeout_sec = float(timeout_sec or get_timeout_sec(definition, version))
+    if client_timeout_sec is not None and client_timeout_sec > 0:
+        timeout_sec = min(timeout_sec, client_timeout_sec)
+    return datetime.now(timezone.utc) + timedelta(seconds=timeout_sec)
+
+
+def lookup_shape_result(shape_key: str) -> Optional[dict]:
+    """Stored local-frame result for a shape key (in-process LRU, then database)"""
+    entry = shape_cache.get(shape_key)
+    if entry is None:
+        entry = db.get_shape_result(shape_key)
+        if entry is not None:
+            shape_cache.put(shape_key, entry)
+    return entry
+
+
+def observe_submit(start: float, outcome: str) -> None:
+    SUBMIT_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+
+
+async def run_preview(job_id: str, cid: str, envelope: RunEnvelope, inputs: dict) -> Optional[dict]:
+    """Low-resolution in-process solve within the manifest's preview budget (None if unavailable)
+
+    Runs on the threadpool so the event loop keeps serving other requests.
+    """
+    # The in-process solver is a port of SiteFitSolver only
+    config = get_preview_config(envelope.definition, envelope.version)
+    if envelope.definition != "sitefit" or config is None:
+        return None
+    
+    budget_ms = min(float(config.get("budget_ms", PREVIEW_MAX_BUDGET_MS)), PREVIEW_MAX_BUDGET_MS)
+    start = time.perf_counter()
+    try:
+        outputs = await run_in_threadpool(solve_preview, inputs, config, budget_ms / 1000.0)
+    except Exception as e:
+        PREVIEW_SECONDS.labels(outcome="error").observe(time.perf_counter() - start)
+        log.warning("job.preview_failed", job_id=job_id, correlation_id=cid, error=str(e))
+        return None
+    
+    outputs["metadata"].update(definition=envelope.definition, version=envelope.version)
+    engine = outputs["metadata"]["engine"]
+    PREVIEW_SECONDS.labels(outcome="complete" if engine["complete"] else "partial").observe(time.perf_counter() - start)
+    log.info(
+        "job.preview",
+        job_id=job_id,
+        correlation_id=cid,
+        results=len(outputs["results"]),
+        evaluated=engine["evaluated"],
+        complete=engine["complete"]
+    )
+    return outputs
+
+
+
+async def trace_requests(request: Request, call_next):
+    """Server span per request, continuing any incoming traceparent"""
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        context=extract_context(request.headers),
+        kind=SpanKind.SERVER
+    ) as span:
+        response = await call_next(request)
+        # Name by route template (not the raw path) once routing has run
+        route = request.scope.get("route")
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.method", request.method)
+        span.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+# Newer FastAPI releases emit OpenTelemetry server spans natively
+if importlib.util.find_spec("fastapi.telemetry") is None:
+    app.middleware("http")(trace_requests)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -76,6 +216,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/ready")
 async def readiness_check():
     """Readiness check for Container Apps"""
@@ -85,40 +231,61 @@ async def readiness_check():
 @app.post("/jobs/run")
 async def run_job(
     envelope: RunEnvelope,
-    x_correlation_id: Optional[str] = Header(default=None)
+    x_correlation_id: Optional[str] = Header(default=None),
+    x_timeout_sec: Optional[float] = Header(default=None)
 ):
     """
     Submit a job for execution
     
-    Stage 3: Enqueues to Service Bus, writes to database
+    Stage 3: Enqueues to Service Bus, writes to database.
+    The job carries an absolute deadline (manifest timeout_sec, or the
+    client's x-timeout-sec if shorter) through the queue to the AppServer.
     """
+    start = time.perf_counter()
     cid = x_correlation_id or str(uuid.uuid4())
     job_id = str(uuid.uuid4())
+    deadline = compute_deadline(envelope.definition, envelope.version, x_timeout_sec)
     
-    logger.info(json.dumps({
-        "event": "job.submit",
-        "job_id": job_id,
-        "correlation_id": cid,
-        "app_id": envelope.app_id,
-        "definition": envelope.definition,
-        "version": envelope.version
-    }))
+    log.info(
+        "job.submit",
+        job_id=job_id,
+        correlation_id=cid,
+        app_id=envelope.app_id,
+        definition=envelope.definition,
+        version=envelope.version
+    )
 
-    # TODO: Validate inputs against contract schema
-    # TODO: Materialize defaults from schema
+    # Validate against the contract schema with defaults materialized, so
+    # invalid payloads never reach the queue and equivalent payloads hash alike
+    try:
+        inputs = prepare_inputs(envelope.definition, envelope.version, envelope.inputs)
+    except InputValidationError as e:
+        log.info(
+            "job.invalid_inputs",
+            job_id=job_id,
+            correlation_id=cid,
+            error_count=len(e.errors)
+        )
+        observe_submit(start, "invalid")
+        raise HTTPException(status_code=400, detail={
+            "message": str(e),
+            "errors": e.errors
+        })
     
     # Compute inputs hash for idempotency
-    inputs_hash = compute_inputs_hash(envelope.inputs, envelope.definition, envelope.version)
+    inputs_hash = compute_inputs_hash(inputs, envelope.definition, envelope.version)
     
     # Check for duplicate (optional idempotency)
     existing = db.check_duplicate_by_hash(inputs_hash)
     if existing and existing['status'] == 'succeeded':
-        logger.info(json.dumps({
-            "event": "job.duplicate",
-            "job_id": job_id,
-            "existing_job_id": existing['job_id'],
-            "correlation_id": cid
-        }))
+        log.info(
+            "job.duplicate",
+            job_id=job_id,
+            existing_job_id=existing['job_id'],
+            correlation_id=cid
+        )
+        CACHE_HITS_TOTAL.labels(cache="inputs_hash").inc()
+        observe_submit(start, "duplicate")
         return {
             "job_id": existing['job_id'],
             "status": "succeeded",
@@ -126,6 +293,55 @@ async def run_job(
             "cached": True
         }
     
+    # Same parcel/house shape at different absolute coordinates: re-project a stored result
+    shape_frame = compute_shape_frame(envelope.definition, envelope.version, inputs) if SHAPE_CACHE else None
+    if shape_frame:
+        try:
+            stored = lookup_shape_result(shape_frame.key)
+            if stored:
+                outputs = reproject_outputs(
+                    stored["outputs_json"],
+                    from_offset=[stored["offset_x"], stored["offset_y"]],
+                    to_offset=[shape_frame.offset_x, shape_frame.offset_y]
+                )
+                db.insert_cached_job(
+                    job_id=job_id,
+                    tenant_id=None,
+                    app_id=envelope.app_id,
+                    definition=envelope.definition,
+                    version=envelope.version,
+                    inputs_hash=inputs_hash,
+                    payload_json=inputs,
+                    outputs_json=outputs,
+                    score=stored.get("score"),
+                    correlation_id=cid
+                )
+                log.info(
+                    "job.shape_cache_hit",
+                    job_id=job_id,
+                    shape_key=shape_frame.key,
+                    correlation_id=cid
+                )
+                CACHE_HITS_TOTAL.labels(cache="shape").inc()
+                observe_submit(start, "shape_cache")
+                return {
+                    "job_id": job_id,
+                    "status": "succeeded",
+                    "correlation_id": cid,
+                    "cached": True
+                }
+        except Exception as e:
+            # Reuse is an optimization - fall through to a normal solve
+            log.warning(
+                "job.shape_cache_error",
+                job_id=job_id,
+                correlation_id=cid,
+                error=str(e)
+            )
+    
+    # Answer with a quick coarse solve; the authoritative job is enqueued behind it
+    preview_outputs = await run_preview(job_id, cid, envelope, inputs) if envelope.preview else None
+    
     try:
         # Insert job into database
         db.insert_job(
@@ -135,7 +351,9 @@ async def run_job(
             definition=envelope.definition,
             version=envelope.version,
             inputs_hash=inputs_hash,
-            payload_json=envelope.inputs
+            payload_json=inputs,
+            correlation_id=cid,
+            preview_json=preview_outputs
         )
         
         # Enqueue to Service Bus
@@ -146,48 +364,235 @@ async def run_job(
             definition=envelope.definition,
             version=envelope.version,
             inputs_hash=inputs_hash,
-            payload=envelope.inputs,
+            payload=inputs,
             correlation_id=cid,
-            priority=100
+            priority=100,
+            deadline=deadline,
+            shape_frame=shape_frame._asdict() if shape_frame else None
         )
         
-        logger.info(json.dumps({
-            "event": "job.enqueued",
-            "job_id": job_id,
-            "correlation_id": cid
-        }))
+        log.info(
+            "job.enqueued",
+            job_id=job_id,
+            correlation_id=cid,
+            deadline=deadline
+        )
+        observe_submit(start, "enqueued")
         
-        return {
+        response = {
             "job_id": job_id,
             "status": "queued",
-            "correlation_id": cid
+            "correlation_id": cid,
+            "deadline": deadline.isoformat()
         }
+        if preview_outputs is not None:
+            response["preview"] = preview_outputs
+        return response
         
     except Exception as e:
-        logger.error(json.dumps({
-            "event": "job.submit_failed",
+        log.error(
+            "job.submit_failed",
+            job_id=job_id,
+            correlation_id=cid,
+            error=str(e)
+        )
+        observe_submit(start, "error")
+        raise HTTPException(status_code=500, detail=f"Failed to submit job: {str(e)}")
+
+
+@app.post("/jobs/sweep", response_model=SweepResponse)
+async def run_sweep(
+    envelope: SweepEnvelope,
+    x_correlation_id: Optional[str] = Header(default=None),
+    x_timeout_sec: Optional[float] = Header(default=None)
+):
+    """
+    Submit one parcel with several house/rotation variants as a single sweep
+    
+    Only the sweep job is enqueued: the solver shares the parcel-level
+    precomputation across variants and the worker stores each variant's
+    results under its own job id (`variant_job_ids`, in variant order), so
+    clients poll and fetch variants like ordinary jobs.
+    """
+    start = time.perf_counter()
+    cid = x_correlation_id or str(uuid.uuid4())
+    job_id = str(uuid.uuid4())
+    
+    sweep = get_sweep_config(envelope.definition, envelope.version)
+    if sweep is None:
+        observe_submit(start, "invalid")
+        raise HTTPException(
+            status_code=400,
+            detail=f"{envelope.definition}@{envelope.version} does not support sweeps"
+        )
+    max_variants = int(sweep.get("max_variants", len(envelope.variants)))
+    if len(envelope.variants) > max_variants:
+        observe_submit(start, "invalid")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many variants: {len(envelope.variants)} > {max_variants}"
+        )
+    
+    log.info(
+        "job.sweep_submit",
+        job_id=job_id,
+        correlation_id=cid,
+        app_id=envelope.app_id,
+        definition=envelope.definition,
+        version=envelope.version,
+        variants=len(envelope.variants)
+    )
+    
+    # The schema limits variants to house/rotation overrides; each variant job
+    # gets the complete inputs it would have had as a standalone submission
+    try:
+        reject_internal_inputs(envelope.definition, envelope.version, envelope.inputs)
+        inputs = prepare_inputs(
+            envelope.definition,
+            envelope.version,
+            dict(envelope.inputs, variants=envelope.variants),
+            allow_internal=("variants",)
+        )
+        base = {key: value for key, value in inputs.items() if key != "variants"}
+        variant_inputs = [
+            prepare_inputs(envelope.definition, envelope.version, dict(base, **variant))
+            for variant in inputs["variants"]
+        ]
+    except InputValidationError as e:
+        log.info(
+            "job.invalid_inputs",
+            job_id=job_id,
+            correlation_id=cid,
+            error_count=len(e.errors)
+        )
+        observe_submit(start, "invalid")
+        raise HTTPException(status_code=400, detail={
+            "message": str(e),
+            "errors": e.errors
+        })
+    
+    inputs["variants"] = [
+        {key: variant[key] for key in ("house", "rotation") if key in variant}
+        for variant in variant_inputs
+    ]
+    variant_jobs = [
+        (str(uuid.uuid4()), compute_inputs_hash(variant, envelope.definition, envelope.version), variant)
+        for variant in variant_inputs
+    ]
+    variant_job_ids = [variant_id for variant_id, _, _ in variant_jobs]
+    inputs_hash = compute_inputs_hash(inputs, envelope.definition, envelope.version)
+    deadline = compute_deadline(
+        envelope.definition,
+        envelope.version,
+        x_timeout_sec,
+        timeout_sec=get_sweep_timeout_sec(envelope.definition, envelope.version, len(variant_jobs))
+    )
+    
+    try:
+        db.insert_sweep(
+            job_id=job_id,
+            tenant_id=None,
+            app_id=envelope.app_id,
+            definition=envelope.definition,
+            version=envelope.version,
+            inputs_hash=inputs_hash,
+            payload_json=inputs,
+            variant_jobs=variant_jobs,
+            correlation_id=cid
+        )
+        
+        queue_producer.enqueue_job(
+            job_id=job_id,
+            tenant_id=None,
+            app_id=envelope.app_id,
+            definition=envelope.definition,
+            version=envelope.version,
+            inputs_hash=inputs_hash,
+            payload=inputs,
+            correlation_id=cid,
+            priority=100,
+            deadline=deadline,
+            variant_job_ids=variant_job_ids
+        )
+        
+        log.info(
+            "job.enqueued",
+            job_id=job_id,
+            correlation_id=cid,
+            deadline=deadline,
+            variants=len(variant_job_ids)
+        )
+        observe_submit(start, "sweep")
+        
+        return {
             "job_id": job_id,
+            "variant_job_ids": variant_job_ids,
+            "status": "queued",
             "correlation_id": cid,
-            "error": str(e)
-        }))
-        raise HTTPException(status_code=500, detail=f"Failed to submit job: {str(e)}")
+            "deadline": deadline.isoformat()
+        }
+        
+    except Exception as e:
+        log.error(
+            "job.submit_failed",
+            job_id=job_id,
+            correlation_id=cid,
+            error=str(e)
+        )
+        observe_submit(start, "error")
+        raise HTTPException(status_code=500, detail=f"Failed to submit sweep: {str(e)}")
+
+
+def status_response(job: dict) -> dict:
+    """JobStatusResponse body for a job_status row"""
+    return {
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "has_result": job['has_result'],
+        "attempts": job['attempts'],
+        "created_at": job.get('created_at').isoformat() if job.get('created_at') else None,
+        "correlation_id": job.get('correlation_id')
+    }
+
+
+def progress_response(progress: dict) -> dict:
+    """JobProgress body for a job_progress row"""
+    return {
+        "percent": round(progress['progress'] * 100, 1),
+        "evaluated": progress['evaluated'],
+        "updated_at": progress['updated_at'].isoformat() if progress.get('updated_at') else None,
+        "outputs": progress['partial_json']
+    }
+
+
+def encode_cursor(created_at: datetime, job_id: str) -> str:
+    """Opaque keyset cursor for the last job on a page"""
+    raw = f"{created_at.isoformat()}|{job_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, _, job_id = base64.urlsafe_b64decode(padded).decode("utf-8").partition("|")
+    return datetime.fromisoformat(created_at), str(uuid.UUID(job_id))
 
 
 @app.get("/jobs/status/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
-    """Get job status from database"""
+    """Get job status from the job_status projection, with partial results while solving"""
     try:
         job = db.get_job_status(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
-        return {
-            "job_id": job['job_id'],
-            "status": job['status'],
-            "has_result": job['status'] == 'succeeded',
-            "created_at": job.get('created_at').isoformat() if job.get('created_at') else None,
-            "correlation_id": None  # TODO: Store correlation_id in job table
-        }
+        response = status_response(job)
+        # Previews and worker snapshots until the result replaces them
+        if job['status'] != 'succeeded':
+            progress = db.get_job_progress(job_id)
+            if progress:
+                response["progress"] = progress_response(progress)
+        return response
         
     except HTTPException:
         raise
@@ -196,9 +601,100 @@ async def get_job_status(job_id: str):
         raise HTTPException(status_code=500, detail="Failed to get job status")
 
 
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job (a running solve stops at its next checkpoint)"""
+    try:
+        job = db.cancel_job(job_id)
+        if not job:
+            current = db.get_job_status(job_id)
+            if not current:
+                raise HTTPException(status_code=404, detail="Job not found")
+            raise HTTPException(
+                status_code=409,
+                detail=f"Job already finished. Status: {current['status']}"
+            )
+        
+        log.info("job.cancelled", job_id=job_id, correlation_id=job.get('correlation_id'))
+        return status_response(job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to cancel job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to cancel job")
+
+
+@app.post("/jobs/status:bulk", response_model=BulkStatusResponse)
+async def get_job_statuses(request: BulkStatusRequest):
+    """Get statuses for many jobs with a single query"""
+    job_ids = list(dict.fromkeys(str(job_id) for job_id in request.job_ids))
+    try:
+        rows = db.get_job_statuses(job_ids)
+    except Exception as e:
+        logger.error(f"Failed to get job statuses: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get job statuses")
+    
+    by_id = {row['job_id']: row for row in rows}
+    return {
+        "statuses": [status_response(by_id[job_id]) for job_id in job_ids if job_id in by_id],
+        "missing": [job_id for job_id in job_ids if job_id not in by_id]
+    }
+
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    app_id: Optional[str] = None,
+    definition: Optional[str] = None,
+    version: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=JOB_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None
+):
+    """List jobs newest first with keyset pagination (pass back `next_cursor`)"""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    try:
+        # One extra row tells us whether there is a next page
+        rows = db.list_jobs(
+            filters={"app_id": app_id, "definition": definition, "version": version, "status": status},
+            after=after,
+            limit=limit + 1
+        )
+    except Exception as e:
+        logger.error(f"Failed to list jobs: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list jobs")
+    
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last['created_at'], last['job_id'])
+    
+    return {
+        "jobs": [status_response(row) for row in page],
+        "next_cursor": next_cursor
+    }
+
+
 @app.get("/jobs/result/{job_id}")
-async def get_job_result(job_id: str):
-    """Get job result from database"""
+async def get_job_result(
+    job_id: str,
+    accept_encoding: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get job result from database (or the blob store for offloaded outputs)
+    
+    Results are immutable: responses carry a strong ETag and long cache
+    headers, If-None-Match is answered 304 without reading the body, and
+    the body is served as pre-serialized bytes with negotiated gzip/br.
+    """
     try:
         job = db.get_job_result(job_id)
         if not job:
@@ -210,10 +706,34 @@ async def get_job_result(job_id: str):
                 detail=f"Job not ready. Status: {job['status']}"
             )
         
-        if not job.get('outputs_json'):
+        if not job.get('result_id'):
             raise HTTPException(status_code=404, detail="Result not found")
         
-        return job['outputs_json']
+        offload = job.get('offload')
+        if offload:
+            # Identified by the stored document's content hash
+            version_tag = offload['sha256']
+            encoding = negotiate_encoding(accept_encoding, supported_encodings())
+        else:
+            version_tag = job['result_id']
+            encoding = choose_inline_encoding(accept_encoding, job['stored_size'] or 0)
+        
+        etag = make_etag(version_tag, encoding)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, encoding)
+        
+        if offload:
+            try:
+                # Opens the blob, so a missing one fails before any headers are sent
+                return await run_in_threadpool(offloaded_result_response, offload, version_tag, encoding)
+            except BlobUnavailable as e:
+                log.error("result.blob_unavailable", job_id=job_id, url=offload.get("url"), error=str(e))
+                raise HTTPException(status_code=502, detail="Stored result unavailable")
+        
+        body = db.get_result_body(job['result_id'], job['job_created_at'])
+        if body is None:
+            raise HTTPException(status_code=404, detail="Result not found")
+        return inline_result_response(body, version_tag, encoding)
         
     except HTTPException:
         raise
@@ -0,0 +1,54 @@
+"""Prometheus metrics for the API (served at /metrics)"""
+import functools
+import time
+
+from opentelemetry.trace import SpanKind
+from prometheus_client import Counter, Histogram
+
+from tracing import tracer
+
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+SUBMIT_SECONDS = Histogram(
+    "kuduso_api_submit_seconds",
+    "POST /jobs/run and /jobs/sweep latency by outcome",
+    ["outcome"]
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "kuduso_api_db_query_seconds",
+    "Database call latency by Database method",
+    ["method"],
+    buckets=DB_BUCKETS
+)
+
+CACHE_HITS_TOTAL = Counter(
+    "kuduso_api_cache_hits_total",
+    "Submissions answered without a new solve, by cache",
+    ["cache"]
+)
+
+
+PREVIEW_SECONDS = Histogram(
+    "kuduso_api_preview_seconds",
+    "In-process preview solve latency by outcome (complete, partial, error)",
+    ["outcome"],
+    buckets=DB_BUCKETS
+)
+
+
+def track_db(func):
+    """Record a Database method's latency and a `db.<method>` span"""
+    histogram = DB_QUERY_SECONDS.labels(method=func.__name__)
+    span_name = f"db.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(span_name, kind=SpanKind.CLIENT, attributes={"db.system": "postgresql"}):
+                return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
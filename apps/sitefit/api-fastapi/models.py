@@ -3,15 +3,19 @@ Pydantic models for API request/response envelopes
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import uuid
+
+from config import BULK_STATUS_MAX_IDS
 
 
 class RunEnvelope(BaseModel):
     """Job submission envelope"""
     app_id: str = Field(..., description="Application identifier")
-    definition: str = Field(..., description="Contract definition name")
-    version: str = Field(..., description="Contract version (semver)")
+    definition: str = Field(..., pattern=r"^[A-Za-z0-9._-]+$", description="Contract definition name")
+    version: str = Field(..., pattern=r"^[A-Za-z0-9._-]+$", description="Contract version (semver)")
     inputs: Dict[str, Any] = Field(..., description="Input payload matching contract schema")
+    preview: bool = Field(False, description="Also answer with a fast low-resolution solve; the authoritative job still runs")
 
     model_config = {
         "json_schema_extra": {
@@ -34,13 +38,58 @@ class RunEnvelope(BaseModel):
     }
 
 
+class SweepEnvelope(BaseModel):
+    """Sweep submission: one parcel solved for several house/rotation variants"""
+    app_id: str = Field(..., description="Application identifier")
+    definition: str = Field(..., pattern=r"^[A-Za-z0-9._-]+$", description="Contract definition name")
+    version: str = Field(..., pattern=r"^[A-Za-z0-9._-]+$", description="Contract version (semver)")
+    inputs: Dict[str, Any] = Field(..., description="Base input payload shared by every variant")
+    variants: List[Dict[str, Any]] = Field(..., min_length=1, description="Per-variant overrides of `house` and/or `rotation`")
+
+
+class SweepResponse(BaseModel):
+    """Sweep job plus one job per variant (in variant order) that receives its results"""
+    job_id: str
+    variant_job_ids: List[str]
+    status: str
+    correlation_id: str
+    deadline: str
+
+
+class JobProgress(BaseModel):
+    """Best-so-far results of a job that is still being solved"""
+    percent: float = Field(..., description="Share of the search space evaluated (0-100)")
+    evaluated: int = Field(0, description="Candidate placements evaluated so far")
+    updated_at: Optional[str] = None
+    outputs: Dict[str, Any] = Field(..., description="Top placements so far, in the definition's output shape")
+
+
 class JobStatusResponse(BaseModel):
     """Job status response"""
     job_id: str
-    status: str = Field(..., description="Job status: running, succeeded, failed")
+    status: str = Field(..., description="Job status: queued, running, succeeded, failed, cancelled")
     has_result: bool = Field(..., description="Whether result is available")
+    attempts: int = Field(0, description="Processing attempts so far")
     created_at: Optional[str] = None
     correlation_id: Optional[str] = None
+    progress: Optional[JobProgress] = Field(None, description="Partial results (GET /jobs/status/{job_id} only)")
+
+
+class BulkStatusRequest(BaseModel):
+    """Statuses for many jobs in one query"""
+    job_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=BULK_STATUS_MAX_IDS)
+
+
+class BulkStatusResponse(BaseModel):
+    """Bulk status response (unknown ids are listed in `missing`)"""
+    statuses: List[JobStatusResponse]
+    missing: List[str] = Field(default_factory=list)
+
+
+class JobListResponse(BaseModel):
+    """One page of jobs, newest first; pass `next_cursor` back as `cursor`"""
+    jobs: List[JobStatusResponse]
+    next_cursor: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
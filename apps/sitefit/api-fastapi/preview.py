@@ -0,0 +1,300 @@
+"""In-process low-resolution SiteFit solve for instant previews
+
+A pure-Python port of contracts/sitefit/<version>/SiteFitSolver.py: the
+same candidate placements (house centroid on an axis-aligned grid anchored
+at the parcel bounds minimum, swept through the rotation range), the same
+20-sample containment and setback measures, the same collapsing of
+rotations equivalent under the house's symmetry and the same score. It only
+searches a coarser grid (at most `max_cells` cells) and rotation step, and
+stops when its time budget runs out, so it answers within the API request
+while the authoritative job runs on Rhino.Compute.
+
+Preview settings come from the manifest's `preview` section:
+
+    "preview": {"supported": true, "max_cells": 400, "rotation_step": 15,
+                "budget_ms": 250, "max_results": 5}
+"""
+import heapq
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+ENGINE_NAME = "kuduso-preview"
+SAMPLE_COUNT = 20
+CONTAINMENT_TOLERANCE = 0.01
+SYMMETRY_ORDERS = (20, 10, 5, 4, 2)
+SYMMETRY_TOLERANCE = 1e-6
+
+
+def _open_ring(coordinates: List[List[float]]) -> List[Point]:
+    ring = [(float(x), float(y)) for x, y in coordinates]
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    return ring
+
+
+def _area_and_centroid(ring: List[Point]) -> Tuple[float, Optional[Point]]:
+    """Unsigned area and area centroid (shoelace)"""
+    area2 = cx = cy = 0.0
+    for i in range(len(ring)):
+        x1, y1 = ring[i]
+        x2, y2 = ring[(i + 1) % len(ring)]
+        cross = x1 * y2 - x2 * y1
+        area2 += cross
+        cx += (x1 + x2) * cross
+        cy += (y1 + y2) * cross
+    if abs(area2) < 1e-12:
+        return 0.0, None
+    return abs(area2) / 2.0, (cx / (3.0 * area2), cy / (3.0 * area2))
+
+
+def _segment_distance(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length2 = dx * dx + dy * dy
+    t = 0.0
+    if length2 > 0.0:
+        t = min(max(((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2, 0.0), 1.0)
+    return math.hypot(p[0] - (a[0] + t * dx), p[1] - (a[1] + t * dy))
+
+
+def _boundary_distance(p: Point, ring: List[Point]) -> float:
+    return min(_segment_distance(p, ring[i], ring[(i + 1) % len(ring)]) for i in range(len(ring)))
+
+
+def _inside(p: Point, ring: List[Point]) -> bool:
+    """Even-odd ray cast (points on the boundary may go either way)"""
+    x, y = p
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _arc_samples(ring: List[Point], count: int) -> List[Point]:
+    """`count` + 1 points evenly spaced by length around the closed ring (like DivideByCount)"""
+    edges = [(ring[i], ring[(i + 1) % len(ring)]) for i in range(len(ring))]
+    lengths = [math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in edges]
+    total = sum(lengths)
+    samples = []
+    edge, walked = 0, 0.0
+    for k in range(count + 1):
+        target = total * k / count
+        while edge < len(edges) - 1 and walked + lengths[edge] < target:
+            walked += lengths[edge]
+            edge += 1
+        (ax, ay), (bx, by) = edges[edge]
+        t = (target - walked) / lengths[edge] if lengths[edge] > 0 else 0.0
+        t = min(max(t, 0.0), 1.0)
+        samples.append((ax + t * (bx - ax), ay + t * (by - ay)))
+    return samples
+
+
+def _score(yard_area: float, min_setback: float, utilization: float) -> float:
+    """SiteFitSolver._calculate_score"""
+    util_score = max(1.0 - abs(utilization - 0.4) * 2.0, 0.0)
+    return (yard_area / 1000.0) * 0.3 + min_setback * 0.4 + util_score * 0.3
+
+
+def _spread_stride(total: int) -> int:
+    """Stride coprime with `total` near total / golden ratio
+
+    Visiting cells as (i * stride) % total covers the whole parcel evenly
+    from the start, so a preview cut short by its budget isn't confined to
+    one side of it.
+    """
+    stride = max(int(total * 0.618), 1)
+    while math.gcd(stride, total) != 1:
+        stride += 1
+    return stride
+
+
+def _rotational_symmetry(ring: List[Point], centroid: Point) -> int:
+    """SiteFitSolver._rotational_symmetry over an open ring"""
+    points = [(x - centroid[0], y - centroid[1]) for x, y in ring]
+    tolerance = SYMMETRY_TOLERANCE * max(max(math.hypot(x, y) for x, y in points), 1.0)
+    for n in SYMMETRY_ORDERS:
+        if len(points) % n:
+            continue
+        c, s = math.cos(2.0 * math.pi / n), math.sin(2.0 * math.pi / n)
+        if all(
+            any(math.hypot(x * c - y * s - u, x * s + y * c - v) <= tolerance for u, v in points)
+            for x, y in points
+        ):
+            return n
+    return 1
+
+
+def _canonical_angles(angles: List[float], symmetry: int) -> List[float]:
+    """Drop angles equivalent (mod 360/symmetry) to an earlier one"""
+    if symmetry == 1:
+        return angles
+    period = 360.0 / symmetry
+    kept, seen = [], set()
+    for angle in angles:
+        residue = (angle - angles[0]) % period
+        if period - residue <= 1e-6:
+            residue = 0.0
+        key = int(round(residue * 1e6))
+        if key not in seen:
+            seen.add(key)
+            kept.append(angle)
+    return kept
+
+
+def _frange(start: float, stop: float, step: float) -> List[float]:
+    values = []
+    value = start
+    while value <= stop + 1e-6:
+        values.append(value)
+        value += step
+    return values
+
+
+def solve_preview(
+    inputs: Dict[str, Any],
+    config: Dict[str, Any],
+    budget_sec: float
+) -> Dict[str, Any]:
+    """Coarse SiteFit solve of (schema-defaulted) inputs, in the contract output shape
+
+    Raises ValueError for degenerate geometry.
+    """
+    started = time.monotonic()
+    parcel = _open_ring(inputs["parcel"]["coordinates"])
+    house = _open_ring(inputs["house"]["coordinates"])
+    if len(parcel) < 3 or len(house) < 3:
+        raise ValueError("parcel and house need at least 3 distinct vertices")
+
+    parcel_area, _ = _area_and_centroid(parcel)
+    house_area, centroid = _area_and_centroid(house)
+    if centroid is None or parcel_area <= 0.0:
+        raise ValueError("parcel and house must have non-zero area")
+    yard_area = parcel_area - house_area
+    utilization = house_area / parcel_area
+
+    rotation = inputs.get("rotation") or {}
+    min_rot = float(rotation.get("min", 0.0))
+    max_rot = float(rotation.get("max", 180.0))
+    step_rot = max(float(rotation.get("step", 5.0)), 0.1, float(config.get("rotation_step", 15.0)))
+
+    min_x = min(p[0] for p in parcel)
+    min_y = min(p[1] for p in parcel)
+    width = max(p[0] for p in parcel) - min_x
+    height = max(p[1] for p in parcel) - min_y
+    max_cells = max(int(config.get("max_cells", 400)), 1)
+    grid_step = max(float(inputs.get("grid_step", 0.5)), 0.1)
+    # Coarsen until the grid has at most max_cells cells
+    while (math.floor((width + 1e-6) / grid_step) + 1) * (math.floor((height + 1e-6) / grid_step) + 1) > max_cells:
+        grid_step *= 1.25
+    nx = int(math.floor((width + 1e-6) / grid_step)) + 1
+    ny = int(math.floor((height + 1e-6) / grid_step)) + 1
+
+    # House samples relative to its centroid, pre-rotated per angle
+    local = [(x - centroid[0], y - centroid[1]) for x, y in _arc_samples(house, SAMPLE_COUNT)]
+    angles = _canonical_angles(_frange(min_rot, max_rot, step_rot), _rotational_symmetry(house, centroid))
+    rotated = []
+    for angle in angles:
+        c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        points = [(x * c - y * s, x * s + y * c) for x, y in local]
+        extent = (
+            min(x for x, _ in points), min(y for _, y in points),
+            max(x for x, _ in points), max(y for _, y in points)
+        )
+        rotated.append((angle, points, extent))
+    max_x = min_x + width
+    max_y = min_y + height
+
+    max_results = max(int(config.get("max_results", 5)), 1)
+    top: List[Tuple[float, int, Dict[str, Any]]] = []
+    order = 0
+    evaluated = 0
+    complete = True
+    total_cells = nx * ny
+    stride = _spread_stride(total_cells)
+    for visited in range(total_cells):
+        if visited and time.monotonic() - started >= budget_sec:
+            complete = False
+            break
+        ix, iy = divmod(visited * stride % total_cells, ny)
+        px, py = min_x + ix * grid_step, min_y + iy * grid_step
+        if not _inside((px, py), parcel) or _boundary_distance((px, py), parcel) <= CONTAINMENT_TOLERANCE:
+            continue
+
+        for angle, samples, (lo_x, lo_y, hi_x, hi_y) in rotated:
+            evaluated += 1
+            # Sample extent past the parcel bounds can't be contained
+            if (px + lo_x < min_x - CONTAINMENT_TOLERANCE or py + lo_y < min_y - CONTAINMENT_TOLERANCE
+                    or px + hi_x > max_x + CONTAINMENT_TOLERANCE or py + hi_y > max_y + CONTAINMENT_TOLERANCE):
+                continue
+            points = [(px + x, py + y) for x, y in samples]
+            # SiteFitSolver rejects only points outside (boundary within tolerance counts as in)
+            if any(
+                not _inside(p, parcel) and _boundary_distance(p, parcel) > CONTAINMENT_TOLERANCE
+                for p in points
+            ):
+                continue
+            order += 1
+            # The areas are fixed, so the score only grows with setback: stop
+            # measuring once this placement can't beat the current k-th best
+            floor = top[0][0] if len(top) >= max_results else None
+            setback = math.inf
+            for p in points:
+                setback = min(setback, _boundary_distance(p, parcel))
+                if floor is not None and _score(yard_area, setback, utilization) <= floor:
+                    break
+            else:
+                score = _score(yard_area, setback, utilization)
+                entry = (score, -order, {
+                    "angle": angle,
+                    "tx": px - centroid[0],
+                    "ty": py - centroid[1],
+                    "score": score,
+                    "setback": setback
+                })
+                if len(top) < max_results:
+                    heapq.heappush(top, entry)
+                else:
+                    heapq.heapreplace(top, entry)
+
+    ranked = [placement for _, _, placement in sorted(top, key=lambda e: (-e[0], -e[1]))]
+    return {
+        "results": [
+            {
+                "id": f"preview-{rank + 1}",
+                "transform": {
+                    "rotation": {"axis": "z", "value": p["angle"], "units": "deg"},
+                    "translation": {"x": p["tx"], "y": p["ty"], "z": 0.0, "units": "m"},
+                    "scale": {"uniform": 1.0}
+                },
+                "score": p["score"],
+                "metrics": {
+                    "yard_area_m2": yard_area,
+                    "min_setback_m": p["setback"],
+                    "house_area_m2": house_area,
+                    "orientation_deg": p["angle"],
+                    "parcel_utilization": utilization
+                }
+            }
+            for rank, p in enumerate(ranked)
+        ],
+        "metadata": {
+            "seed": inputs.get("seed"),
+            "engine": {
+                "name": ENGINE_NAME,
+                "preview": True,
+                "grid_step": grid_step,
+                "rotation_step": step_rot,
+                "evaluated": evaluated,
+                "complete": complete,
+                "elapsed_ms": round((time.monotonic() - started) * 1000.0, 1)
+            },
+            "warnings": ["Low-resolution preview; replaced by the authoritative result when the job succeeds"]
+        }
+    }
@@ -0,0 +1,141 @@
+"""HTTP representation of job results: ETags, conditional GET, content negotiation
+
+Results are immutable once written, so every representation gets a strong
+ETag (per content-coding) and long-lived cache headers; repeat fetches with
+If-None-Match are answered 304 without reading the result body.
+"""
+import gzip
+from typing import Dict, Iterator, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from blob_store import blob_store, gunzip_stream
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip-only when brotli is not installed
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+RESULT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: tuple) -> Optional[str]:
+    """Pick the client's most preferred content-coding among `available` (None = identity)"""
+    if not accept_encoding:
+        return None
+
+    best, best_q = None, 0.0
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        candidates = available if token == "*" else (token,)
+        for candidate in candidates:
+            if candidate not in available or q <= 0:
+                continue
+            # Server preference order (`available`) breaks ties
+            if q > best_q or (q == best_q and available.index(candidate) < available.index(best)):
+                best, best_q = candidate, q
+    return best
+
+
+def choose_inline_encoding(accept_encoding: Optional[str], stored_size: int) -> Optional[str]:
+    """Content-coding for an inline result, decided before its body is read"""
+    if stored_size < MIN_COMPRESS_BYTES:
+        return None
+    return negotiate_encoding(accept_encoding, supported_encodings())
+
+
+def make_etag(version_tag: str, encoding: Optional[str]) -> str:
+    """Strong ETag for one representation of an immutable result"""
+    return f'"{version_tag}-{encoding}"' if encoding else f'"{version_tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # Weak comparison is allowed for If-None-Match
+    return any(c == etag or c == f"W/{etag}" for c in candidates)
+
+
+def _cache_headers(etag: str, encoding: Optional[str]) -> Dict[str, str]:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": RESULT_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def not_modified(etag: str, encoding: Optional[str]) -> Response:
+    headers = _cache_headers(etag, encoding)
+    headers.pop("Content-Encoding", None)
+    return Response(status_code=304, headers=headers)
+
+
+def inline_result_response(body: bytes, version_tag: str, encoding: Optional[str]) -> Response:
+    """Pre-serialized JSON bytes, compressed per the negotiated coding"""
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=_cache_headers(make_etag(version_tag, encoding), encoding)
+    )
+
+
+def offloaded_result_response(offload: dict, version_tag: str, encoding: Optional[str]) -> StreamingResponse:
+    """Stream an offloaded result from the blob store without loading it into memory"""
+    chunks: Iterator[bytes] = blob_store.open_stream(offload["url"])
+    stored_encoding = offload.get("encoding")
+    headers = {}
+
+    if encoding == stored_encoding:
+        # Pass stored bytes through untouched
+        headers["Content-Length"] = str(offload["stored_bytes"])
+    else:
+        if stored_encoding == "gzip":
+            chunks = gunzip_stream(chunks)
+        if encoding == "br":
+            chunks = _brotli_stream(chunks)
+        else:
+            encoding = None
+            headers["Content-Length"] = str(offload["bytes"])
+
+    headers.update(_cache_headers(make_etag(version_tag, encoding), encoding))
+    return StreamingResponse(
+        chunks,
+        media_type=offload.get("content_type", "application/json"),
+        headers=headers
+    )
+
+
+def _brotli_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = brotli.Compressor(quality=5)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
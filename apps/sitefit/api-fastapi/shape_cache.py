@@ -0,0 +1,137 @@
+"""Translation-invariant result reuse for SiteFit
+
+The solver anchors its placement grid at the parcel bounding-box minimum and
+expresses each placement as a translation of the house centroid. Moving the
+parcel and house to a local frame (parcel bounds min and house centroid at
+the origin) therefore leaves scores and metrics unchanged and shifts every
+translation by a constant offset:
+
+    offset = parcel_bounds_min - house_centroid
+    translation_request = translation_local + offset
+
+Jobs with the same local-frame shape share one stored result, re-projected
+into each request's frame. Rotation is not normalized: the grid is
+axis-aligned and the rotation sweep is bounded, so rotated scenes are not
+equivalent solves.
+"""
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from canonical import canonicalize_ring, normalize_scalars
+from config import CANONICAL_TOLERANCE, SHAPE_CACHE_SIZE
+
+
+class ShapeFrame(NamedTuple):
+    """Local-frame key and request-frame offset for one job"""
+    key: str
+    offset_x: float
+    offset_y: float
+
+
+def _open_ring(coordinates: List[List[float]]) -> List[List[float]]:
+    ring = [[float(x), float(y)] for x, y in coordinates]
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    return ring
+
+
+def _area_centroid(ring: List[List[float]]) -> Optional[List[float]]:
+    """Polygon area centroid (shoelace); None for degenerate rings"""
+    area2 = cx = cy = 0.0
+    for i in range(len(ring)):
+        x1, y1 = ring[i]
+        x2, y2 = ring[(i + 1) % len(ring)]
+        cross = x1 * y2 - x2 * y1
+        area2 += cross
+        cx += (x1 + x2) * cross
+        cy += (y1 + y2) * cross
+    if abs(area2) < 1e-12:
+        return None
+    return [cx / (3.0 * area2), cy / (3.0 * area2)]
+
+
+def compute_shape_frame(definition: str, version: str, inputs: Dict[str, Any]) -> Optional[ShapeFrame]:
+    """Shape key and offset for SiteFit geometry inputs, or None if not applicable"""
+    if definition != "sitefit":
+        return None
+    try:
+        parcel = _open_ring(inputs["parcel"]["coordinates"])
+        house = _open_ring(inputs["house"]["coordinates"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if len(parcel) < 3 or len(house) < 3:
+        return None
+    centroid = _area_centroid(house)
+    if centroid is None:
+        return None
+
+    min_x = min(p[0] for p in parcel)
+    min_y = min(p[1] for p in parcel)
+
+    local_parcel = canonicalize_ring([[x - min_x, y - min_y] for x, y in parcel], CANONICAL_TOLERANCE)
+    local_house = canonicalize_ring([[x - centroid[0], y - centroid[1]] for x, y in house], CANONICAL_TOLERANCE)
+
+    rest = {k: v for k, v in inputs.items() if k not in ("parcel", "house")}
+    keyed = {
+        "definition": definition,
+        "version": version,
+        "parcel": local_parcel,
+        "house": local_house,
+        "quantum": CANONICAL_TOLERANCE,
+        "inputs": normalize_scalars(rest),
+    }
+    key = hashlib.sha256(
+        json.dumps(keyed, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+    return ShapeFrame(key, min_x - centroid[0], min_y - centroid[1])
+
+
+def reproject_outputs(outputs: Dict[str, Any], from_offset: List[float], to_offset: List[float]) -> Dict[str, Any]:
+    """Shift results[*].transform.translation from one request frame to another"""
+    dx = to_offset[0] - from_offset[0]
+    dy = to_offset[1] - from_offset[1]
+
+    reprojected = copy.deepcopy(outputs)
+    for result in reprojected.get("results") or []:
+        translation = (result.get("transform") or {}).get("translation")
+        if isinstance(translation, dict):
+            translation["x"] = translation.get("x", 0.0) + dx
+            translation["y"] = translation.get("y", 0.0) + dy
+
+    metadata = reprojected.get("metadata")
+    if isinstance(metadata, dict):
+        metadata["cache_hit"] = True
+    return reprojected
+
+
+class ShapeResultCache:
+    """Bounded in-process LRU in front of the shape_result table"""
+
+    def __init__(self, max_entries: int = SHAPE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Global shape cache instance
+shape_cache = ShapeResultCache()
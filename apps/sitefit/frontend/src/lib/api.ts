@@ -9,20 +9,30 @@ export interface RunJobPayload {
   definition: string;
   version: string;
   inputs: any;
+  preview?: boolean;
 }
 
 export interface RunJobResponse {
   job_id: string;
   status: string;
   correlation_id: string;
+  preview?: any;
+}
+
+export interface JobProgress {
+  percent: number;
+  evaluated: number;
+  updated_at?: string;
+  outputs: any;
 }
 
 export interface JobStatusResponse {
   job_id: string;
-  status: 'running' | 'succeeded' | 'failed';
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
   has_result: boolean;
   created_at?: string;
   correlation_id?: string;
+  progress?: JobProgress;
 }
 
 export async function runJob(payload: RunJobPayload): Promise<RunJobResponse> {
@@ -52,6 +62,16 @@ export async function pollStatus(jobId: string): Promise<JobStatusResponse> {
   return res.json();
 }
 
+export async function cancelJob(jobId: string): Promise<JobStatusResponse> {
+  const res = await fetch(`${API_BASE_URL}/jobs/${jobId}/cancel`, { method: 'POST' });
+
+  if (!res.ok) {
+    throw new Error(`Failed to cancel job: ${res.statusText}`);
+  }
+
+  return res.json();
+}
+
 export async function getResult(jobId: string): Promise<any> {
   const res = await fetch(`${API_BASE_URL}/jobs/result/${jobId}`);
 
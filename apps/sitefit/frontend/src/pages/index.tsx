@@ -1,11 +1,12 @@
 import { useState, useEffect } from 'react';
-import { runJob, pollStatus, getResult } from '../lib/api';
-import type { RunJobPayload, JobStatusResponse } from '../lib/api';
+import { runJob, pollStatus, getResult, cancelJob } from '../lib/api';
+import type { RunJobPayload, JobStatusResponse, JobProgress } from '../lib/api';
 
 export default function Home() {
   const [jobId, setJobId] = useState<string | null>(null);
   const [status, setStatus] = useState<string | null>(null);
   const [result, setResult] = useState<any>(null);
+  const [progress, setProgress] = useState<JobProgress | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
 
@@ -17,6 +18,7 @@ export default function Home() {
     setLoading(true);
     setError(null);
     setResult(null);
+    setProgress(null);
     setJobId(null);
     setStatus(null);
 
@@ -24,7 +26,7 @@ export default function Home() {
       const payload: RunJobPayload = {
         app_id: 'sitefit',
         definition: 'sitefit',
-        version: '1.0.0',
+        version: '1.2.0',
         inputs: {
           crs,
           parcel: {
@@ -46,12 +48,17 @@ export default function Home() {
             ]
           },
           seed: parseInt(seed, 10)
-        }
+        },
+        preview: true
       };
 
       const response = await runJob(payload);
       setJobId(response.job_id);
       setStatus(response.status);
+      // Coarse in-process solve, shown until the job reports progress or its result
+      if (response.preview) {
+        setProgress({ percent: 0, evaluated: 0, outputs: response.preview });
+      }
       
       // If already succeeded (sync mode in Stage 1), fetch result immediately
       if (response.status === 'succeeded') {
@@ -65,9 +72,23 @@ export default function Home() {
     }
   }
 
+  // Keep the best placements so far and stop the search
+  async function handleCancel() {
+    if (!jobId) {
+      return;
+    }
+    try {
+      const statusData = await cancelJob(jobId);
+      setStatus(statusData.status);
+      setLoading(false);
+    } catch (err: any) {
+      setError(err.message);
+    }
+  }
+
   // Poll for status when job is running
   useEffect(() => {
-    if (!jobId || status === 'succeeded' || status === 'failed') {
+    if (!jobId || status === 'succeeded' || status === 'failed' || status === 'cancelled') {
       return;
     }
 
@@ -75,6 +96,9 @@ export default function Home() {
       try {
         const statusData = await pollStatus(jobId);
         setStatus(statusData.status);
+        if (statusData.progress) {
+          setProgress(statusData.progress);
+        }
 
         if (statusData.status === 'succeeded') {
           const resultData = await getResult(jobId);
@@ -96,6 +120,8 @@ export default function Home() {
     return () => clearInterval(interval);
   }, [jobId, status]);
 
+  const shown = result || progress?.outputs;
+
   return (
     <div style={{ maxWidth: '1200px', margin: '0 auto', padding: '48px 24px' }}>
       <header style={{ marginBottom: '48px' }}>
@@ -238,6 +264,27 @@ export default function Home() {
                 }}>
                   {status}
                 </span>
+                {status === 'running' && progress && (
+                  <span style={{ marginLeft: '12px', fontSize: '14px', color: '#6b7280' }}>
+                    {progress.percent.toFixed(1)}% searched
+                  </span>
+                )}
+                {(status === 'queued' || status === 'running') && (
+                  <button
+                    onClick={handleCancel}
+                    style={{
+                      marginLeft: '12px',
+                      padding: '4px 12px',
+                      backgroundColor: '#fff',
+                      border: '1px solid #d1d5db',
+                      borderRadius: '4px',
+                      fontSize: '14px',
+                      cursor: 'pointer'
+                    }}
+                  >
+                    {progress ? 'Keep these results' : 'Cancel'}
+                  </button>
+                )}
               </div>
             )}
 
@@ -256,16 +303,16 @@ export default function Home() {
               </div>
             )}
 
-            {/* Result */}
-            {result && (
+            {/* Result (best placements so far while the search runs) */}
+            {shown && (
               <div>
                 <h3 style={{ fontSize: '16px', fontWeight: '600', marginBottom: '12px' }}>
-                  Placement Result
+                  {result ? 'Placement Result' : shown.metadata?.engine?.preview ? 'Preview' : 'Best Placements So Far'}
                 </h3>
                 
-                {result.results && result.results.length > 0 && (
+                {shown.results && shown.results.length > 0 && (
                   <div style={{ marginBottom: '16px' }}>
-                    {result.results.map((r: any, idx: number) => (
+                    {shown.results.map((r: any, idx: number) => (
                       <div 
                         key={r.id || idx}
                         style={{
@@ -327,14 +374,14 @@ export default function Home() {
                     fontSize: '12px',
                     maxHeight: '400px'
                   }}>
-                    {JSON.stringify(result, null, 2)}
+                    {JSON.stringify(shown, null, 2)}
                   </pre>
                 </details>
               </div>
             )}
 
             {/* Idle state */}
-            {!loading && !result && !error && (
+            {!loading && !shown && !error && (
               <p style={{ color: '#9ca3af', textAlign: 'center', marginTop: '60px' }}>
                 Click "Run Placement" to start
               </p>
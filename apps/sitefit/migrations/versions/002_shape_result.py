@@ -0,0 +1,55 @@
+"""Shape-keyed result store for translation-invariant reuse
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create shape_result table keyed on the local-frame parcel/house shape."""
+
+    op.create_table(
+        'shape_result',
+        sa.Column('shape_key', sa.Text(), primary_key=True),
+        sa.Column('definition', sa.Text(), nullable=False),
+        sa.Column('version', sa.Text(), nullable=False),
+        sa.Column('source_job_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('outputs_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('score', sa.Numeric(), nullable=True),
+        sa.Column('offset_x', sa.Float(), nullable=False),
+        sa.Column('offset_y', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['source_job_id'], ['job.id'], ondelete='SET NULL'),
+    )
+
+    op.execute('ALTER TABLE shape_result ENABLE ROW LEVEL SECURITY')
+
+    op.execute("""
+        CREATE POLICY "Enable all for service role" ON shape_result
+        FOR ALL USING (auth.role() = 'service_role')
+    """)
+
+    op.execute('GRANT ALL ON shape_result TO service_role')
+
+    op.execute("COMMENT ON TABLE shape_result IS 'Results keyed on parcel/house shape in a local frame, for reuse across absolute coordinates'")
+    op.execute("COMMENT ON COLUMN shape_result.offset_x IS 'Request-frame offset (parcel bounds min - house centroid) of the source job'")
+    op.execute("COMMENT ON COLUMN shape_result.offset_y IS 'Request-frame offset (parcel bounds min - house centroid) of the source job'")
+
+
+def downgrade() -> None:
+    """Drop shape_result table."""
+
+    op.drop_table('shape_result')
@@ -0,0 +1,225 @@
+"""Partition job and result by month
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created ahead of time (kept topped up by the retention job)
+MONTHS_AHEAD = 3
+
+
+def _create_policies_and_grants(table: str) -> None:
+    op.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+    op.execute(f"""
+        CREATE POLICY "Enable all for authenticated users" ON {table}
+        FOR ALL USING (auth.role() = 'authenticated')
+    """)
+    op.execute(f"""
+        CREATE POLICY "Enable all for service role" ON {table}
+        FOR ALL USING (auth.role() = 'service_role')
+    """)
+    op.execute(f'GRANT ALL ON {table} TO service_role')
+
+
+def _create_job_with_result_view(join_on: str) -> None:
+    op.execute(f"""
+        CREATE OR REPLACE VIEW job_with_result AS
+        SELECT
+            j.*,
+            r.outputs_json,
+            r.score,
+            r.created_at as result_created_at
+        FROM job j
+        LEFT JOIN result r ON {join_on}
+    """)
+    op.execute('GRANT ALL ON job_with_result TO service_role')
+
+
+def upgrade() -> None:
+    """Recreate job/result as monthly range partitions and copy existing rows.
+
+    job is partitioned by created_at. result is partitioned by the owning
+    job's created_at (new column job_created_at), so a month of jobs and
+    their results live in matching partitions, can be detached together,
+    and result keeps a real foreign key to job.
+    """
+
+    # Helper: create missing monthly partitions from from_month to now() + months_ahead
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+            parent text, from_month timestamptz, months_ahead integer
+        ) RETURNS integer
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start timestamp := date_trunc('month', from_month AT TIME ZONE 'UTC');
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                                    + make_interval(months => months_ahead);
+            partition_name text;
+            created integer := 0;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent,
+                        month_start AT TIME ZONE 'UTC',
+                        (month_start + interval '1 month') AT TIME ZONE 'UTC'
+                    );
+                    created := created + 1;
+                END IF;
+                month_start := month_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END $$
+    """)
+
+    # Objects depending on the old tables
+    op.execute('DROP VIEW IF EXISTS job_with_result')
+    op.execute('ALTER TABLE result DROP CONSTRAINT IF EXISTS result_job_id_fkey')
+    op.execute('ALTER TABLE artifact DROP CONSTRAINT IF EXISTS artifact_job_id_fkey')
+    op.execute('ALTER TABLE shape_result DROP CONSTRAINT IF EXISTS shape_result_source_job_id_fkey')
+
+    op.rename_table('job', 'job_legacy')
+    op.rename_table('result', 'result_legacy')
+    for index in ('job_status_idx', 'job_inputs_hash_idx', 'job_tenant_idx', 'job_app_def_ver_idx', 'result_job_id_idx'):
+        op.execute(f'ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy')
+
+    # Partitioned job table
+    op.create_table(
+        'job',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('app_id', sa.Text(), nullable=False),
+        sa.Column('definition', sa.Text(), nullable=False),
+        sa.Column('version', sa.Text(), nullable=False),
+        sa.Column('status', sa.Text(), nullable=False),
+        sa.Column('inputs_hash', sa.Text(), nullable=False),
+        sa.Column('payload_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='100'),
+        sa.Column('last_error', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('ended_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='job_pkey_partitioned'),
+        sa.CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='job_status_check'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+
+    # Partitioned result table (by owning job's month)
+    op.create_table(
+        'result',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('job_created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('outputs_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('score', sa.Numeric(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id', 'job_created_at', name='result_pkey_partitioned'),
+        sa.ForeignKeyConstraint(
+            ['job_id', 'job_created_at'], ['job.id', 'job.created_at'],
+            name='result_job_fkey', ondelete='CASCADE'
+        ),
+        postgresql_partition_by='RANGE (job_created_at)',
+    )
+
+    # Partitions covering existing data through MONTHS_AHEAD months from now
+    op.execute(f"""
+        SELECT ensure_monthly_partitions('job', COALESCE((SELECT min(created_at) FROM job_legacy), now()), {MONTHS_AHEAD})
+    """)
+    op.execute(f"""
+        SELECT ensure_monthly_partitions('result', COALESCE((SELECT min(created_at) FROM job_legacy), now()), {MONTHS_AHEAD})
+    """)
+
+    # Indexes on the partitioned parents (propagate to every partition)
+    op.create_index('job_status_idx', 'job', ['status', 'created_at'])
+    # (inputs_hash, created_at) serves the duplicate check's ORDER BY created_at DESC LIMIT 1
+    op.create_index('job_inputs_hash_idx', 'job', ['inputs_hash', 'created_at'])
+    op.create_index('job_tenant_idx', 'job', ['tenant_id', 'created_at'])
+    op.create_index('job_app_def_ver_idx', 'job', ['app_id', 'definition', 'version'])
+    op.create_index('job_id_idx', 'job', ['id'])
+    op.create_index('result_job_id_idx', 'result', ['job_id'])
+
+    # Copy existing rows
+    op.execute('INSERT INTO job SELECT * FROM job_legacy')
+    op.execute("""
+        INSERT INTO result (id, job_id, job_created_at, outputs_json, score, created_at)
+        SELECT r.id, r.job_id, j.created_at, r.outputs_json, r.score, r.created_at
+        FROM result_legacy r
+        JOIN job_legacy j ON j.id = r.job_id
+    """)
+
+    op.drop_table('result_legacy')
+    op.drop_table('job_legacy')
+    op.execute('ALTER TABLE job RENAME CONSTRAINT job_pkey_partitioned TO job_pkey')
+    op.execute('ALTER TABLE result RENAME CONSTRAINT result_pkey_partitioned TO result_pkey')
+
+    _create_policies_and_grants('job')
+    _create_policies_and_grants('result')
+    _create_job_with_result_view('r.job_id = j.id AND r.job_created_at = j.created_at')
+
+    op.execute("COMMENT ON TABLE job IS 'Job queue and status tracking (monthly partitions on created_at)'")
+    op.execute("COMMENT ON TABLE result IS 'Job computation results (monthly partitions on job_created_at)'")
+    op.execute("COMMENT ON COLUMN job.inputs_hash IS 'SHA-256 hash for idempotency and caching'")
+    op.execute("COMMENT ON COLUMN job.payload_json IS 'Inputs with defaults materialized'")
+    op.execute("COMMENT ON COLUMN job.attempts IS 'Number of processing attempts'")
+    op.execute("COMMENT ON COLUMN job.priority IS 'Job priority (higher = more important)'")
+    op.execute("COMMENT ON COLUMN result.job_created_at IS 'Owning job created_at (partition key, FK with job_id)'")
+
+
+def downgrade() -> None:
+    """Fold partitions back into plain job/result tables."""
+
+    op.execute('DROP VIEW IF EXISTS job_with_result')
+
+    op.execute('CREATE TABLE job_plain (LIKE job INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO job_plain SELECT * FROM job')
+    op.execute("""
+        CREATE TABLE result_plain AS
+        SELECT id, job_id, outputs_json, score, created_at FROM result
+    """)
+
+    op.drop_table('result')
+    op.drop_table('job')
+    op.rename_table('job_plain', 'job')
+    op.rename_table('result_plain', 'result')
+
+    op.create_primary_key('job_pkey', 'job', ['id'])
+    op.create_check_constraint('job_status_check', 'job', "status IN ('queued', 'running', 'succeeded', 'failed')")
+    op.create_primary_key('result_pkey', 'result', ['id'])
+    op.execute('ALTER TABLE result ALTER COLUMN job_id SET NOT NULL')
+    op.execute('ALTER TABLE result ALTER COLUMN outputs_json SET NOT NULL')
+    op.execute("ALTER TABLE result ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+    op.execute("ALTER TABLE result ALTER COLUMN created_at SET DEFAULT now()")
+    op.create_foreign_key('result_job_id_fkey', 'result', 'job', ['job_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('artifact_job_id_fkey', 'artifact', 'job', ['job_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(
+        'shape_result_source_job_id_fkey', 'shape_result', 'job',
+        ['source_job_id'], ['id'], ondelete='SET NULL'
+    )
+
+    op.create_index('job_status_idx', 'job', ['status', 'created_at'])
+    op.create_index('job_inputs_hash_idx', 'job', ['inputs_hash'])
+    op.create_index('job_tenant_idx', 'job', ['tenant_id', 'created_at'])
+    op.create_index('job_app_def_ver_idx', 'job', ['app_id', 'definition', 'version'])
+    op.create_index('result_job_id_idx', 'result', ['job_id'])
+
+    _create_policies_and_grants('job')
+    _create_policies_and_grants('result')
+    _create_job_with_result_view('r.job_id = j.id')
+
+    op.execute('DROP FUNCTION IF EXISTS ensure_monthly_partitions(text, timestamptz, integer)')
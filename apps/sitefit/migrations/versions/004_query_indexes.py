@@ -0,0 +1,68 @@
+"""Query-matched job/result indexes and one result per job
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statuses the API's duplicate check (check_duplicate_by_hash) can reuse
+DEDUP_STATUSES = "status IN ('queued', 'running', 'succeeded')"
+
+
+def upgrade() -> None:
+    """Replace generic indexes with ones shaped after the API/worker queries."""
+
+    # check_duplicate_by_hash: WHERE inputs_hash = ? AND status IN (...)
+    # ORDER BY created_at DESC LIMIT 1, selecting id/status/created_at.
+    # Partial on the reusable statuses, covering, so it is an index-only scan.
+    op.drop_index('job_inputs_hash_idx', table_name='job')
+    op.create_index(
+        'job_inputs_hash_active_idx', 'job',
+        ['inputs_hash', sa.text('created_at DESC')],
+        postgresql_include=['id', 'status'],
+        postgresql_where=sa.text(DEDUP_STATUSES),
+    )
+
+    # Lookups by id alone (no partition key): worker get_job_attempts and the
+    # job row probe behind every result insert
+    op.drop_index('job_id_idx', table_name='job')
+    op.create_index('job_id_idx', 'job', ['id'], postgresql_include=['status', 'attempts'])
+
+    # Exactly one result per job; keep the earliest row where retries stored more
+    op.execute("""
+        DELETE FROM result r
+        USING result keep
+        WHERE keep.job_id = r.job_id
+          AND keep.job_created_at = r.job_created_at
+          AND (keep.created_at, keep.id) < (r.created_at, r.id)
+    """)
+    op.drop_index('result_job_id_idx', table_name='result')
+    # Unique constraints on a partitioned table must include the partition key
+    op.execute("""
+        ALTER TABLE result
+        ADD CONSTRAINT result_job_unique UNIQUE (job_id, job_created_at) INCLUDE (id)
+    """)
+
+
+def downgrade() -> None:
+    """Restore the generic indexes from 003."""
+
+    op.execute('ALTER TABLE result DROP CONSTRAINT IF EXISTS result_job_unique')
+    op.create_index('result_job_id_idx', 'result', ['job_id'])
+
+    op.drop_index('job_id_idx', table_name='job')
+    op.create_index('job_id_idx', 'job', ['id'])
+
+    op.drop_index('job_inputs_hash_active_idx', table_name='job')
+    op.create_index('job_inputs_hash_idx', 'job', ['inputs_hash', 'created_at'])
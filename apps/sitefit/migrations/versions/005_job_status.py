@@ -0,0 +1,91 @@
+"""Narrow job_status projection for the status endpoint
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create job_status, one small row per job, and backfill it from job/result.
+
+    The API writes the row (with correlation_id) when it creates a job; the
+    worker keeps status/attempts/timestamps in step in the same transaction
+    as each job update, and flips has_result when it stores a result.
+    """
+
+    op.create_table(
+        'job_status',
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('job_created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('status', sa.Text(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('has_result', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+        sa.Column('correlation_id', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('ended_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='job_status_status_check'),
+    )
+
+    # Rows are rewritten on every status change; vacuum often so the
+    # visibility map stays fresh for index-only reads
+    op.execute('ALTER TABLE job_status SET (autovacuum_vacuum_scale_factor = 0.02)')
+
+    # GET /jobs/status/{id} reads only the key and included columns
+    op.execute("""
+        ALTER TABLE job_status
+        ADD CONSTRAINT job_status_pkey PRIMARY KEY (job_id)
+        INCLUDE (job_created_at, status, attempts, has_result, correlation_id)
+    """)
+
+    op.execute("""
+        INSERT INTO job_status (
+            job_id, job_created_at, status, attempts, has_result,
+            started_at, ended_at
+        )
+        SELECT
+            j.id, j.created_at, j.status, j.attempts,
+            EXISTS (
+                SELECT 1 FROM result r
+                WHERE r.job_id = j.id AND r.job_created_at = j.created_at
+            ),
+            j.started_at, j.ended_at
+        FROM job j
+    """)
+
+    op.execute('ALTER TABLE job_status ENABLE ROW LEVEL SECURITY')
+
+    op.execute("""
+        CREATE POLICY "Enable all for authenticated users" ON job_status
+        FOR ALL USING (auth.role() = 'authenticated')
+    """)
+
+    op.execute("""
+        CREATE POLICY "Enable all for service role" ON job_status
+        FOR ALL USING (auth.role() = 'service_role')
+    """)
+
+    op.execute('GRANT ALL ON job_status TO service_role')
+
+    op.execute("COMMENT ON TABLE job_status IS 'Status projection of job for the status endpoint (maintained by API/worker)'")
+    op.execute("COMMENT ON COLUMN job_status.job_created_at IS 'Owning job created_at (job partition key)'")
+    op.execute("COMMENT ON COLUMN job_status.correlation_id IS 'x-correlation-id the job was submitted with'")
+
+
+def downgrade() -> None:
+    """Drop the job_status projection."""
+
+    op.drop_table('job_status')
@@ -0,0 +1,48 @@
+"""Keyset-ordered indexes for the filtered job listing
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Extend the filter indexes with the listing's (created_at DESC, id DESC) order.
+
+    GET /jobs filters on app/definition/version or status and pages with
+    (created_at, id) < cursor ORDER BY created_at DESC, id DESC, so each
+    page is a bounded index range scan instead of a sort.
+    """
+
+    op.drop_index('job_app_def_ver_idx', table_name='job')
+    op.create_index(
+        'job_app_def_ver_idx', 'job',
+        ['app_id', 'definition', 'version', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+    op.drop_index('job_status_idx', table_name='job')
+    op.create_index(
+        'job_status_idx', 'job',
+        ['status', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade() -> None:
+    """Restore the filter-only indexes."""
+
+    op.drop_index('job_status_idx', table_name='job')
+    op.create_index('job_status_idx', 'job', ['status', 'created_at'])
+
+    op.drop_index('job_app_def_ver_idx', table_name='job')
+    op.create_index('job_app_def_ver_idx', 'job', ['app_id', 'definition', 'version'])
@@ -0,0 +1,59 @@
+"""Worker leases on running jobs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Lease given to jobs that are running when the migration is applied
+BACKFILL_GRACE_SEC = 600
+
+
+def upgrade() -> None:
+    """Add lease_owner/lease_expires_at to job and an index over running leases.
+
+    A worker sets both when it claims a job and pushes lease_expires_at
+    forward on every heartbeat; any other status clears them. The reaper
+    finds running jobs whose lease has expired through the partial index.
+    Jobs running at upgrade time get a lease of BACKFILL_GRACE_SEC, so a
+    job whose pre-lease worker died is still reaped eventually.
+    """
+
+    op.add_column('job', sa.Column('lease_owner', sa.Text(), nullable=True))
+    op.add_column('job', sa.Column('lease_expires_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    # Jobs already running have no lease and no heartbeat; give their workers
+    # time to finish before the reaper may requeue them
+    op.execute(f"""
+        UPDATE job
+        SET lease_expires_at = now() + interval '{BACKFILL_GRACE_SEC} seconds'
+        WHERE status = 'running'
+        AND lease_expires_at IS NULL
+    """)
+
+    op.create_index(
+        'job_lease_expires_idx', 'job', ['lease_expires_at'],
+        postgresql_where=sa.text("status = 'running'")
+    )
+
+    op.execute("COMMENT ON COLUMN job.lease_owner IS 'Worker id holding the running job'")
+    op.execute("COMMENT ON COLUMN job.lease_expires_at IS 'Heartbeat deadline; expired running jobs are requeued by the reaper'")
+
+
+def downgrade() -> None:
+    """Drop lease columns and their index."""
+
+    op.drop_index('job_lease_expires_idx', table_name='job')
+    op.drop_column('job', 'lease_expires_at')
+    op.drop_column('job', 'lease_owner')
@@ -0,0 +1,40 @@
+"""Solver checkpoints on job
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add checkpoint_json/checkpoint_at to job.
+
+    The worker stores the solver's latest incomplete checkpoint here after
+    every solve slice and passes it back on the next attempt, so retries
+    resume the search instead of starting over. Cleared once a result is
+    stored.
+    """
+
+    op.add_column('job', sa.Column('checkpoint_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('job', sa.Column('checkpoint_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    op.execute("COMMENT ON COLUMN job.checkpoint_json IS 'Latest incomplete solver checkpoint (resume state for retries)'")
+
+
+def downgrade() -> None:
+    """Drop checkpoint columns."""
+
+    op.drop_column('job', 'checkpoint_at')
+    op.drop_column('job', 'checkpoint_json')
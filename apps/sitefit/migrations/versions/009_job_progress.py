@@ -0,0 +1,80 @@
+"""Partial results for running jobs and the cancelled status
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUSES = "('queued', 'running', 'succeeded', 'failed')"
+STATUSES_WITH_CANCELLED = "('queued', 'running', 'succeeded', 'failed', 'cancelled')"
+
+
+def upgrade() -> None:
+    """Create job_progress and allow status 'cancelled' on job/job_status.
+
+    The worker upserts one job_progress row per checkpointed job with the
+    best placements so far and the fraction of the search covered, at most
+    every PROGRESS_MIN_INTERVAL_SEC. It lives outside job_status so the
+    status projection stays narrow; the status endpoint reads it only for
+    jobs that have been claimed. Rows are deleted when a result is stored.
+    """
+
+    op.create_table(
+        'job_progress',
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('progress', sa.Float(), nullable=False),
+        sa.Column('evaluated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('partial_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.CheckConstraint('progress >= 0 AND progress <= 1', name='job_progress_progress_check'),
+    )
+
+    op.execute('ALTER TABLE job_progress ENABLE ROW LEVEL SECURITY')
+
+    op.execute("""
+        CREATE POLICY "Enable all for authenticated users" ON job_progress
+        FOR ALL USING (auth.role() = 'authenticated')
+    """)
+
+    op.execute("""
+        CREATE POLICY "Enable all for service role" ON job_progress
+        FOR ALL USING (auth.role() = 'service_role')
+    """)
+
+    op.execute('GRANT ALL ON job_progress TO service_role')
+
+    op.drop_constraint('job_status_check', 'job', type_='check')
+    op.create_check_constraint('job_status_check', 'job', f"status IN {STATUSES_WITH_CANCELLED}")
+    op.drop_constraint('job_status_status_check', 'job_status', type_='check')
+    op.create_check_constraint('job_status_status_check', 'job_status', f"status IN {STATUSES_WITH_CANCELLED}")
+
+    op.execute("COMMENT ON TABLE job_progress IS 'Best-so-far results of running checkpointed jobs (maintained by worker)'")
+    op.execute("COMMENT ON COLUMN job_progress.progress IS 'Fraction of the grid x rotation search evaluated (0-1)'")
+    op.execute("COMMENT ON COLUMN job_progress.partial_json IS 'Top placements so far, in the definition output shape'")
+
+
+def downgrade() -> None:
+    """Drop job_progress; cancelled jobs are marked failed."""
+
+    for table in ('job', 'job_status'):
+        op.execute(f"UPDATE {table} SET status = 'failed' WHERE status = 'cancelled'")
+
+    op.drop_constraint('job_status_status_check', 'job_status', type_='check')
+    op.create_check_constraint('job_status_status_check', 'job_status', f"status IN {STATUSES}")
+    op.drop_constraint('job_status_check', 'job', type_='check')
+    op.create_check_constraint('job_status_check', 'job', f"status IN {STATUSES}")
+
+    op.drop_table('job_progress')
@@ -0,0 +1,45 @@
+"""Sweep jobs and their variant jobs
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add job.parent_job_id and a partial index over variant jobs.
+
+    POST /jobs/sweep inserts one job per variant pointing at the sweep job
+    that actually runs. The worker copies the sweep job's status onto its
+    variant jobs and stores each variant's results under its own job id.
+    No foreign key: job is partitioned on created_at, so (id) alone isn't
+    a referenceable key.
+    """
+
+    op.add_column('job', sa.Column('parent_job_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+    op.create_index(
+        'job_parent_idx', 'job', ['parent_job_id'],
+        postgresql_where=sa.text('parent_job_id IS NOT NULL')
+    )
+
+    op.execute("COMMENT ON COLUMN job.parent_job_id IS 'Sweep job whose solve produces this variant job''s result'")
+
+
+def downgrade() -> None:
+    """Drop parent_job_id and its index."""
+
+    op.drop_index('job_parent_idx', table_name='job')
+    op.drop_column('job', 'parent_job_id')
@@ -0,0 +1,37 @@
+"""Keyset-ordered index for listing jobs by definition
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index (definition, created_at DESC, id DESC) for GET /jobs?definition=...
+
+    job_app_def_ver_idx leads with app_id, so a listing filtered on
+    definition (and optionally version) without app_id can't use it and
+    falls back to a sort over every matching row.
+    """
+
+    op.create_index(
+        'job_def_ver_idx', 'job',
+        ['definition', 'version', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade() -> None:
+    """Drop the definition listing index."""
+
+    op.drop_index('job_def_ver_idx', table_name='job')
@@ -0,0 +1,96 @@
+"""Object storage for offloaded results (Azure Blob, or local filesystem stand-in)"""
+import logging
+import os
+import shutil
+from urllib.parse import quote
+
+from config import BLOB_ACCOUNT, BLOB_CONTAINER, BLOB_LOCAL_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """Write-side object store used by the worker
+
+    Uses Azure Blob Storage when BLOB_ACCOUNT is set (managed identity via
+    azure-identity), otherwise files under BLOB_LOCAL_DIR, which only the
+    API on the same host can read. With neither set it is unconfigured.
+    """
+
+    def __init__(self):
+        self.account = BLOB_ACCOUNT
+        self.container = BLOB_CONTAINER
+        self.local_dir = BLOB_LOCAL_DIR
+        self._container_client = None
+
+    @property
+    def configured(self) -> bool:
+        """Whether stored objects can be read back by the API"""
+        return bool(self.account or self.local_dir)
+
+    def _get_container_client(self):
+        if self._container_client is None:
+            from azure.identity import DefaultAzureCredential
+            from azure.storage.blob import BlobServiceClient
+
+            service = BlobServiceClient(
+                account_url=f"https://{self.account}.blob.core.windows.net",
+                credential=DefaultAzureCredential()
+            )
+            self._container_client = service.get_container_client(self.container)
+        return self._container_client
+
+    def put(self, name: str, data: bytes, content_type: str, content_encoding: str) -> str:
+        """Store bytes under `name` and return the object URL"""
+        if self.account:
+            from azure.storage.blob import ContentSettings
+
+            blob = self._get_container_client().get_blob_client(name)
+            blob.upload_blob(
+                data,
+                overwrite=True,
+                content_settings=ContentSettings(
+                    content_type=content_type,
+                    content_encoding=content_encoding
+                )
+            )
+            return blob.url
+
+        if not self.local_dir:
+            raise RuntimeError("No blob store configured (BLOB_ACCOUNT / BLOB_LOCAL_DIR)")
+        path = os.path.join(self.local_dir, self.container, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return "file://" + quote(os.path.abspath(path))
+
+    def put_file(self, name: str, source_path: str, content_type: str, content_encoding: str) -> str:
+        """Store a local file under `name` without reading it into memory; returns the object URL"""
+        if self.account:
+            from azure.storage.blob import ContentSettings
+
+            blob = self._get_container_client().get_blob_client(name)
+            with open(source_path, "rb") as f:
+                blob.upload_blob(
+                    f,
+                    overwrite=True,
+                    content_settings=ContentSettings(
+                        content_type=content_type,
+                        content_encoding=content_encoding
+                    )
+                )
+            return blob.url
+
+        if not self.local_dir:
+            raise RuntimeError("No blob store configured (BLOB_ACCOUNT / BLOB_LOCAL_DIR)")
+        path = os.path.join(self.local_dir, self.container, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(source_path, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return "file://" + quote(os.path.abspath(path))
+
+
+# Global blob store instance
+blob_store = BlobStore()
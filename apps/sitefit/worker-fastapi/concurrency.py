@@ -0,0 +1,60 @@
+"""Weighted semaphore over in-flight AppServer capacity"""
+import threading
+from typing import Optional, Dict, Any
+
+
+class WeightedSemaphore:
+    """Counting semaphore where each acquirer takes `weight` slots
+
+    A job heavier than the total capacity is clamped to the capacity, so it
+    still runs - alone - instead of blocking forever.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self._in_use = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _clamp(self, weight: int) -> int:
+        return min(max(weight, 1), self.capacity)
+
+    def acquire(self, weight: int, timeout: Optional[float] = None) -> bool:
+        """Block until `weight` slots are free; returns False on timeout"""
+        weight = self._clamp(weight)
+        with self._cond:
+            acquired = self._cond.wait_for(
+                lambda: self._in_use + weight <= self.capacity,
+                timeout=timeout
+            )
+            if acquired:
+                self._in_use += weight
+                self._in_flight += 1
+            return acquired
+
+    def release(self, weight: int) -> None:
+        """Return `weight` slots to the pool"""
+        weight = self._clamp(weight)
+        with self._cond:
+            self._in_use = max(self._in_use - weight, 0)
+            self._in_flight = max(self._in_flight - 1, 0)
+            self._cond.notify_all()
+
+    def wait_for_free(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one slot is free"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._in_use < self.capacity, timeout=timeout)
+
+    @property
+    def available(self) -> int:
+        with self._cond:
+            return self.capacity - self._in_use
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current slot usage (for health/diagnostics)"""
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_use": self._in_use,
+                "in_flight": self._in_flight
+            }
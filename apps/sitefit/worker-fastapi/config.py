@@ -1,5 +1,6 @@
 """Configuration from environment variables"""
 import os
+import socket
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "")
@@ -15,4 +16,41 @@ APP_SERVER_URL = os.getenv("APPSERVER_URL", os.getenv("APP_SERVER_URL", "http://
 LOCK_RENEW_SEC = int(os.getenv("LOCK_RENEW_SEC", "45"))
 JOB_TIMEOUT_SEC = int(os.getenv("JOB_TIMEOUT_SEC", "240"))
 MAX_ATTEMPTS = int(os.getenv("MAX_ATTEMPTS", "5"))
- 
\ No newline at end of file
+
+# Job leases: running jobs whose lease isn't renewed within LEASE_SEC are requeued by the reaper
+WORKER_ID = os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+LEASE_SEC = int(os.getenv("LEASE_SEC", "30"))
+LEASE_HEARTBEAT_SEC = int(os.getenv("LEASE_HEARTBEAT_SEC", "10"))
+REAPER_INTERVAL_SEC = int(os.getenv("REAPER_INTERVAL_SEC", "10"))
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", "500"))
+
+# Checkpointed solves: default slice length when a manifest enables checkpointing without slice_sec
+SOLVE_SLICE_SEC = int(os.getenv("SOLVE_SLICE_SEC", "60"))
+# Minimum seconds between partial-result snapshots written to job_progress
+PROGRESS_MIN_INTERVAL_SEC = float(os.getenv("PROGRESS_MIN_INTERVAL_SEC", "5"))
+
+# Contracts (manifest.json lookup for concurrency/timeouts); the image copies them to /app/contracts
+CONTRACTS_DIR = os.getenv("CONTRACTS_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "..", "contracts"))
+
+# Concurrency: total weighted slots of AppServer capacity this worker may occupy
+WORKER_SLOTS = int(os.getenv("WORKER_SLOTS", "4"))
+
+# Result storage: outputs larger than RESULT_INLINE_MAX_BYTES are gzipped and offloaded
+RESULT_INLINE_MAX_BYTES = int(os.getenv("RESULT_INLINE_MAX_BYTES", "65536"))
+BLOB_ACCOUNT = os.getenv("BLOB_ACCOUNT", "")
+BLOB_CONTAINER = os.getenv("BLOB_CONTAINER", "artifacts")
+# Local stand-in for runs where the API shares the worker's filesystem (unset: no local store)
+BLOB_LOCAL_DIR = os.getenv("BLOB_LOCAL_DIR", "")
+
+# Retention: monthly job/result partitions older than RETENTION_MONTHS are archived and dropped
+RETENTION_MONTHS = int(os.getenv("RETENTION_MONTHS", "6"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+# Tracing (OpenTelemetry): none | console | file | otlp
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "/tmp/kuduso-traces.jsonl")
+
+# Logging: root level, per-event level overrides and sample rates ("event=value,...")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_EVENT_LEVELS = os.getenv("LOG_EVENT_LEVELS", "")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
@@ -3,18 +3,40 @@ import psycopg2
 import psycopg2.extras
 import psycopg2.extensions
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 import uuid
 import logging
 
 from config import DATABASE_URL
+from metrics import track_db
+from logs import EventLogger
 
 logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
 
 # Register UUID adapter for psycopg2
 psycopg2.extras.register_uuid()
 
+# Mirrors a job row updated in a preceding `WITH j AS (UPDATE job ... RETURNING ...)`
+# into the job_status projection read by the API's status endpoint
+# Post-claim writes only apply while this worker still holds the job's lease
+# (NULL: running since before leases existed); a job the reaper requeued or
+# failed, or another worker took over, is left alone
+LEASE_HELD_SQL = "AND status = 'running' AND (lease_owner = %s OR lease_owner IS NULL)"
+
+SYNC_JOB_STATUS_SQL = """
+    INSERT INTO job_status (job_id, job_created_at, status, attempts, started_at, ended_at)
+    SELECT id, created_at, status, attempts, started_at, ended_at
+    FROM j
+    ON CONFLICT (job_id) DO UPDATE
+    SET status = EXCLUDED.status,
+        attempts = EXCLUDED.attempts,
+        started_at = EXCLUDED.started_at,
+        ended_at = EXCLUDED.ended_at,
+        updated_at = now()
+"""
+
 
 class Database:
     """Database connection manager for worker"""
@@ -26,85 +48,441 @@ class Database:
         """Get database connection"""
         return psycopg2.connect(self.conn_string)
     
+    @track_db
     def update_job_status(
         self,
         job_id: str,
         status: str,
         started_at: Optional[datetime] = None,
         ended_at: Optional[datetime] = None,
-        increment_attempts: bool = False
-    ) -> None:
-        """Update job status"""
+        increment_attempts: bool = False,
+        lease_owner: Optional[str] = None,
+        lease_sec: Optional[int] = None,
+        lease_holder: Optional[str] = None,
+        error: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Update job status (and its job_status projection row)
+
+        Pass lease_owner/lease_sec when claiming a job; any update without
+        them releases the lease. After the claim pass lease_holder (this
+        worker's id) so the update only applies while the lease is held.
+        `error` is recorded as last_error in the same update. Cancelled jobs
+        are left alone; returns False when the job was cancelled, its lease
+        lost (or it doesn't exist).
+        """
+        fence = LEASE_HELD_SQL if lease_holder else ""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    if increment_attempts:
-                        cur.execute("""
+                    cur.execute("""
+                        WITH j AS (
                             UPDATE job
                             SET status = %s,
                                 started_at = COALESCE(%s, started_at),
                                 ended_at = %s,
-                                attempts = attempts + 1
+                                attempts = attempts + %s,
+                                lease_owner = %s,
+                                lease_expires_at = now() + %s * interval '1 second',
+                                last_error = COALESCE(%s::jsonb, last_error),
+                                checkpoint_json = CASE WHEN %s = 'succeeded' THEN NULL ELSE checkpoint_json END
                             WHERE id = %s
-                        """, (status, started_at, ended_at, uuid.UUID(job_id)))
-                    else:
-                        cur.execute("""
-                            UPDATE job
-                            SET status = %s,
-                                started_at = COALESCE(%s, started_at),
-                                ended_at = %s
-                            WHERE id = %s
-                        """, (status, started_at, ended_at, uuid.UUID(job_id)))
+                            AND status <> 'cancelled'
+                            """ + fence + """
+                            RETURNING id, created_at, status, attempts, started_at, ended_at
+                        ),
+                        progress_cleared AS (
+                            DELETE FROM job_progress
+                            WHERE job_id IN (SELECT id FROM j WHERE status = 'succeeded')
+                        )
+                    """ + SYNC_JOB_STATUS_SQL, (
+                        status,
+                        started_at,
+                        ended_at,
+                        1 if increment_attempts else 0,
+                        lease_owner,
+                        lease_sec if lease_owner else None,
+                        json.dumps(error) if error is not None else None,
+                        status,
+                        uuid.UUID(job_id)
+                    ) + ((lease_holder,) if lease_holder else ()))
+                    updated = cur.rowcount > 0
                 conn.commit()
                 
-            logger.info(f"Job {job_id} status updated to {status}")
+            log.debug("db.job_status_updated", job_id=job_id, status=status, updated=updated)
+            return updated
             
         except Exception as e:
             logger.error(f"Failed to update job {job_id} status: {e}")
             raise
     
-    def update_job_error(self, job_id: str, error: Dict[str, Any]) -> None:
-        """Update job error information"""
+    @track_db
+    def update_job_error(self, job_id: str, error: Dict[str, Any], lease_holder: Optional[str] = None) -> bool:
+        """Fail a job with error information
+
+        With lease_holder, only while that worker holds the job's lease (see
+        update_job_status). Returns False when the job was left alone.
+        """
+        fence = LEASE_HELD_SQL if lease_holder else ""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
-                        UPDATE job
-                        SET last_error = %s,
-                            status = 'failed',
-                            ended_at = now()
-                        WHERE id = %s
-                    """, (json.dumps(error), uuid.UUID(job_id)))
+                        WITH j AS (
+                            UPDATE job
+                            SET last_error = %s,
+                                status = 'failed',
+                                ended_at = now(),
+                                lease_owner = NULL,
+                                lease_expires_at = NULL
+                            WHERE id = %s
+                            AND status <> 'cancelled'
+                            """ + fence + """
+                            RETURNING id, created_at, status, attempts, started_at, ended_at
+                        )
+                    """ + SYNC_JOB_STATUS_SQL, (
+                        json.dumps(error),
+                        uuid.UUID(job_id)
+                    ) + ((lease_holder,) if lease_holder else ()))
+                    updated = cur.rowcount > 0
                 conn.commit()
                 
-            logger.info(f"Job {job_id} error updated")
+            log.debug("db.job_error_updated", job_id=job_id, updated=updated)
+            return updated
             
         except Exception as e:
             logger.error(f"Failed to update job {job_id} error: {e}")
             raise
     
+    @track_db
     def insert_result(
         self,
         job_id: str,
         outputs_json: Dict[str, Any],
         score: Optional[float] = None
     ) -> None:
-        """Insert job result"""
+        """Insert job result (first writer wins if a redelivered job already stored one)"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
-                        INSERT INTO result (job_id, outputs_json, score)
-                        VALUES (%s, %s, %s)
-                    """, (uuid.UUID(job_id), json.dumps(outputs_json), score))
+                        INSERT INTO result (job_id, job_created_at, outputs_json, score)
+                        SELECT id, created_at, %s, %s
+                        FROM job
+                        WHERE id = %s
+                        ON CONFLICT (job_id, job_created_at) DO NOTHING
+                    """, (json.dumps(outputs_json), score, uuid.UUID(job_id)))
+                    cur.execute("""
+                        UPDATE job_status
+                        SET has_result = true,
+                            updated_at = now()
+                        WHERE job_id = %s
+                    """, (uuid.UUID(job_id),))
                 conn.commit()
                 
-            logger.info(f"Result inserted for job {job_id}")
+            log.debug("db.result_inserted", job_id=job_id)
             
         except Exception as e:
             logger.error(f"Failed to insert result for job {job_id}: {e}")
             raise
     
+    @track_db
+    def insert_offloaded_result(
+        self,
+        job_id: str,
+        artifact_id: str,
+        artifact_kind: str,
+        artifact_url: str,
+        outputs_json: Dict[str, Any],
+        score: Optional[float] = None
+    ) -> None:
+        """Insert the artifact pointing at offloaded outputs plus a compact result row"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        INSERT INTO artifact (id, job_id, kind, url)
+                        VALUES (%s, %s, %s, %s)
+                    """, (uuid.UUID(artifact_id), uuid.UUID(job_id), artifact_kind, artifact_url))
+                    cur.execute("""
+                        INSERT INTO result (job_id, job_created_at, outputs_json, score)
+                        SELECT id, created_at, %s, %s
+                        FROM job
+                        WHERE id = %s
+                        ON CONFLICT (job_id, job_created_at) DO NOTHING
+                    """, (json.dumps(outputs_json), score, uuid.UUID(job_id)))
+                    cur.execute("""
+                        UPDATE job_status
+                        SET has_result = true,
+                            updated_at = now()
+                        WHERE job_id = %s
+                    """, (uuid.UUID(job_id),))
+                conn.commit()
+                
+            log.debug("db.result_inserted", job_id=job_id, offloaded=True)
+            
+        except Exception as e:
+            logger.error(f"Failed to insert offloaded result for job {job_id}: {e}")
+            raise
+    
+    @track_db
+    def upsert_shape_result(
+        self,
+        shape_key: str,
+        definition: str,
+        version: str,
+        source_job_id: str,
+        outputs_json: Dict[str, Any],
+        offset_x: float,
+        offset_y: float,
+        score: Optional[float] = None
+    ) -> None:
+        """Store a result under its local-frame shape key (first writer wins)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        INSERT INTO shape_result (
+                            shape_key, definition, version, source_job_id,
+                            outputs_json, score, offset_x, offset_y
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (shape_key) DO NOTHING
+                    """, (
+                        shape_key,
+                        definition,
+                        version,
+                        uuid.UUID(source_job_id),
+                        json.dumps(outputs_json),
+                        score,
+                        offset_x,
+                        offset_y
+                    ))
+                conn.commit()
+                
+            log.debug("db.shape_result_stored", job_id=source_job_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to store shape result for job {source_job_id}: {e}")
+            raise
+    
+    @track_db
+    def get_job_payload(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's inputs (claim-checked messages carry no payload)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT payload_json FROM job WHERE id = %s
+                    """, (uuid.UUID(job_id),))
+                    row = cur.fetchone()
+                    return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get payload for job {job_id}: {e}")
+            raise
+    
+    @track_db
+    def get_job_checkpoint(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest incomplete solver checkpoint stored for a job"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT checkpoint_json FROM job WHERE id = %s
+                    """, (uuid.UUID(job_id),))
+                    row = cur.fetchone()
+                    return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get checkpoint for job {job_id}: {e}")
+            return None
+    
+    @track_db
+    def save_job_checkpoint(
+        self,
+        job_id: str,
+        checkpoint: Dict[str, Any],
+        progress: Optional[float] = None,
+        partial: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Store the solver's latest checkpoint so a retry can resume from it
+
+        With `progress`/`partial` the job_progress snapshot is upserted in
+        the same statement. Returns the job's current status, so the caller
+        notices a cancellation without another query.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        WITH j AS (
+                            UPDATE job
+                            SET checkpoint_json = %s,
+                                checkpoint_at = now()
+                            WHERE id = %s
+                            RETURNING id, created_at, status
+                        ),
+                        p AS (
+                            INSERT INTO job_progress (job_id, job_created_at, progress, evaluated, partial_json)
+                            SELECT id, created_at, %s, %s, %s
+                            FROM j
+                            WHERE %s
+                            ON CONFLICT (job_id) DO UPDATE
+                            SET progress = EXCLUDED.progress,
+                                evaluated = EXCLUDED.evaluated,
+                                partial_json = EXCLUDED.partial_json,
+                                updated_at = now()
+                        )
+                        SELECT status FROM j
+                    """, (
+                        json.dumps(checkpoint),
+                        uuid.UUID(job_id),
+                        progress,
+                        int(checkpoint.get("evaluated", 0)),
+                        json.dumps(partial),
+                        progress is not None
+                    ))
+                    row = cur.fetchone()
+                conn.commit()
+            return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint for job {job_id}: {e}")
+            raise
+    
+    @track_db
+    def heartbeat_leases(self, job_ids: List[str], lease_owner: str, lease_sec: int) -> Dict[str, List[str]]:
+        """Extend this worker's leases on running jobs
+
+        Returns {"held": [...], "cancelled": [...]}: the job ids whose lease
+        was extended, and those cancelled through the API (which clears
+        the lease) rather than reaped or taken over.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        WITH tracked AS (
+                            SELECT id, created_at, status
+                            FROM job
+                            WHERE id = ANY(%s)
+                        ),
+                        held AS (
+                            UPDATE job
+                            SET lease_expires_at = now() + %s * interval '1 second'
+                            FROM tracked
+                            WHERE job.id = tracked.id
+                            AND job.created_at = tracked.created_at
+                            AND job.status = 'running'
+                            AND job.lease_owner = %s
+                            RETURNING job.id
+                        )
+                        SELECT tracked.id::text, held.id IS NOT NULL, tracked.status
+                        FROM tracked
+                        LEFT JOIN held ON held.id = tracked.id
+                    """, ([uuid.UUID(job_id) for job_id in job_ids], lease_sec, lease_owner))
+                    rows = cur.fetchall()
+                conn.commit()
+            return {
+                "held": [job_id for job_id, held, _ in rows if held],
+                "cancelled": [job_id for job_id, held, status in rows if not held and status == "cancelled"]
+            }
+        except Exception as e:
+            logger.error(f"Failed to heartbeat {len(job_ids)} leases: {e}")
+            raise
+    
+    @track_db
+    def requeue_expired_leases(self, max_attempts: int, limit: int) -> List[Dict[str, Any]]:
+        """Requeue running jobs whose lease expired, failing those out of attempts
+
+        Rows locked by another reaper are skipped, so every worker can run this.
+        Returns [{"job_id", "status"}] for the reclaimed jobs.
+        """
+        error = {
+            "type": "lease_expired",
+            "message": f"Worker lease expired and job exceeded maximum attempts ({max_attempts})",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("""
+                        WITH expired AS (
+                            SELECT id, created_at
+                            FROM job
+                            WHERE status = 'running'
+                            AND lease_expires_at < now()
+                            ORDER BY lease_expires_at
+                            LIMIT %s
+                            FOR UPDATE SKIP LOCKED
+                        ),
+                        j AS (
+                            UPDATE job
+                            SET status = CASE WHEN job.attempts >= %s THEN 'failed' ELSE 'queued' END,
+                                ended_at = CASE WHEN job.attempts >= %s THEN now() ELSE job.ended_at END,
+                                last_error = CASE WHEN job.attempts >= %s THEN %s::jsonb ELSE job.last_error END,
+                                lease_owner = NULL,
+                                lease_expires_at = NULL
+                            FROM expired
+                            WHERE job.id = expired.id
+                            AND job.created_at = expired.created_at
+                            RETURNING job.id, job.created_at, job.status, job.attempts, job.started_at, job.ended_at
+                        )
+                    """ + SYNC_JOB_STATUS_SQL + """
+                        RETURNING job_id::text AS job_id, status
+                    """, (limit, max_attempts, max_attempts, max_attempts, json.dumps(error)))
+                    rows = [dict(row) for row in cur.fetchall()]
+                conn.commit()
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to requeue expired leases: {e}")
+            raise
+    
+    @track_db
+    def sync_sweep_jobs(self, parent_job_ids: List[str]) -> int:
+        """Copy sweep jobs' status onto their variant jobs (job.parent_job_id)
+
+        Variant jobs that already succeeded or were cancelled on their own
+        keep their status. Returns the number of variant jobs updated.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        WITH j AS (
+                            UPDATE job c
+                            SET status = p.status,
+                                attempts = p.attempts,
+                                started_at = p.started_at,
+                                ended_at = p.ended_at,
+                                last_error = p.last_error
+                            FROM job p
+                            WHERE p.id = ANY(%s)
+                            AND c.parent_job_id = p.id
+                            AND c.status NOT IN ('succeeded', 'cancelled')
+                            RETURNING c.id, c.created_at, c.status, c.attempts, c.started_at, c.ended_at
+                        )
+                    """ + SYNC_JOB_STATUS_SQL, ([uuid.UUID(job_id) for job_id in parent_job_ids],))
+                    updated = cur.rowcount
+                conn.commit()
+            log.debug("db.sweep_jobs_synced", parent_job_ids=parent_job_ids, updated=updated)
+            return updated
+        except Exception as e:
+            logger.error(f"Failed to sync variant jobs of {len(parent_job_ids)} sweeps: {e}")
+            raise
+    
+    @track_db
+    def get_job_status(self, job_id: str) -> Optional[str]:
+        """Get a job's current status from its job_status row"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT status FROM job_status WHERE job_id = %s
+                    """, (uuid.UUID(job_id),))
+                    row = cur.fetchone()
+                    return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get status for job {job_id}: {e}")
+            raise
+    
+    @track_db
     def get_job_attempts(self, job_id: str) -> int:
         """Get current attempt count for a job"""
         try:
@@ -0,0 +1,117 @@
+"""Job lease heartbeats and reaping of jobs abandoned by dead workers"""
+import logging
+import threading
+import time
+from typing import Set
+
+from database import db
+from logs import EventLogger
+from metrics import LEASES_REAPED_TOTAL, LEASES_LOST_TOTAL
+
+logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
+
+
+class LeaseKeeper:
+    """One thread that heartbeats this worker's leases and runs the reaper
+
+    Every `heartbeat_sec` all tracked jobs get their lease extended in a
+    single UPDATE. Every `reap_interval_sec` running jobs whose lease has
+    expired (any worker's) are requeued - or failed once out of attempts -
+    so the redelivered message can run them again. Jobs whose lease this
+    worker lost are reported by `is_lost` until untracked, so their solve
+    can stop.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        lease_sec: int,
+        heartbeat_sec: int,
+        reap_interval_sec: int,
+        reap_batch_size: int,
+        max_attempts: int
+    ):
+        self.worker_id = worker_id
+        self.lease_sec = lease_sec
+        self.heartbeat_sec = heartbeat_sec
+        self.reap_interval_sec = reap_interval_sec
+        self.reap_batch_size = reap_batch_size
+        self.max_attempts = max_attempts
+        self._job_ids: Set[str] = set()
+        self._lost: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+
+    def track(self, job_id: str) -> None:
+        """Keep heartbeating `job_id` (claimed with lease_owner=worker_id)"""
+        with self._lock:
+            self._job_ids.add(job_id)
+            self._lost.discard(job_id)
+
+    def untrack(self, job_id: str) -> None:
+        with self._lock:
+            self._job_ids.discard(job_id)
+            self._lost.discard(job_id)
+
+    def is_lost(self, job_id: str) -> bool:
+        """Whether a heartbeat found `job_id` reaped or taken over (not cancelled)"""
+        with self._lock:
+            return job_id in self._lost
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            job_ids = list(self._job_ids)
+        if not job_ids:
+            return
+        leases = db.heartbeat_leases(job_ids, self.worker_id, self.lease_sec)
+        held = set(leases["held"])
+        cancelled = set(leases["cancelled"])
+        with self._lock:
+            # Jobs settled since the snapshot aren't running any more. Cancelled
+            # jobs stop at their next checkpoint; the rest were reaped or taken over
+            released = [job_id for job_id in job_ids if job_id not in held and job_id in self._job_ids]
+            self._job_ids.difference_update(released)
+            lost = [job_id for job_id in released if job_id not in cancelled]
+            self._lost.update(lost)
+        if lost:
+            LEASES_LOST_TOTAL.inc(len(lost))
+            log.warning("lease.lost", worker_id=self.worker_id, job_ids=lost)
+
+    def reap(self) -> None:
+        reclaimed = db.requeue_expired_leases(self.max_attempts, self.reap_batch_size)
+        for row in reclaimed:
+            LEASES_REAPED_TOTAL.labels(outcome=row["status"]).inc()
+        if reclaimed:
+            log.warning(
+                "lease.reaped",
+                worker_id=self.worker_id,
+                count=len(reclaimed),
+                job_ids=[row["job_id"] for row in reclaimed]
+            )
+            # Variant jobs of reclaimed sweeps follow their sweep job
+            db.sync_sweep_jobs([row["job_id"] for row in reclaimed])
+
+    def _run(self) -> None:
+        next_heartbeat = time.monotonic() + self.heartbeat_sec
+        next_reap = time.monotonic()
+        while not self._stopped.wait(timeout=max(min(next_heartbeat, next_reap) - time.monotonic(), 0)):
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                next_heartbeat = now + self.heartbeat_sec
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.error(f"Lease heartbeat failed: {e}")
+            if now >= next_reap:
+                next_reap = now + self.reap_interval_sec
+                try:
+                    self.reap()
+                except Exception as e:
+                    logger.error(f"Lease reaper failed: {e}")
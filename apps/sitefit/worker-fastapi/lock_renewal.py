@@ -0,0 +1,95 @@
+"""Message lock renewal for all in-flight jobs on one scheduler thread"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from logs import EventLogger
+from metrics import LOCK_RENEW_LAG_SECONDS, LOCK_RENEWALS_TOTAL
+
+log = EventLogger(__name__)
+
+
+class LockRenewalScheduler:
+    """Heap of renewal deadlines served by a single daemon thread
+
+    track() schedules a message for renewal every `interval` seconds until
+    untrack() is called (on settlement) or a renewal fails. Untracked
+    entries are dropped lazily when they reach the top of the heap. Lag is
+    how late each renewal ran relative to its due time.
+    """
+
+    def __init__(self, renew: Callable[[Any], None], interval: float):
+        self.renew = renew
+        self.interval = interval
+        self._heap: List[Tuple[float, int]] = []
+        self._entries: Dict[int, Tuple[Any, str]] = {}
+        self._keys = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lock-renewal", daemon=True)
+        self._thread.start()
+
+    def track(self, message: Any, job_id: str) -> int:
+        """Start renewing `message`'s lock; returns the key for untrack()"""
+        key = next(self._keys)
+        with self._cond:
+            self._entries[key] = (message, job_id)
+            heapq.heappush(self._heap, (time.monotonic() + self.interval, key))
+            self._cond.notify()
+        return key
+
+    def untrack(self, key: int) -> None:
+        """Stop renewing (the message was settled)"""
+        with self._cond:
+            self._entries.pop(key, None)
+
+    def tracked(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _next_due(self) -> Tuple[float, int, Any, str]:
+        """Block until the earliest tracked renewal is due; key is -1 when stopping"""
+        with self._cond:
+            while self._running:
+                while self._heap and self._heap[0][1] not in self._entries:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, key = self._heap[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._heap)
+                message, job_id = self._entries[key]
+                return due, key, message, job_id
+            return 0.0, -1, None, ""
+
+    def _run(self) -> None:
+        while True:
+            due, key, message, job_id = self._next_due()
+            if key < 0:
+                return
+            LOCK_RENEW_LAG_SECONDS.observe(max(time.monotonic() - due, 0.0))
+            try:
+                self.renew(message)
+            except Exception as e:
+                LOCK_RENEWALS_TOTAL.labels(outcome="failed").inc()
+                log.warning("job.lock_renew_failed", job_id=job_id, error=str(e))
+                self.untrack(key)
+                continue
+            LOCK_RENEWALS_TOTAL.labels(outcome="renewed").inc()
+            log.debug("job.lock_renewed", job_id=job_id)
+            with self._cond:
+                # Settled while the renewal was in flight - don't reschedule
+                if key in self._entries:
+                    heapq.heappush(self._heap, (time.monotonic() + self.interval, key))
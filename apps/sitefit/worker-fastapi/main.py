@@ -7,12 +7,17 @@ import os
 import asyncio
 import logging
 import json
+import time
 import httpx
-from datetime import datetime
-from typing import Dict, Any, Optional
-from azure.servicebus import ServiceBusClient, ServiceBusReceiver
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+from azure.servicebus import ServiceBusClient
 from azure.servicebus import ServiceBusMessage
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from concurrent.futures import ThreadPoolExecutor
 import threading
 
 from config import (
@@ -21,16 +26,50 @@ from config import (
     APP_SERVER_URL,
     LOCK_RENEW_SEC,
     JOB_TIMEOUT_SEC,
-    MAX_ATTEMPTS
+    MAX_ATTEMPTS,
+    WORKER_SLOTS,
+    WORKER_ID,
+    LEASE_SEC,
+    LEASE_HEARTBEAT_SEC,
+    REAPER_INTERVAL_SEC,
+    REAPER_BATCH_SIZE,
+    PROGRESS_MIN_INTERVAL_SEC
 )
 from database import db
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='{"time":"%(asctime)s","level":"%(levelname)s","msg":"%(message)s"}'
+from result_store import store_result
+from message_codec import unpack_coordinates, PAYLOAD_REF_JOB
+from manifest import (
+    get_concurrency,
+    get_timeout_sec,
+    get_checkpoint_slice_sec,
+    get_sweep_timeout_sec,
+    get_distance_field,
+    check_contracts_dir,
+    DEFAULT_CONCURRENCY_CLASS,
+    DEFAULT_CONCURRENCY_WEIGHT
+)
+from concurrency import WeightedSemaphore
+from receiver import SerializedReceiver
+from lock_renewal import LockRenewalScheduler
+from lease import LeaseKeeper
+from metrics import (
+    QUEUE_WAIT_SECONDS,
+    APPSERVER_SECONDS,
+    JOBS_IN_FLIGHT,
+    SLOTS_IN_USE,
+    LOCKS_TRACKED,
+    JOBS_TOTAL,
+    RETRIES_TOTAL,
+    DEAD_LETTERS_TOTAL
 )
+from tracing import init_tracing, extract_context, inject_context, tracer
+from logs import EventLogger, setup_logging
+
+setup_logging()
 logger = logging.getLogger(__name__)
+log = EventLogger(__name__)
+
+init_tracing("kuduso-worker")
 
 # FastAPI app (for health checks)
 app = FastAPI(title="Kuduso Worker", version="0.3.0-stage3")
@@ -38,48 +77,202 @@ app = FastAPI(title="Kuduso Worker", version="0.3.0-stage3")
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "worker-stage3"}
+    return {
+        "status": "healthy",
+        "service": "worker-stage3",
+        "slots": processor.slots.snapshot() if processor else None
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def _parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp, treating naive values as UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def resolve_deadline(body: Dict[str, Any]) -> Optional[datetime]:
+    """Absolute job deadline from the message, or requested_at + manifest timeout_sec"""
+    deadline = _parse_utc(body.get("deadline"))
+    if deadline:
+        return deadline
+    
+    # Messages enqueued before deadlines were propagated
+    requested_at = _parse_utc(body.get("requested_at"))
+    if requested_at and body.get("definition") and body.get("version"):
+        return requested_at + timedelta(seconds=get_timeout_sec(body["definition"], body["version"]))
+    return None
+
+
+def deadline_passed(deadline: Optional[datetime]) -> bool:
+    return deadline is not None and datetime.now(timezone.utc) >= deadline
+
+
+def solve_progress(checkpoint: Dict[str, Any]) -> float:
+    """Fraction of the search a checkpoint has covered
+
+    Every grid cell is tried at every rotation, so cells done over total
+    cells is also the fraction of the grid x rotation space evaluated.
+    """
+    total = checkpoint.get("total_cells") or 0
+    if total <= 0:
+        return 0.0
+    return min(max(float(checkpoint.get("next_cell", 0)) / total, 0.0), 1.0)
+
+
+class JobCancelled(Exception):
+    """The job was cancelled through the API while it was being solved"""
+
+
+class LeaseLost(Exception):
+    """The job's lease was reaped or taken over while this worker was solving it"""
+
+
+class SweepOutputMismatch(Exception):
+    """A sweep's outputs don't hold one variant per variant job (retrying won't change that)"""
 
 
 class JobProcessor:
     """Process jobs from Service Bus queue"""
     
     def __init__(self):
-        logger.info(json.dumps({
-            "event": "processor.init",
-            "queue": SERVICEBUS_QUEUE,
-            "has_conn": bool(SERVICEBUS_CONN)
-        }))
+        log.info(
+            "processor.init",
+            queue=SERVICEBUS_QUEUE,
+            has_conn=bool(SERVICEBUS_CONN)
+        )
+        check_contracts_dir()
         self.client = ServiceBusClient.from_connection_string(SERVICEBUS_CONN)
-        self.receiver: ServiceBusReceiver = self.client.get_queue_receiver(SERVICEBUS_QUEUE)
+        # Used from the receive loop, job threads and the lock renewer
+        self.receiver = SerializedReceiver(self.client.get_queue_receiver(SERVICEBUS_QUEUE))
         self.running = False
-        logger.info(json.dumps({
-            "event": "processor.initialized",
-            "queue": SERVICEBUS_QUEUE
-        }))
+        # Weighted slots over AppServer capacity; jobs run on a pool sized to the slot count
+        self.slots = WeightedSemaphore(WORKER_SLOTS)
+        self.executor = ThreadPoolExecutor(max_workers=WORKER_SLOTS, thread_name_prefix="job")
+        SLOTS_IN_USE.set_function(lambda: self.slots.snapshot()["in_use"])
+        # One thread renews the locks of every in-flight message
+        self.lock_renewer = LockRenewalScheduler(self.receiver.renew_message_lock, LOCK_RENEW_SEC)
+        LOCKS_TRACKED.set_function(self.lock_renewer.tracked)
+        # Job leases let any worker requeue jobs whose worker died mid-solve
+        self.leases = LeaseKeeper(
+            worker_id=WORKER_ID,
+            lease_sec=LEASE_SEC,
+            heartbeat_sec=LEASE_HEARTBEAT_SEC,
+            reap_interval_sec=REAPER_INTERVAL_SEC,
+            reap_batch_size=REAPER_BATCH_SIZE,
+            max_attempts=MAX_ATTEMPTS
+        )
+        log.info(
+            "processor.initialized",
+            queue=SERVICEBUS_QUEUE,
+            slots=WORKER_SLOTS,
+            worker_id=WORKER_ID
+        )
+    
+    def dispatch(self, message: ServiceBusMessage) -> None:
+        """Acquire weighted slots for a message and process it on the job pool
+
+        The message lock is renewed from the moment the message is received:
+        a heavy job may wait here for several running jobs to free their
+        slots, longer than the peek-lock lasts.
+        """
+        body = None
+        try:
+            body = json.loads(str(message))
+            concurrency = get_concurrency(
+                body.get("definition"),
+                body.get("version"),
+                sweep=bool(body.get("variant_job_ids"))
+            )
+        except Exception:
+            # Unparseable messages are handled (and abandoned) by process_message
+            concurrency = {"class": DEFAULT_CONCURRENCY_CLASS, "weight": DEFAULT_CONCURRENCY_WEIGHT}
+        
+        # Renew the message lock until the message is settled
+        job_id = body.get("job_id") if isinstance(body, dict) else None
+        lock_key = self.lock_renewer.track(message, job_id or str(message.message_id))
+        
+        weight = concurrency["weight"]
+        self.slots.acquire(weight)
+        
+        log.info(
+            "job.slots_acquired",
+            message_id=message.message_id,
+            concurrency_class=concurrency["class"],
+            weight=weight,
+            slots=self.slots.snapshot
+        )
+        
+        properties = message.application_properties or {}
+        
+        def run_with_slots():
+            JOBS_IN_FLIGHT.inc()
+            try:
+                # Continue the API's trace from the message properties
+                with tracer.start_as_current_span(
+                    f"{SERVICEBUS_QUEUE} process",
+                    context=extract_context(properties),
+                    kind=SpanKind.CONSUMER,
+                    attributes={
+                        "messaging.system": "servicebus",
+                        "messaging.message.id": str(message.message_id),
+                        "worker.concurrency_class": concurrency["class"],
+                        "worker.weight": weight
+                    }
+                ):
+                    self.process_message(message, body)
+            finally:
+                self.lock_renewer.untrack(lock_key)
+                JOBS_IN_FLIGHT.dec()
+                self.slots.release(weight)
         
-    def process_message(self, message: ServiceBusMessage) -> None:
-        """Process a single message"""
+        self.executor.submit(run_with_slots)
+        
+    def process_message(self, message: ServiceBusMessage, body: Optional[Dict[str, Any]] = None) -> None:
+        """Process a single message (`body` is the message JSON, if dispatch already parsed it)"""
         try:
             # Parse message
-            body = json.loads(str(message))
+            if not isinstance(body, dict):
+                body = json.loads(str(message))
             job_id = body.get("job_id")
             correlation_id = body.get("correlation_id") or message.application_properties.get("x-correlation-id", "unknown")
+            deadline = resolve_deadline(body)
+            # Set on sweep jobs: the jobs that receive each variant's results, in variant order
+            variant_job_ids = body.get("variant_job_ids") or []
+            
+            log.info(
+                "job.claim",
+                job_id=job_id,
+                correlation_id=correlation_id,
+                deadline=deadline
+            )
             
-            logger.info(json.dumps({
-                "event": "job.claim",
-                "job_id": job_id,
-                "correlation_id": correlation_id
-            }))
+            span = trace.get_current_span()
+            span.set_attribute("job.id", job_id or "")
+            requested_at = _parse_utc(body.get("requested_at"))
+            if requested_at:
+                queue_wait = max((datetime.now(timezone.utc) - requested_at).total_seconds(), 0.0)
+                QUEUE_WAIT_SECONDS.labels(definition=body.get("definition") or "unknown").observe(queue_wait)
+                span.set_attribute("messaging.queue_wait_sec", queue_wait)
             
             # Check if we should process this job
             attempts = db.get_job_attempts(job_id)
             if attempts >= MAX_ATTEMPTS:
-                logger.error(json.dumps({
-                    "event": "job.max_attempts",
-                    "job_id": job_id,
-                    "attempts": attempts
-                }))
+                log.error(
+                    "job.max_attempts",
+                    job_id=job_id,
+                    attempts=attempts
+                )
                 
                 # Update job status to failed
                 db.update_job_error(
@@ -98,87 +291,139 @@ class JobProcessor:
                     reason="MaxAttemptsReached",
                     error_description=f"Job exceeded maximum attempts ({MAX_ATTEMPTS})"
                 )
+                DEAD_LETTERS_TOTAL.labels(reason="MaxAttemptsReached").inc()
+                JOBS_TOTAL.labels(outcome="failed").inc()
+                self._sync_sweep(job_id, variant_job_ids)
                 return
             
-            # Update job status to running
-            db.update_job_status(
+            # Skip jobs whose deadline passed while they sat in the queue
+            if deadline_passed(deadline):
+                self._expire_job(message, job_id, deadline, correlation_id, stage="queued")
+                self._sync_sweep(job_id, variant_job_ids)
+                return
+            
+            # Update job status to running, taking the lease
+            claimed = db.update_job_status(
                 job_id=job_id,
                 status="running",
                 started_at=datetime.utcnow(),
-                increment_attempts=True
+                increment_attempts=True,
+                lease_owner=WORKER_ID,
+                lease_sec=LEASE_SEC
             )
+            if not claimed:
+                # Cancelled while queued - nothing to run
+                self._finish_cancelled(message, job_id, correlation_id, stage="queued")
+                return
+            self.leases.track(job_id)
+            self._sync_sweep(job_id, variant_job_ids)
             
-            # Start lock renewal in background
-            lock_renewal_task = threading.Thread(
-                target=self._renew_lock,
-                args=(message, job_id),
-                daemon=True
+            log.debug(
+                "job.before_appserver",
+                job_id=job_id,
+                definition=body.get("definition"),
+                version=body.get("version")
             )
-            lock_renewal_task.start()
-            
-            logger.info(json.dumps({
-                "event": "job.before_appserver",
-                "job_id": job_id,
-                "definition": body.get("definition"),
-                "version": body.get("version")
-            }))
             
             try:
-                # Call AppServer
-                result = self._call_appserver(
+                payload = self._load_payload(job_id, body)
+                
+                # Call AppServer (in resumable slices when the definition supports it)
+                result = self._solve(
                     job_id=job_id,
                     definition=body.get("definition"),
                     version=body.get("version"),
-                    payload=body.get("payload"),
-                    correlation_id=correlation_id
+                    payload=payload,
+                    correlation_id=correlation_id,
+                    deadline=deadline,
+                    resume=attempts > 0
                 )
                 
-                logger.info(json.dumps({
-                    "event": "job.after_appserver",
-                    "job_id": job_id,
-                    "has_result": bool(result)
-                }))
+                log.debug(
+                    "job.after_appserver",
+                    job_id=job_id,
+                    has_result=bool(result)
+                )
+                
+                # A sweep's variant results become the results of their own jobs
+                if variant_job_ids:
+                    self._fan_out_sweep(job_id, variant_job_ids, result)
                 
-                # Insert result
-                db.insert_result(
+                # Insert result (large outputs are compressed and offloaded to blob storage)
+                offloaded = store_result(
                     job_id=job_id,
-                    outputs_json=result,
+                    outputs=result,
                     score=result.get("score")  # If AppServer returns a score
                 )
                 
                 # Update job status
-                db.update_job_status(
+                succeeded = db.update_job_status(
                     job_id=job_id,
                     status="succeeded",
-                    ended_at=datetime.utcnow()
+                    ended_at=datetime.utcnow(),
+                    lease_holder=WORKER_ID
                 )
+                if not succeeded:
+                    # Cancelled during an unsliced solve, or the lease was lost; the stored result is kept
+                    self._finish_unowned(message, job_id, correlation_id)
+                    return
+                
+                # Make the result reusable for the same shape in other frames
+                if not offloaded and not variant_job_ids:
+                    self._store_shape_result(job_id, body, result)
                 
                 # Complete the message
                 self.receiver.complete_message(message)
+                JOBS_TOTAL.labels(outcome="succeeded").inc()
                 
-                logger.info(json.dumps({
-                    "event": "job.succeeded",
-                    "job_id": job_id,
-                    "correlation_id": correlation_id
-                }))
+                log.info(
+                    "job.succeeded",
+                    job_id=job_id,
+                    correlation_id=correlation_id
+                )
+                
+            except JobCancelled:
+                self._finish_cancelled(message, job_id, correlation_id, stage="running")
+                
+            except LeaseLost:
+                self._finish_lost(message, job_id, correlation_id)
+                
+            except httpx.TimeoutException as e:
+                if deadline_passed(deadline):
+                    # In-flight call cancelled on deadline - don't retry stale work
+                    self._expire_job(message, job_id, deadline, correlation_id, stage="running")
+                else:
+                    log.warning(
+                        "job.timeout",
+                        job_id=job_id,
+                        error=str(e),
+                        correlation_id=correlation_id
+                    )
+                    db.update_job_status(job_id=job_id, status="queued", lease_holder=WORKER_ID)
+                    self.receiver.abandon_message(message)
+                    RETRIES_TOTAL.labels(reason="timeout").inc()
                 
             except httpx.HTTPStatusError as e:
                 # HTTP error from AppServer
-                if e.response.status_code in [429, 502, 503, 504]:
+                if e.response.status_code == 504 and deadline_passed(deadline):
+                    self._expire_job(message, job_id, deadline, correlation_id, stage="running")
+                    
+                elif e.response.status_code in [429, 502, 503, 504]:
                     # Transient error - abandon for retry
                     # 429: Rate limited
                     # 502: Bad Gateway (upstream unavailable)
                     # 503: Service Unavailable (AppServer overloaded)
                     # 504: Gateway Timeout (AppServer timed out waiting for Rhino.Compute)
-                    logger.warning(json.dumps({
-                        "event": "job.transient_error",
-                        "job_id": job_id,
-                        "status_code": e.response.status_code,
-                        "correlation_id": correlation_id
-                    }))
+                    log.warning(
+                        "job.transient_error",
+                        job_id=job_id,
+                        status_code=e.response.status_code,
+                        correlation_id=correlation_id
+                    )
                     
-                    db.update_job_status(job_id=job_id, status="queued")
+                    db.update_job_status(job_id=job_id, status="queued", lease_holder=WORKER_ID)
                     self.receiver.abandon_message(message)
+                    RETRIES_TOTAL.labels(reason=f"http_{e.response.status_code}").inc()
                     
                 else:
                     # Permanent error - dead letter
@@ -189,29 +434,60 @@ class JobProcessor:
                         "timestamp": datetime.utcnow().isoformat()
                     }
                     
-                    db.update_job_error(job_id=job_id, error=error_detail)
+                    if not db.update_job_error(job_id=job_id, error=error_detail, lease_holder=WORKER_ID):
+                        self._finish_unowned(message, job_id, correlation_id)
+                        return
                     
                     self.receiver.dead_letter_message(
                         message,
                         reason="AppServerError",
                         error_description=str(e)
                     )
+                    DEAD_LETTERS_TOTAL.labels(reason="AppServerError").inc()
+                    JOBS_TOTAL.labels(outcome="failed").inc()
                     
-                    logger.error(json.dumps({
-                        "event": "job.failed",
-                        "job_id": job_id,
-                        "error": error_detail,
-                        "correlation_id": correlation_id
-                    }))
+                    log.error(
+                        "job.failed",
+                        job_id=job_id,
+                        error=error_detail,
+                        correlation_id=correlation_id
+                    )
                     
+            except SweepOutputMismatch as e:
+                # The solver doesn't support variants - dead letter
+                error_detail = {
+                    "type": "sweep_output_mismatch",
+                    "message": str(e),
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+                
+                if not db.update_job_error(job_id=job_id, error=error_detail, lease_holder=WORKER_ID):
+                    self._finish_unowned(message, job_id, correlation_id)
+                    return
+                
+                self.receiver.dead_letter_message(
+                    message,
+                    reason="SweepOutputMismatch",
+                    error_description=str(e)
+                )
+                DEAD_LETTERS_TOTAL.labels(reason="SweepOutputMismatch").inc()
+                JOBS_TOTAL.labels(outcome="failed").inc()
+                
+                log.error(
+                    "job.failed",
+                    job_id=job_id,
+                    error=error_detail,
+                    correlation_id=correlation_id
+                )
+                
             except Exception as e:
                 # Unexpected error
-                logger.error(json.dumps({
-                    "event": "job.error",
-                    "job_id": job_id,
-                    "error": str(e),
-                    "correlation_id": correlation_id
-                }))
+                log.error(
+                    "job.error",
+                    job_id=job_id,
+                    error=str(e),
+                    correlation_id=correlation_id
+                )
                 
                 error_detail = {
                     "type": "processing_error",
@@ -219,104 +495,374 @@ class JobProcessor:
                     "timestamp": datetime.utcnow().isoformat()
                 }
                 
-                db.update_job_error(job_id=job_id, error=error_detail)
-                
-                # Abandon for retry
-                db.update_job_status(job_id=job_id, status="queued")
+                # Abandon for retry, keeping the error
+                db.update_job_status(job_id=job_id, status="queued", lease_holder=WORKER_ID, error=error_detail)
                 self.receiver.abandon_message(message)
+                RETRIES_TOTAL.labels(reason="processing_error").inc()
+            finally:
+                self.leases.untrack(job_id)
+                self._sync_sweep(job_id, variant_job_ids)
             
         except Exception as e:
             logger.error(f"Failed to process message: {e}")
             # Abandon message so it can be retried
+            RETRIES_TOTAL.labels(reason="message_error").inc()
             try:
                 self.receiver.abandon_message(message)
             except:
                 pass
     
-    def _call_appserver(
+    def _load_payload(self, job_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Job inputs from the message, or from job.payload_json for claim-checked messages"""
+        if body.get("payload_ref") == PAYLOAD_REF_JOB:
+            payload = db.get_job_payload(job_id)
+            if payload is None:
+                raise ValueError(f"Job {job_id} has no stored payload")
+            return payload
+        return unpack_coordinates(body.get("payload"))
+    
+    def _solve(
         self,
         job_id: str,
         definition: str,
         version: str,
         payload: Dict[str, Any],
+        correlation_id: str,
+        deadline: Optional[datetime],
+        resume: bool
+    ) -> Dict[str, Any]:
+        """Solve a job, as a series of checkpointed slices if its manifest enables checkpointing
+
+        Each incomplete slice's checkpoint is stored on the job, so a retry
+        (resume=True) continues from the last one instead of starting over.
+        Along with it the slice's best-so-far outputs are published to
+        job_progress (at most every PROGRESS_MIN_INTERVAL_SEC) for the status
+        endpoint. Raises JobCancelled if the job was cancelled meanwhile, and
+        LeaseLost once a heartbeat finds its lease reaped or taken over.
+        
+        Sweeps (payload `variants`) are solved in one unsliced call allowed
+        the manifest's sweep timeout. The manifest's distance_field settings,
+        when enabled, are added to every call.
+        """
+        distance_field = get_distance_field(definition, version)
+        if distance_field:
+            payload = dict(payload, distance_field=distance_field)
+        
+        variants = payload.get("variants")
+        if variants:
+            return self._call_appserver(
+                job_id, definition, version, payload, correlation_id, deadline,
+                timeout_sec=get_sweep_timeout_sec(definition, version, len(variants))
+            )
+        
+        slice_sec = get_checkpoint_slice_sec(definition, version)
+        if slice_sec is None:
+            result = self._call_appserver(job_id, definition, version, payload, correlation_id, deadline)
+            # Search state isn't part of the outputs, even when the solver returns it
+            return self._record_cascade(job_id, result, result.pop("checkpoint", None), correlation_id)
+        
+        checkpoint = db.get_job_checkpoint(job_id) if resume else None
+        if checkpoint:
+            log.info("job.resume", job_id=job_id, next_cell=checkpoint.get("next_cell"), correlation_id=correlation_id)
+        
+        published_at = None
+        while True:
+            budget = slice_sec
+            if deadline:
+                # Leave headroom to return the checkpoint before the deadline
+                remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+                budget = max(min(budget, remaining * 0.8), 1.0)
+            slice_payload = dict(payload, time_budget_sec=budget)
+            if checkpoint:
+                slice_payload["checkpoint"] = checkpoint
+            
+            result = self._call_appserver(job_id, definition, version, slice_payload, correlation_id, deadline)
+            checkpoint = result.pop("checkpoint", None)
+            if not isinstance(checkpoint, dict) or checkpoint.get("complete", True):
+                return self._record_cascade(job_id, result, checkpoint, correlation_id)
+            if self.leases.is_lost(job_id):
+                # Reaped or taken over: don't overwrite the new attempt's checkpoint
+                raise LeaseLost(job_id)
+            
+            # Publish the best placements so far, rate-limited
+            progress, partial = None, None
+            if published_at is None or time.monotonic() - published_at >= PROGRESS_MIN_INTERVAL_SEC:
+                published_at = time.monotonic()
+                progress, partial = solve_progress(checkpoint), result
+            status = db.save_job_checkpoint(job_id, checkpoint, progress=progress, partial=partial)
+            log.info(
+                "job.checkpoint",
+                job_id=job_id,
+                next_cell=checkpoint.get("next_cell"),
+                total_cells=checkpoint.get("total_cells"),
+                cascade=checkpoint.get("cascade"),
+                published=progress is not None,
+                correlation_id=correlation_id
+            )
+            if status == "cancelled":
+                raise JobCancelled(job_id)
+    
+    def _record_cascade(
+        self,
+        job_id: str,
+        result: Dict[str, Any],
+        checkpoint: Optional[Dict[str, Any]],
         correlation_id: str
     ) -> Dict[str, Any]:
-        """Call AppServer to process job"""
+        """Copy the final checkpoint's quick-test counters to metadata.engine.cascade and log them"""
+        cascade = checkpoint.get("cascade") if isinstance(checkpoint, dict) else None
+        if cascade:
+            metadata = result.setdefault("metadata", {})
+            metadata["engine"] = dict(metadata.get("engine") or {}, cascade=cascade)
+            log.info(
+                "job.cascade",
+                job_id=job_id,
+                evaluated=checkpoint.get("evaluated"),
+                cascade=cascade,
+                correlation_id=correlation_id
+            )
+        return result
+    
+    def _call_appserver(
+        self,
+        job_id: str,
+        definition: str,
+        version: str,
+        payload: Dict[str, Any],
+        correlation_id: str,
+        deadline: Optional[datetime] = None,
+        timeout_sec: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Call AppServer to process job, bounded by the job deadline (and timeout_sec, default JOB_TIMEOUT_SEC)"""
         url = APP_SERVER_URL.format(definition=definition, version=version)
         headers = {"x-correlation-id": correlation_id}
         
-        logger.debug(json.dumps({
-            "event": "appserver.call",
-            "job_id": job_id,
-            "url": url,
-            "correlation_id": correlation_id
-        }))
+        timeout = float(timeout_sec or JOB_TIMEOUT_SEC)
+        if deadline:
+            headers["x-deadline"] = deadline.isoformat()
+            remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+            timeout = max(min(timeout, remaining), 0.001)
         
-        # Use verify=False for internal HTTPS communication (Container Apps internal certs)
-        with httpx.Client(timeout=JOB_TIMEOUT_SEC, verify=False) as client:
-            response = client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        log.debug(
+            "appserver.call",
+            job_id=job_id,
+            url=url,
+            timeout_sec=timeout,
+            correlation_id=correlation_id
+        )
+        
+        start = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(
+            "appserver.solve",
+            kind=SpanKind.CLIENT,
+            attributes={"job.id": job_id, "http.url": url, "appserver.definition": definition, "appserver.version": version}
+        ) as span:
+            # traceparent lets the AppServer continue this trace
+            inject_context(headers)
+            try:
+                # Use verify=False for internal HTTPS communication (Container Apps internal certs)
+                with httpx.Client(timeout=timeout, verify=False) as client:
+                    response = client.post(url, json=payload, headers=headers)
+                    span.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                    outcome = "ok"
+                    return response.json()
+            except httpx.TimeoutException:
+                outcome = "timeout"
+                raise
+            except httpx.HTTPStatusError as e:
+                outcome = f"http_{e.response.status_code}"
+                raise
+            finally:
+                if outcome != "ok":
+                    span.set_status(Status(StatusCode.ERROR, outcome))
+                APPSERVER_SECONDS.labels(definition=definition, outcome=outcome).observe(time.perf_counter() - start)
     
-    def _renew_lock(self, message: ServiceBusMessage, job_id: str) -> None:
-        """Renew message lock periodically"""
+    def _store_shape_result(self, job_id: str, body: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store a succeeded result under the API-computed shape key, if any"""
+        shape_frame = body.get("shape_frame")
+        # Artifacts are rendered in the request frame and cannot be re-projected
+        if not shape_frame or result.get("artifacts"):
+            return
         try:
-            import time
-            while True:
-                time.sleep(LOCK_RENEW_SEC)
-                try:
-                    self.receiver.renew_message_lock(message)
-                    logger.debug(f"Lock renewed for job {job_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to renew lock for job {job_id}: {e}")
-                    break
+            db.upsert_shape_result(
+                shape_key=shape_frame["key"],
+                definition=body.get("definition"),
+                version=body.get("version"),
+                source_job_id=job_id,
+                outputs_json=result,
+                offset_x=shape_frame["offset_x"],
+                offset_y=shape_frame["offset_y"],
+                score=result.get("score")
+            )
         except Exception as e:
-            logger.error(f"Lock renewal error for job {job_id}: {e}")
+            # Reuse is an optimization - never fail the job over it
+            log.warning(
+                "job.shape_store_failed",
+                job_id=job_id,
+                error=str(e)
+            )
+    
+    def _fan_out_sweep(self, job_id: str, variant_job_ids: List[str], result: Dict[str, Any]) -> None:
+        """Store each variant's outputs as the result of its variant job
+
+        The sweep job keeps the combined outputs, each variant tagged with
+        the job id its results were stored under. Variant results are first
+        writer wins, so a redelivered sweep can fan out again safely.
+        """
+        variants = result.get("variants") or []
+        if len(variants) != len(variant_job_ids):
+            raise SweepOutputMismatch(
+                f"Sweep {job_id} returned {len(variants)} variant outputs for {len(variant_job_ids)} variant jobs"
+            )
+        metadata = dict(result.get("metadata") or {}, sweep_job_id=job_id)
+        for variant_job_id, variant in zip(variant_job_ids, variants):
+            store_result(
+                job_id=variant_job_id,
+                outputs={"results": variant.get("results") or [], "metadata": metadata}
+            )
+            variant["job_id"] = variant_job_id
+        log.info("job.sweep_fanned_out", job_id=job_id, variants=len(variants))
+    
+    def _sync_sweep(self, job_id: str, variant_job_ids: List[str]) -> None:
+        """Mirror a sweep job's status onto its variant jobs (no-op for other jobs)"""
+        if not variant_job_ids:
+            return
+        try:
+            db.sync_sweep_jobs([job_id])
+        except Exception as e:
+            # The next status change syncs them again - never fail the job over it
+            log.warning("job.sweep_sync_failed", job_id=job_id, error=str(e))
+    
+    def _finish_cancelled(
+        self,
+        message: ServiceBusMessage,
+        job_id: str,
+        correlation_id: str,
+        stage: str
+    ) -> None:
+        """Settle the message of a job cancelled through the API (its status is already final)"""
+        self.receiver.complete_message(message)
+        JOBS_TOTAL.labels(outcome="cancelled").inc()
+        log.info(
+            "job.cancelled",
+            job_id=job_id,
+            stage=stage,
+            correlation_id=correlation_id
+        )
+    
+    def _finish_lost(self, message: ServiceBusMessage, job_id: str, correlation_id: str) -> None:
+        """Abandon the message of a job whose lease was lost (the reaper already requeued or failed it)"""
+        self.receiver.abandon_message(message)
+        RETRIES_TOTAL.labels(reason="lease_lost").inc()
+        log.warning(
+            "job.lease_lost",
+            job_id=job_id,
+            worker_id=WORKER_ID,
+            correlation_id=correlation_id
+        )
+    
+    def _finish_unowned(self, message: ServiceBusMessage, job_id: str, correlation_id: str) -> None:
+        """Settle the message of a job whose final write was refused (cancelled, or lease lost)"""
+        if db.get_job_status(job_id) == "cancelled":
+            self._finish_cancelled(message, job_id, correlation_id, stage="running")
+        else:
+            self._finish_lost(message, job_id, correlation_id)
+    
+    def _expire_job(
+        self,
+        message: ServiceBusMessage,
+        job_id: str,
+        deadline: datetime,
+        correlation_id: str,
+        stage: str
+    ) -> None:
+        """Fail a job whose deadline passed and dead-letter its message
+
+        Once running (stage "running") the job is only failed while this
+        worker still holds its lease.
+        """
+        error_detail = {
+            "type": "deadline_exceeded",
+            "message": f"Job deadline {deadline.isoformat()} passed while {stage}",
+            "deadline": deadline.isoformat(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        lease_holder = WORKER_ID if stage == "running" else None
+        if not db.update_job_error(job_id=job_id, error=error_detail, lease_holder=lease_holder):
+            self._finish_unowned(message, job_id, correlation_id)
+            return
+        
+        self.receiver.dead_letter_message(
+            message,
+            reason="DeadlineExceeded",
+            error_description=error_detail["message"]
+        )
+        DEAD_LETTERS_TOTAL.labels(reason="DeadlineExceeded").inc()
+        JOBS_TOTAL.labels(outcome="expired").inc()
+        
+        log.warning(
+            "job.deadline_exceeded",
+            job_id=job_id,
+            stage=stage,
+            deadline=deadline,
+            correlation_id=correlation_id
+        )
     
     def run(self) -> None:
         """Main worker loop"""
         self.running = True
-        logger.info(json.dumps({
-            "event": "worker.start",
-            "queue": SERVICEBUS_QUEUE,
-            "conn_configured": bool(SERVICEBUS_CONN),
-            "max_wait": 5
-        }))
+        log.info(
+            "worker.start",
+            queue=SERVICEBUS_QUEUE,
+            conn_configured=bool(SERVICEBUS_CONN),
+            max_wait=5
+        )
         
         try:
             iteration = 0
             while self.running:
                 iteration += 1
-                logger.info(json.dumps({
-                    "event": "worker.poll",
-                    "iteration": iteration,
-                    "queue": SERVICEBUS_QUEUE
-                }))
+                
+                # Only pull new work once some AppServer capacity is free
+                if not self.slots.wait_for_free(timeout=5):
+                    continue
+                
+                # Idle polls run every few seconds - debug only
+                log.debug(
+                    "worker.poll",
+                    iteration=iteration,
+                    queue=SERVICEBUS_QUEUE
+                )
                 
                 # Receive one message at a time
                 messages = self.receiver.receive_messages(max_message_count=1, max_wait_time=5)
                 
-                logger.info(json.dumps({
-                    "event": "worker.received",
-                    "message_count": len(messages),
-                    "iteration": iteration
-                }))
+                log.debug(
+                    "worker.received",
+                    message_count=len(messages),
+                    iteration=iteration
+                )
                 
                 for message in messages:
-                    self.process_message(message)
+                    self.dispatch(message)
                 
         except KeyboardInterrupt:
             logger.info("Worker interrupted")
         except Exception as e:
-            logger.error(f"Worker error: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Worker error: {e}")
         finally:
             self.close()
     
     def close(self) -> None:
         """Close connections"""
         self.running = False
+        # Let in-flight jobs settle their messages before closing the receiver
+        self.executor.shutdown(wait=True)
+        self.lock_renewer.stop()
+        self.leases.stop()
         self.receiver.close()
         self.client.close()
         logger.info("Worker connections closed")
@@ -0,0 +1,102 @@
+"""Contract manifest lookup (mirrors shared/appserver-node/src/manifest.ts)"""
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+from config import CONTRACTS_DIR, JOB_TIMEOUT_SEC, SOLVE_SLICE_SEC
+from logs import EventLogger
+
+log = EventLogger(__name__)
+
+DEFAULT_CONCURRENCY_CLASS = "batch"
+DEFAULT_CONCURRENCY_WEIGHT = 1
+
+
+def check_contracts_dir() -> bool:
+    """Log an error at startup when CONTRACTS_DIR is missing (concurrency weights, timeouts, checkpointing, sweeps and the distance field depend on it)"""
+    if os.path.isdir(CONTRACTS_DIR):
+        return True
+    log.error("contracts.missing", contracts_dir=os.path.abspath(CONTRACTS_DIR))
+    return False
+
+
+@lru_cache(maxsize=64)
+def load_manifest(definition: str, version: str) -> Dict[str, Any]:
+    """Load manifest.json for a definition/version (cached per process)"""
+    manifest_path = os.path.join(CONTRACTS_DIR, definition, version, "manifest.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        # Without it the manifest-driven behaviour silently reverts to defaults
+        log.error(
+            "manifest.unavailable",
+            definition=definition,
+            version=version,
+            error=str(e)
+        )
+        return {}
+
+
+def get_concurrency(definition: str, version: str, sweep: bool = False) -> Dict[str, Any]:
+    """Get concurrency class and slot weight for a definition/version
+
+    Sweep jobs take `sweep.weight` when the manifest sets it.
+    """
+    manifest = load_manifest(definition, version)
+    concurrency = manifest.get("concurrency") or {}
+    runtime = manifest.get("runtime") or {}
+    sweep_config = manifest.get("sweep") or {}
+    if sweep and "weight" in sweep_config:
+        concurrency = dict(concurrency, weight=sweep_config["weight"])
+
+    concurrency_class = (
+        concurrency.get("class")
+        or runtime.get("concurrency_class")
+        or DEFAULT_CONCURRENCY_CLASS
+    )
+    try:
+        weight = int(concurrency.get("weight", DEFAULT_CONCURRENCY_WEIGHT))
+    except (TypeError, ValueError):
+        weight = DEFAULT_CONCURRENCY_WEIGHT
+
+    return {"class": concurrency_class, "weight": max(weight, 1)}
+
+
+def get_checkpoint_slice_sec(definition: str, version: str) -> Optional[float]:
+    """Solve slice length when the definition supports checkpoint/resume, else None"""
+    checkpointing = load_manifest(definition, version).get("checkpointing") or {}
+    if not checkpointing.get("supported"):
+        return None
+    try:
+        return max(float(checkpointing.get("slice_sec", SOLVE_SLICE_SEC)), 1.0)
+    except (TypeError, ValueError):
+        return float(SOLVE_SLICE_SEC)
+
+
+def get_distance_field(definition: str, version: str) -> Optional[Dict[str, Any]]:
+    """Solver `distance_field` input when the manifest enables it, else None"""
+    distance_field = load_manifest(definition, version).get("distance_field") or {}
+    if not distance_field.get("enabled"):
+        return None
+    return {key: distance_field[key] for key in ("max_error", "max_cells") if key in distance_field}
+
+
+def get_timeout_sec(definition: str, version: str) -> int:
+    """Get manifest timeout_sec, falling back to JOB_TIMEOUT_SEC"""
+    manifest = load_manifest(definition, version)
+    try:
+        return int(manifest.get("timeout_sec", JOB_TIMEOUT_SEC))
+    except (TypeError, ValueError):
+        return JOB_TIMEOUT_SEC
+
+
+def get_sweep_timeout_sec(definition: str, version: str, variants: int) -> int:
+    """Timeout of a sweep solve: timeout_sec per variant, capped by sweep.timeout_sec"""
+    timeout_sec = get_timeout_sec(definition, version) * max(variants, 1)
+    sweep = load_manifest(definition, version).get("sweep") or {}
+    try:
+        return min(timeout_sec, int(sweep.get("timeout_sec", timeout_sec)))
+    except (TypeError, ValueError):
+        return timeout_sec
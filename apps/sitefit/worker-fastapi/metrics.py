@@ -0,0 +1,107 @@
+"""Prometheus metrics for the worker (served at /metrics on the health app)"""
+import functools
+import time
+
+from opentelemetry.trace import SpanKind
+from prometheus_client import Counter, Gauge, Histogram
+
+from tracing import tracer
+
+# Seconds; queue waits and solves run from sub-second to the job deadline
+LONG_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 240, 600)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+QUEUE_WAIT_SECONDS = Histogram(
+    "kuduso_worker_queue_wait_seconds",
+    "Time from job submission (requested_at) to claim by a worker",
+    ["definition"],
+    buckets=LONG_BUCKETS
+)
+
+APPSERVER_SECONDS = Histogram(
+    "kuduso_worker_appserver_seconds",
+    "AppServer solve call latency",
+    ["definition", "outcome"],
+    buckets=LONG_BUCKETS
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "kuduso_worker_db_query_seconds",
+    "Database call latency by Database method",
+    ["method"],
+    buckets=DB_BUCKETS
+)
+
+JOBS_IN_FLIGHT = Gauge(
+    "kuduso_worker_jobs_in_flight",
+    "Jobs currently being processed"
+)
+
+SLOTS_IN_USE = Gauge(
+    "kuduso_worker_slots_in_use",
+    "Weighted AppServer slots currently held"
+)
+
+JOBS_TOTAL = Counter(
+    "kuduso_worker_jobs_total",
+    "Jobs finished by outcome",
+    ["outcome"]
+)
+
+RETRIES_TOTAL = Counter(
+    "kuduso_worker_retries_total",
+    "Messages abandoned for redelivery, by reason",
+    ["reason"]
+)
+
+DEAD_LETTERS_TOTAL = Counter(
+    "kuduso_worker_dead_letters_total",
+    "Messages dead-lettered, by reason",
+    ["reason"]
+)
+
+
+LOCK_RENEW_LAG_SECONDS = Histogram(
+    "kuduso_worker_lock_renew_lag_seconds",
+    "How late each message lock renewal ran relative to its due time",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+LOCK_RENEWALS_TOTAL = Counter(
+    "kuduso_worker_lock_renewals_total",
+    "Message lock renewals by outcome",
+    ["outcome"]
+)
+
+LEASES_REAPED_TOTAL = Counter(
+    "kuduso_worker_leases_reaped_total",
+    "Running jobs reclaimed after their lease expired, by new status",
+    ["outcome"]
+)
+
+LEASES_LOST_TOTAL = Counter(
+    "kuduso_worker_leases_lost_total",
+    "Leases this worker found reaped while still processing the job"
+)
+
+LOCKS_TRACKED = Gauge(
+    "kuduso_worker_locks_tracked",
+    "In-flight messages whose locks are being renewed"
+)
+
+
+def track_db(func):
+    """Record a Database method's latency and a `db.<method>` span"""
+    histogram = DB_QUERY_SECONDS.labels(method=func.__name__)
+    span_name = f"db.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(span_name, kind=SpanKind.CLIENT, attributes={"db.system": "postgresql"}):
+                return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
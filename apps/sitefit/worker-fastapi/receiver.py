@@ -0,0 +1,43 @@
+"""Service Bus receiver shared by the receive loop, job threads and the lock renewer"""
+import threading
+from typing import Any, List
+
+from azure.servicebus import ServiceBusReceiver, ServiceBusReceivedMessage
+
+
+class SerializedReceiver:
+    """Calls a ServiceBusReceiver one at a time
+
+    The SDK's receiver is not thread-safe, but messages are received on the
+    main loop, settled on job pool threads and renewed on the lock renewal
+    thread. A receive holds the lock for at most its max_wait_time, so a
+    settlement or renewal waits at most that long.
+    """
+
+    def __init__(self, receiver: ServiceBusReceiver):
+        self._receiver = receiver
+        self._lock = threading.Lock()
+
+    def receive_messages(self, **kwargs: Any) -> List[ServiceBusReceivedMessage]:
+        with self._lock:
+            return self._receiver.receive_messages(**kwargs)
+
+    def complete_message(self, message: ServiceBusReceivedMessage) -> None:
+        with self._lock:
+            self._receiver.complete_message(message)
+
+    def abandon_message(self, message: ServiceBusReceivedMessage) -> None:
+        with self._lock:
+            self._receiver.abandon_message(message)
+
+    def dead_letter_message(self, message: ServiceBusReceivedMessage, **kwargs: Any) -> None:
+        with self._lock:
+            self._receiver.dead_letter_message(message, **kwargs)
+
+    def renew_message_lock(self, message: ServiceBusReceivedMessage) -> Any:
+        with self._lock:
+            return self._receiver.renew_message_lock(message)
+
+    def close(self) -> None:
+        with self._lock:
+            self._receiver.close()
@@ -0,0 +1,82 @@
+"""Size-bounded result persistence
+
+Small outputs stay inline in result.outputs_json. Outputs larger than
+RESULT_INLINE_MAX_BYTES are gzipped into the blob store (when one is
+configured - otherwise they stay inline too), referenced from an
+`artifact` row, and result.outputs_json keeps only a compact summary plus an
+`_offload` pointer that the API uses to stream the full document.
+"""
+import gzip
+import hashlib
+import json
+import uuid
+from typing import Dict, Any, Optional
+
+from config import RESULT_INLINE_MAX_BYTES
+from database import db
+from blob_store import blob_store
+from logs import EventLogger
+
+log = EventLogger(__name__)
+
+RESULT_ARTIFACT_KIND = "result"
+
+
+def summarize_outputs(outputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact summary kept in Postgres for offloaded outputs"""
+    results = outputs.get("results") or []
+    scores = [r.get("score") for r in results if isinstance(r, dict) and isinstance(r.get("score"), (int, float))]
+    return {
+        "results_count": len(results),
+        "best_score": max(scores) if scores else None,
+        "metadata": outputs.get("metadata")
+    }
+
+
+def store_result(job_id: str, outputs: Dict[str, Any], score: Optional[float] = None) -> bool:
+    """Persist job outputs; returns True if they were offloaded to the blob store"""
+    encoded = json.dumps(outputs, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    if len(encoded) <= RESULT_INLINE_MAX_BYTES or not blob_store.configured:
+        if len(encoded) > RESULT_INLINE_MAX_BYTES:
+            # An object the API can't read would turn the result into a 5xx
+            log.warning("result.offload_unconfigured", job_id=job_id, bytes=len(encoded))
+        db.insert_result(job_id=job_id, outputs_json=outputs, score=score)
+        return False
+
+    compressed = gzip.compress(encoded, compresslevel=6)
+    artifact_id = str(uuid.uuid4())
+    url = blob_store.put(
+        f"results/{job_id}.json.gz",
+        compressed,
+        content_type="application/json",
+        content_encoding="gzip"
+    )
+
+    db.insert_offloaded_result(
+        job_id=job_id,
+        artifact_id=artifact_id,
+        artifact_kind=RESULT_ARTIFACT_KIND,
+        artifact_url=url,
+        outputs_json={
+            "_offload": {
+                "artifact_id": artifact_id,
+                "url": url,
+                "content_type": "application/json",
+                "encoding": "gzip",
+                "bytes": len(encoded),
+                "stored_bytes": len(compressed),
+                "sha256": hashlib.sha256(encoded).hexdigest()
+            },
+            "summary": summarize_outputs(outputs)
+        },
+        score=score
+    )
+
+    log.info(
+        "result.offloaded",
+        job_id=job_id,
+        bytes=len(encoded),
+        stored_bytes=len(compressed)
+    )
+    return True
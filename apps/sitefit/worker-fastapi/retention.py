@@ -0,0 +1,204 @@
+"""Retention for the monthly job/result partitions (migration 003)
+
+Runs daily as the app stack's retention container app job
+(infra/modules/app-stack), or by hand:
+
+    python retention.py                      # archive + drop months older than RETENTION_MONTHS
+    python retention.py --keep-months 12
+    python retention.py --dry-run
+
+Each run first tops up future partitions, then for every month older than
+the cutoff: detaches result_pYYYY_MM (dropping its now-standalone foreign
+key to job) and job_pYYYY_MM, exports both as gzipped CSV to the blob store
+under archive/, clears rows that referenced those jobs (artifact, job_status
+and job_progress rows are deleted, shape_result.source_job_id is nulled),
+and drops the detached tables.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from psycopg2 import sql
+
+from config import RETENTION_MONTHS, PARTITION_MONTHS_AHEAD
+from database import db
+from blob_store import blob_store
+from logs import EventLogger, setup_logging
+
+setup_logging()
+log = EventLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^(job|result)_p(\d{4})_(\d{2})$")
+
+ARCHIVE_PREFIX = "archive"
+
+
+def retention_cutoff(keep_months: int, now: datetime) -> str:
+    """First month (YYYY_MM) that is kept; older partitions are archived"""
+    month_index = now.year * 12 + (now.month - 1) - keep_months
+    return f"{month_index // 12:04d}_{month_index % 12 + 1:02d}"
+
+
+def list_partitions(cur, parent: str) -> List[str]:
+    cur.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+        ORDER BY c.relname
+    """, (parent,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def ensure_partitions(months_ahead: int) -> Dict[str, int]:
+    """Create any missing partitions through `months_ahead` months from now"""
+    created = {}
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            for parent in ("job", "result"):
+                cur.execute(
+                    "SELECT ensure_monthly_partitions(%s, now(), %s)",
+                    (parent, months_ahead)
+                )
+                created[parent] = cur.fetchone()[0]
+        conn.commit()
+    return created
+
+
+def _foreign_keys(cur, table: str) -> List[str]:
+    cur.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        (table,)
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def _export_table(cur, table: str, month: str) -> Dict[str, object]:
+    """COPY a detached partition to a gzipped CSV in the blob store"""
+    fd, tmp_path = tempfile.mkstemp(suffix=".csv.gz")
+    os.close(fd)
+    try:
+        with gzip.open(tmp_path, "wb", compresslevel=6) as out:
+            cur.copy_expert(
+                sql.SQL("COPY (SELECT * FROM {}) TO STDOUT WITH (FORMAT csv, HEADER true)")
+                .format(sql.Identifier(table)).as_string(cur),
+                out
+            )
+        parent = table.split("_p", 1)[0]
+        url = blob_store.put_file(
+            f"{ARCHIVE_PREFIX}/{parent}/{month}.csv.gz",
+            tmp_path,
+            content_type="text/csv",
+            content_encoding="gzip"
+        )
+        return {"table": table, "url": url, "stored_bytes": os.path.getsize(tmp_path)}
+    finally:
+        os.unlink(tmp_path)
+
+
+def archive_month(month: str, dry_run: bool = False) -> Dict[str, object]:
+    """Detach, export and drop the job/result partitions for one month"""
+    job_table = f"job_p{month}"
+    result_table = f"result_p{month}"
+    summary: Dict[str, object] = {"month": month, "exports": []}
+
+    if dry_run:
+        return summary
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            # result first, then drop the copy of result_job_fkey the detached
+            # table keeps: it still references job_pYYYY_MM and would make
+            # detaching the job partition fail
+            cur.execute(sql.SQL("ALTER TABLE result DETACH PARTITION {}").format(sql.Identifier(result_table)))
+            for constraint in _foreign_keys(cur, result_table):
+                cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                    sql.Identifier(result_table), sql.Identifier(constraint)
+                ))
+            cur.execute(sql.SQL("ALTER TABLE job DETACH PARTITION {}").format(sql.Identifier(job_table)))
+        conn.commit()
+
+        # Export after detaching so the copy is a stable snapshot of the month
+        with conn.cursor() as cur:
+            summary["exports"].append(_export_table(cur, job_table, month))
+            summary["exports"].append(_export_table(cur, result_table, month))
+
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL(
+                "DELETE FROM artifact WHERE job_id IN (SELECT id FROM {})"
+            ).format(sql.Identifier(job_table)))
+            summary["artifacts_deleted"] = cur.rowcount
+            cur.execute(sql.SQL(
+                "UPDATE shape_result SET source_job_id = NULL WHERE source_job_id IN (SELECT id FROM {})"
+            ).format(sql.Identifier(job_table)))
+            cur.execute(sql.SQL(
+                "DELETE FROM job_status WHERE job_id IN (SELECT id FROM {})"
+            ).format(sql.Identifier(job_table)))
+            cur.execute(sql.SQL(
+                "DELETE FROM job_progress WHERE job_id IN (SELECT id FROM {})"
+            ).format(sql.Identifier(job_table)))
+            cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(result_table)))
+            cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(job_table)))
+        conn.commit()
+
+    return summary
+
+
+def run_retention(keep_months: int, months_ahead: int, dry_run: bool = False) -> Dict[str, object]:
+    cutoff = retention_cutoff(keep_months, datetime.now(timezone.utc))
+    created = {} if dry_run else ensure_partitions(months_ahead)
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            job_months = {
+                f"{m.group(2)}_{m.group(3)}"
+                for m in (PARTITION_NAME.match(name) for name in list_partitions(cur, "job"))
+                if m
+            }
+
+    expired = sorted(month for month in job_months if month < cutoff)
+    archived = []
+    for month in expired:
+        archived.append(archive_month(month, dry_run=dry_run))
+        log.info(
+            "retention.partition_archived" if not dry_run else "retention.partition_expired",
+            month=month
+        )
+
+    return {
+        "cutoff": cutoff,
+        "partitions_created": created,
+        "archived": archived,
+        "dry_run": dry_run
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive and drop old job/result partitions")
+    parser.add_argument("--keep-months", type=int, default=RETENTION_MONTHS,
+                        help=f"Months of partitions to keep (default: {RETENTION_MONTHS})")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD,
+                        help=f"Future partitions to pre-create (default: {PARTITION_MONTHS_AHEAD})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="List expired months without detaching or dropping anything")
+    args = parser.parse_args()
+
+    if args.keep_months < 1:
+        parser.error("--keep-months must be at least 1")
+    if not args.dry_run and not blob_store.configured:
+        parser.error("BLOB_ACCOUNT (or BLOB_LOCAL_DIR) must be set: partitions are dropped after export")
+
+    summary = run_retention(args.keep_months, args.months_ahead, dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""OpenTelemetry tracing: provider setup and W3C trace-context propagation
+
+Spans go to the exporter named by TRACING_EXPORTER:
+- "none" (default): no spans are recorded, but incoming trace context is
+  still forwarded so downstream services can continue the trace
+- "console": one JSON span per line on stdout
+- "file": one JSON span per line appended to TRACING_FILE (works offline)
+- "otlp": OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (needs
+  opentelemetry-exporter-otlp-proto-http)
+"""
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+
+from config import TRACING_EXPORTER, TRACING_FILE
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("kuduso.worker")
+
+
+def _json_line(span) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def _make_exporter() -> Optional[SpanExporter]:
+    if TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter(formatter=_json_line)
+    if TRACING_EXPORTER == "file":
+        return ConsoleSpanExporter(out=open(TRACING_FILE, "a", buffering=1), formatter=_json_line)
+    if TRACING_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("TRACING_EXPORTER=otlp but opentelemetry-exporter-otlp-proto-http is not installed")
+            return None
+        return OTLPSpanExporter()
+    return None
+
+
+def init_tracing(service_name: str) -> None:
+    """Install a tracer provider for the configured exporter (no-op for "none")"""
+    exporter = _make_exporter()
+    if exporter is None:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def inject_context(carrier: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the current trace context (traceparent/tracestate) into a header/property dict"""
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: Mapping[Any, Any]) -> Context:
+    """Trace context from HTTP headers or message properties (str or bytes keys/values)"""
+    normalized = {}
+    for key, value in (carrier or {}).items():
+        if isinstance(key, bytes):
+            key = key.decode("utf-8", "replace")
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", "replace")
+        normalized[str(key).lower()] = value
+    return propagate.extract(normalized)
@@ -3,14 +3,36 @@
 Validates input payloads against contract schemas using jsonschema
 Usage: python validate_inputs.py <definition> <version> <payload-file>
 Example: python validate_inputs.py sitefit 1.0.0 ../sitefit/1.0.0/examples/valid/minimal.json
+
+Bulk mode (directories, .json/.jsonl files or '-' for JSONL on stdin):
+Usage: python validate_inputs.py bulk [--definition D --version V] [--workers N] [--output FILE] <path>...
+Example: python validate_inputs.py bulk --definition sitefit --version 1.0.0 ../sitefit/1.0.0/examples/valid
+
+JSONL records may be bare input payloads or run envelopes
+({"definition", "version", "inputs"}); envelopes override --definition/--version.
+Prints a JSON summary (per-record errors, throughput) and exits 1 if anything failed.
 """
 
+import argparse
 import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from jsonschema import validate, ValidationError, Draft202012Validator
 from jsonschema.validators import validator_for
 
+CONTRACTS_DIR = Path(__file__).parent.parent
+
+# Records per task sent to a worker process
+BULK_CHUNK_SIZE = 256
+
+# Errors reported per invalid record
+MAX_RECORD_ERRORS = 20
+
 
 def load_json(file_path: Path) -> dict:
     """Load and parse JSON file"""
@@ -71,8 +93,177 @@ def validate_payload(definition: str, version: str, payload_file: str) -> None:
         sys.exit(1)
 
 
+@lru_cache(maxsize=None)
+def get_validator(definition: str, version: str):
+    """Load, check and compile a contract schema once per process"""
+    schema_path = CONTRACTS_DIR / definition / version / "inputs.schema.json"
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def iter_records(paths: List[str]) -> Iterator[Tuple[str, Optional[int], str]]:
+    """Yield (source, line number or None, raw JSON text) for every payload"""
+    for raw_path in paths:
+        if raw_path == "-":
+            for line_no, line in enumerate(sys.stdin, start=1):
+                if line.strip():
+                    yield ("<stdin>", line_no, line)
+            continue
+
+        path = Path(raw_path)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.suffix in (".json", ".jsonl") and p.is_file())
+        else:
+            files = [path]
+
+        for file_path in files:
+            if file_path.suffix == ".jsonl":
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    for line_no, line in enumerate(f, start=1):
+                        if line.strip():
+                            yield (str(file_path), line_no, line)
+            else:
+                yield (str(file_path), None, file_path.read_text(encoding='utf-8'))
+
+
+def iter_chunks(records: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(
+    chunk: List[Tuple[str, Optional[int], str]],
+    definition: Optional[str],
+    version: Optional[str]
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Validate a chunk of raw records; returns (valid count, failures)"""
+    valid = 0
+    failures = []
+
+    for source, line_no, text in chunk:
+        failure = {"source": source, "line": line_no}
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            failures.append({**failure, "errors": [{"path": "/", "message": f"Invalid JSON: {e}", "validator": "json"}]})
+            continue
+
+        record_def, record_ver = definition, version
+        if isinstance(payload, dict) and "inputs" in payload and "definition" in payload:
+            record_def = payload.get("definition")
+            record_ver = payload.get("version")
+            payload = payload["inputs"]
+
+        failure.update({"definition": record_def, "version": record_ver})
+        if not record_def or not record_ver:
+            failures.append({**failure, "errors": [{"path": "/", "message": "No definition/version for record", "validator": "contract"}]})
+            continue
+
+        try:
+            validator = get_validator(record_def, record_ver)
+        except (OSError, ValueError) as e:
+            failures.append({**failure, "errors": [{"path": "/", "message": f"Schema unavailable: {e}", "validator": "contract"}]})
+            continue
+
+        errors = sorted(validator.iter_errors(payload), key=lambda e: "/".join(str(p) for p in e.absolute_path))
+        if errors:
+            failures.append({**failure, "errors": [
+                {
+                    "path": "/" + "/".join(str(p) for p in e.absolute_path),
+                    "message": e.message,
+                    "validator": e.validator
+                }
+                for e in errors[:MAX_RECORD_ERRORS]
+            ]})
+        else:
+            valid += 1
+
+    return valid, failures
+
+
+def validate_bulk(
+    paths: List[str],
+    definition: Optional[str],
+    version: Optional[str],
+    workers: int
+) -> Dict[str, Any]:
+    """Validate many payloads in parallel and build a machine-readable summary"""
+    start = time.perf_counter()
+    valid = 0
+    failures: List[Dict[str, Any]] = []
+
+    chunks = iter_chunks(iter_records(paths), BULK_CHUNK_SIZE)
+    if workers <= 1:
+        results = (validate_chunk(chunk, definition, version) for chunk in chunks)
+        for chunk_valid, chunk_failures in results:
+            valid += chunk_valid
+            failures.extend(chunk_failures)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(validate_chunk, chunk, definition, version) for chunk in chunks]
+            for future in futures:
+                chunk_valid, chunk_failures = future.result()
+                valid += chunk_valid
+                failures.extend(chunk_failures)
+
+    elapsed = time.perf_counter() - start
+    total = valid + len(failures)
+    return {
+        "total": total,
+        "valid": valid,
+        "invalid": len(failures),
+        "workers": workers,
+        "elapsed_sec": round(elapsed, 4),
+        "throughput_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+        "failures": failures
+    }
+
+
+def bulk_main(argv: List[str]) -> None:
+    """Entry point for bulk mode"""
+    parser = argparse.ArgumentParser(
+        prog="validate_inputs.py bulk",
+        description="Validate many payloads (directories, .json, .jsonl, '-' for stdin JSONL)"
+    )
+    parser.add_argument("paths", nargs="+", help="Directories, .json/.jsonl files, or '-' for stdin")
+    parser.add_argument("--definition", help="Contract definition for bare payloads")
+    parser.add_argument("--version", help="Contract version for bare payloads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    parser.add_argument("--output", help="Write the JSON summary to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    summary = validate_bulk(args.paths, args.definition, args.version, max(args.workers, 1))
+
+    summary_json = json.dumps(summary, indent=2)
+    if args.output:
+        Path(args.output).write_text(summary_json + "\n", encoding='utf-8')
+    else:
+        print(summary_json)
+
+    icon = "✅" if summary["invalid"] == 0 else "❌"
+    print(
+        f"{icon} {summary['valid']}/{summary['total']} valid "
+        f"in {summary['elapsed_sec']}s ({summary['throughput_per_sec']}/s, {summary['workers']} workers)",
+        file=sys.stderr
+    )
+    sys.exit(0 if summary["invalid"] == 0 else 1)
+
+
 def main():
     """Main entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        bulk_main(sys.argv[2:])
+        return
+
     if len(sys.argv) < 4:
         print("Usage: python validate_inputs.py <definition> <version> <payload-file>")
         print("Example: python validate_inputs.py sitefit 1.0.0 examples/valid/minimal.json")
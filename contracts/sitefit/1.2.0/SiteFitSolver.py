@@ -0,0 +1,870 @@
+"""
+SiteFit House Placement Solver v1.2.0 (Grasshopper Python Script)
+
+Inputs (GH component names must match exactly):
+  parcel_polygon : Curve
+  house_polygon  : Curve
+  rotation_spec  : String (JSON: {"min":0,"max":180,"step":5})
+  grid_step      : Number
+  seed           : Integer
+  checkpoint     : String (optional JSON from a previous checkpoint_out)
+  time_budget_sec: Number (optional; stop and checkpoint after this long)
+  variants       : String (optional JSON list of sweep variants, see below)
+  distance_field : String (optional JSON {"max_error": m, "max_cells": n}, see below)
+
+Outputs:
+  placed_transforms : list[str]  (JSON transform objects)
+  placement_scores  : list[float]
+  kpis              : list[str]  (JSON metrics objects)
+  checkpoint_out    : str        (JSON search state, see below)
+  variant_outputs   : str        (JSON list of per-variant results, sweeps only)
+
+Checkpoints:
+  The grid is walked in a fixed order (x index outer, y index inner). When
+  time_budget_sec runs out the solver stops after the current grid cell
+  and returns the best placements so far plus checkpoint_out with
+  "complete": false - the next cell to evaluate and the current top-k.
+  Passing that JSON back as `checkpoint` continues the same search, so the
+  final result is identical to an uninterrupted run. A checkpoint whose
+  fingerprint doesn't match the inputs is ignored.
+
+Sweeps:
+  `variants` is a list of {"house": {"coordinates": [...]}, "rotation":
+  {...}} objects; either key may be omitted to use house_polygon /
+  rotation_spec. Each variant is solved in full (no checkpointing) over
+  one ParcelContext, so the parcel bounds and area, the grid cell
+  classification, the edge index and any distance field are built once
+  for the whole sweep.
+  variant_outputs holds one {"results": [...]} per variant, in order, and
+  the placement outputs stay empty.
+
+Symmetry:
+  A house footprint that maps onto itself when rotated 360/n degrees about
+  its centroid gives the same placement at angle a and a + 360/n, so only
+  the first angle of each such class in min..max is evaluated and reported
+  (the canonical angle). n is limited to divisors of the 20 boundary
+  samples, which then land on the same points for both angles - skipping
+  the repeats leaves every other result unchanged. Rectangles (n = 2) and
+  squares (n = 4) halve or quarter the search for full 180/360 ranges.
+
+Quick rejection:
+  Before a candidate's house curve is copied and transformed, a cascade of
+  cheap tests runs on its 20 boundary samples, pre-rotated once per angle:
+  (1) their bounding box against the parcel bounds, (2) their extent along
+  each outward normal of the parcel's convex hull - either rejects when a
+  sample would lie farther outside than the containment tolerance - and
+  (3) inscribed-circle acceptance: when the grid point's distance to the
+  parcel boundary exceeds the samples' radius about the centroid, they are
+  all inside without testing each one. Only the remaining candidates run
+  the exact containment test, so results are unchanged. The checkpoint's
+  "cascade" counts the candidates each stage decided.
+
+Distance field:
+  With `distance_field` set, the parcel's signed distance (positive
+  inside) is sampled on a float32 raster of spacing sqrt(2) * max_error,
+  so the nearest raster node of any point is within max_error of its true
+  distance. Setbacks are then read from the raster, and containment is
+  decided from it except within max_error of the containment tolerance,
+  where the exact Contains test still runs. When max_cells (memory: 4
+  bytes per cell) forces a coarser raster, the achieved bound is reported
+  as the `setback_error_m` metric. The last few rasters are kept in
+  scriptcontext.sticky, keyed by the parcel outline and settings, so the
+  checkpoint slices of a job solved by the same Rhino process build it
+  once.
+
+Usage:
+  - Drop a Python component on the Grasshopper canvas.
+  - Set the component to use this script (copy/paste).
+  - Configure nine inputs (C, C, S, N, I, S, N, S, S) and five outputs (generic).
+  - Ensure `json` is available (built-in in IronPython 3 / Rhino 8).
+"""
+
+import bisect
+import heapq
+import json
+import math
+import random
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+import Rhino
+import scriptcontext
+from Rhino.Geometry import Curve, PolylineCurve, Point3d, Vector3d, Transform, Plane
+from Rhino.Geometry import AreaMassProperties, BoundingBox
+from Rhino.Geometry import PointContainment
+from Grasshopper.Kernel import GH_RuntimeMessageLevel
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+
+class PlacementMetrics(object):
+    __slots__ = ("yard_area", "house_area", "min_setback", "parcel_utilization")
+
+    def __init__(self, yard_area: float, house_area: float, min_setback: float, parcel_utilization: float):
+        self.yard_area = yard_area
+        self.house_area = house_area
+        self.min_setback = min_setback
+        self.parcel_utilization = parcel_utilization
+
+
+class PlacementResult(object):
+    __slots__ = ("translation", "rotation", "score", "metrics")
+
+    def __init__(self, translation: Vector3d, rotation: float, score: float, metrics: PlacementMetrics):
+        self.translation = translation
+        self.rotation = rotation
+        self.score = score
+        self.metrics = metrics
+
+
+def _segment_distance(x: float, y: float, segment) -> float:
+    ax, ay, bx, by = segment
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    t = 0.0
+    if length2 > 0.0:
+        t = min(max(((x - ax) * dx + (y - ay) * dy) / length2, 0.0), 1.0)
+    return math.hypot(x - (ax + t * dx), y - (ay + t * dy))
+
+
+class _EdgeIndex(object):
+    """Parcel polyline segments bucketed on a uniform grid for nearest-edge queries
+
+    Small parcels are searched exhaustively; larger ones only scan the
+    buckets around the query point, ring by ring, until no unscanned
+    bucket can hold a closer segment.
+    """
+    BRUTE_FORCE_MAX = 32
+
+    def __init__(self, points):
+        self.segments = [
+            (points[i].X, points[i].Y, points[i + 1].X, points[i + 1].Y)
+            for i in range(len(points) - 1)
+        ]
+        self.buckets = None
+        if len(self.segments) <= self.BRUTE_FORCE_MAX:
+            return
+
+        xs = [p.X for p in points]
+        ys = [p.Y for p in points]
+        self.min_x, self.min_y = min(xs), min(ys)
+        extent = max(max(xs) - self.min_x, max(ys) - self.min_y, 1e-9)
+        # About one segment per bucket along the longer side
+        self.size = extent / math.ceil(math.sqrt(len(self.segments)))
+        self.nx = int((max(xs) - self.min_x) / self.size) + 1
+        self.ny = int((max(ys) - self.min_y) / self.size) + 1
+        self.buckets = {}
+        for index, (ax, ay, bx, by) in enumerate(self.segments):
+            for ix in range(self._bucket_x(min(ax, bx)), self._bucket_x(max(ax, bx)) + 1):
+                for iy in range(self._bucket_y(min(ay, by)), self._bucket_y(max(ay, by)) + 1):
+                    self.buckets.setdefault((ix, iy), []).append(index)
+
+    def _bucket_x(self, x: float) -> int:
+        return min(max(int((x - self.min_x) / self.size), 0), self.nx - 1)
+
+    def _bucket_y(self, y: float) -> int:
+        return min(max(int((y - self.min_y) / self.size), 0), self.ny - 1)
+
+    def segments_within(self, x: float, y: float, radius: float) -> list:
+        """Segments at most `radius` from (x, y)"""
+        if self.buckets is None:
+            candidates = self.segments
+        else:
+            seen = set()
+            for ix in range(self._bucket_x(x - radius), self._bucket_x(x + radius) + 1):
+                for iy in range(self._bucket_y(y - radius), self._bucket_y(y + radius) + 1):
+                    seen.update(self.buckets.get((ix, iy), ()))
+            candidates = [self.segments[index] for index in seen]
+        return [segment for segment in candidates if _segment_distance(x, y, segment) <= radius]
+
+    def distance(self, x: float, y: float) -> float:
+        if self.buckets is None:
+            return min(_segment_distance(x, y, segment) for segment in self.segments)
+
+        cx, cy = self._bucket_x(x), self._bucket_y(y)
+        best = float("inf")
+        seen = set()
+        ring = 0
+        while True:
+            for ix in range(cx - ring, cx + ring + 1):
+                for iy in range(cy - ring, cy + ring + 1):
+                    if max(abs(ix - cx), abs(iy - cy)) != ring:
+                        continue
+                    for index in self.buckets.get((ix, iy), ()):
+                        if index not in seen:
+                            seen.add(index)
+                            best = min(best, _segment_distance(x, y, self.segments[index]))
+            # Segments in farther rings are at least ring * size away
+            if best <= ring * self.size:
+                return best
+            if cx - ring <= 0 and cy - ring <= 0 and cx + ring >= self.nx - 1 and cy + ring >= self.ny - 1:
+                return best
+            ring += 1
+
+
+CONTAINMENT_TOLERANCE = 0.01
+DISTANCE_FIELD_MAX_CELLS = 1000000
+# Slack on the quick-reject/accept tests for rounding between the
+# pre-rotated samples and those of the transformed curve
+QUICK_TEST_EPSILON = 1e-6
+
+
+def _hull_halfplanes(points) -> List[Tuple[float, float, float]]:
+    """Convex hull of `points` as outward unit normals (nx, ny) and offsets d, inside where nx*x + ny*y <= d
+
+    Axis-aligned hull edges are left out: the bounding box test covers them.
+    """
+    unique = sorted(set((p.X, p.Y) for p in points))
+    if len(unique) < 3:
+        return []
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    # Monotone chain, counter-clockwise
+    lower, upper = [], []
+    for pt in unique:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], pt) <= 0.0:
+            lower.pop()
+        lower.append(pt)
+    for pt in reversed(unique):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], pt) <= 0.0:
+            upper.pop()
+        upper.append(pt)
+    hull = lower[:-1] + upper[:-1]
+
+    halfplanes = []
+    for (ax, ay), (bx, by) in zip(hull, hull[1:] + hull[:1]):
+        length = math.hypot(bx - ax, by - ay)
+        if length == 0.0 or ax == bx or ay == by:
+            continue
+        nx, ny = (by - ay) / length, (ax - bx) / length
+        halfplanes.append((nx, ny, nx * ax + ny * ay))
+    return halfplanes
+
+
+# Distance rasters outlive a solve in scriptcontext.sticky (most recent first)
+FIELD_CACHE_KEY = "sitefit.distance_fields"
+FIELD_CACHE_SIZE = 4
+
+
+class _DistanceField(object):
+    """Signed distance to the parcel boundary on a float32 raster (positive inside)
+
+    Distances are 1-Lipschitz, so a lookup at the nearest node is off by at
+    most half the node diagonal: `max_error` = spacing / sqrt(2). Built in
+    square tiles: only segments within (distance at the tile centre + tile
+    diagonal) can be nearest to a node of the tile, so each node compares a
+    handful of segments. The sign comes from each row's boundary crossings.
+    """
+    TILE = 8
+
+    def __init__(self, bounds, edges: "_EdgeIndex", max_error: float, max_cells: int):
+        spacing = max(max_error, 1e-4) * math.sqrt(2.0)
+        pad = CONTAINMENT_TOLERANCE
+        width = bounds.Max.X - bounds.Min.X + 2.0 * pad
+        height = bounds.Max.Y - bounds.Min.Y + 2.0 * pad
+        # Coarsen until the raster fits the cell budget
+        while (int(width / spacing) + 2) * (int(height / spacing) + 2) > max_cells:
+            spacing *= 1.1
+        self.spacing = spacing
+        self.max_error = spacing / math.sqrt(2.0)
+        self.origin_x = bounds.Min.X - pad
+        self.origin_y = bounds.Min.Y - pad
+        self.nx = int(width / spacing) + 2
+        self.ny = int(height / spacing) + 2
+
+        crossings = []
+        for j in range(self.ny):
+            y = self.origin_y + j * spacing
+            crossings.append(sorted(
+                ax + (y - ay) * (bx - ax) / (by - ay)
+                for ax, ay, bx, by in edges.segments
+                if (ay > y) != (by > y)
+            ))
+
+        self.values = array("f", bytes(4 * self.nx * self.ny))
+        for tile_j in range(0, self.ny, self.TILE):
+            rows = range(tile_j, min(tile_j + self.TILE, self.ny))
+            for tile_i in range(0, self.nx, self.TILE):
+                columns = range(tile_i, min(tile_i + self.TILE, self.nx))
+                centre_x = self.origin_x + (columns[0] + columns[-1]) * 0.5 * spacing
+                centre_y = self.origin_y + (rows[0] + rows[-1]) * 0.5 * spacing
+                diagonal = math.hypot(len(columns) - 1, len(rows) - 1) * spacing
+                near = edges.segments_within(centre_x, centre_y, edges.distance(centre_x, centre_y) + diagonal)
+                for j in rows:
+                    y = self.origin_y + j * spacing
+                    row_crossings = crossings[j]
+                    offset = j * self.nx
+                    for i in columns:
+                        x = self.origin_x + i * spacing
+                        distance = min(_segment_distance(x, y, segment) for segment in near)
+                        # Even-odd rule: inside when an odd number of crossings lie left of x
+                        inside = bisect.bisect_left(row_crossings, x) % 2 == 1
+                        self.values[offset + i] = distance if inside else -distance
+
+    @property
+    def cells(self) -> int:
+        return self.nx * self.ny
+
+    def value(self, x: float, y: float) -> Optional[float]:
+        """Signed distance at the nearest node, or None off the raster (outside the parcel)"""
+        i = int((x - self.origin_x) / self.spacing + 0.5)
+        j = int((y - self.origin_y) / self.spacing + 0.5)
+        if i < 0 or j < 0 or i >= self.nx or j >= self.ny:
+            return None
+        return self.values[j * self.nx + i]
+
+
+class ParcelContext(object):
+    """Parcel-level state shared by every solve over the same parcel
+
+    Holds what doesn't depend on the house or rotation: the bounds and
+    area, the containment of each grid cell (per grid_step, filled in
+    lazily), an edge index for setback distances and the convex hull for
+    quick rejection. A sweep builds one and passes it to solve_sitefit for
+    each variant.
+    """
+
+    def __init__(self, parcel: Curve):
+        if parcel is None or not parcel.IsClosed:
+            raise ValueError("parcel_polygon must be a closed curve")
+        self.curve = parcel
+        self.bounds = parcel.GetBoundingBox(True)
+        props = AreaMassProperties.Compute(parcel)
+        self.area = props.Area if props else 0.0
+        self.edges = None
+        self.hull = []
+        self.outline = None
+        success, polyline = parcel.TryGetPolyline()
+        if success and polyline is not None and len(polyline) > 1:
+            self.outline = tuple((pt.X, pt.Y) for pt in polyline)
+            self.edges = _EdgeIndex(list(polyline))
+            self.hull = _hull_halfplanes(polyline)
+        self._cells = {}
+        self._fields = {}
+
+    def distance_field(self, max_error: float, max_cells: int) -> Optional[_DistanceField]:
+        """Signed distance raster for these settings, or None if the parcel isn't a polyline
+
+        Reuses a raster built for the same outline and settings by an earlier
+        solve in this Rhino process (e.g. the previous checkpoint slice).
+        """
+        if self.edges is None:
+            return None
+        key = (max_error, max_cells)
+        if key not in self._fields:
+            cache = scriptcontext.sticky.setdefault(FIELD_CACHE_KEY, [])
+            cache_key = (self.outline, max_error, max_cells)
+            hit = next((entry for entry in cache if entry[0] == cache_key), None)
+            if hit is not None:
+                cache.remove(hit)
+            else:
+                hit = (cache_key, _DistanceField(self.bounds, self.edges, max_error, max_cells))
+            cache.insert(0, hit)
+            del cache[FIELD_CACHE_SIZE:]
+            self._fields[key] = hit[1]
+        return self._fields[key]
+
+    def grid_size(self, grid_step: float) -> Tuple[int, int]:
+        nx = int(math.floor((self.bounds.Max.X - self.bounds.Min.X + 1e-6) / grid_step)) + 1
+        ny = int(math.floor((self.bounds.Max.Y - self.bounds.Min.Y + 1e-6) / grid_step)) + 1
+        return nx, ny
+
+    def cell_point(self, grid_step: float, ix: int, iy: int) -> Point3d:
+        return Point3d(self.bounds.Min.X + ix * grid_step, self.bounds.Min.Y + iy * grid_step, 0.0)
+
+    def cell_inside(self, grid_step: float, cell: int) -> bool:
+        """Whether grid cell `cell` (x index outer) lies strictly inside the parcel"""
+        cells = self._cells.get(grid_step)
+        if cells is None:
+            nx, ny = self.grid_size(grid_step)
+            cells = self._cells[grid_step] = bytearray(nx * ny)  # 0 unknown, 1 inside, 2 not
+        if not cells[cell]:
+            ix, iy = divmod(cell, self.grid_size(grid_step)[1])
+            containment = self.curve.Contains(self.cell_point(grid_step, ix, iy), Plane.WorldXY, CONTAINMENT_TOLERANCE)
+            cells[cell] = 1 if containment == PointContainment.Inside else 2
+        return cells[cell] == 1
+
+    def distance_to_boundary(self, pt: Point3d) -> Optional[float]:
+        if self.edges is not None:
+            return self.edges.distance(pt.X, pt.Y)
+        success, u = self.curve.ClosestPoint(pt)
+        if not success:
+            return None
+        return pt.DistanceTo(self.curve.PointAt(u))
+
+
+def _is_polygon_inside(parcel: Curve, house: Curve, sample_count: int = 20,
+                       field: Optional[_DistanceField] = None) -> bool:
+    params = house.DivideByCount(sample_count, True)
+    if params is None:
+        return False
+
+    for t in params:
+        pt = house.PointAt(t)
+        if field is not None:
+            signed = field.value(pt.X, pt.Y)
+            if signed is None or signed + field.max_error < -CONTAINMENT_TOLERANCE:
+                return False
+            if signed - field.max_error >= -CONTAINMENT_TOLERANCE:
+                continue
+            # Too close to the tolerance band to call from the raster
+        containment = parcel.Contains(pt, Plane.WorldXY, CONTAINMENT_TOLERANCE)
+        if containment == PointContainment.Outside:
+            return False
+    return True
+
+
+def _calculate_min_distance(context: ParcelContext, house: Curve, sample_count: int = 20,
+                            field: Optional[_DistanceField] = None) -> float:
+    min_dist = float("inf")
+    params = house.DivideByCount(sample_count, True)
+    if params is None:
+        return min_dist
+
+    for t in params:
+        pt = house.PointAt(t)
+        if field is not None:
+            signed = field.value(pt.X, pt.Y)
+            dist = abs(signed) if signed is not None else context.distance_to_boundary(pt)
+        else:
+            dist = context.distance_to_boundary(pt)
+        if dist is not None and dist < min_dist:
+            min_dist = dist
+    return min_dist if min_dist != float("inf") else 0.0
+
+
+def _calculate_metrics(context: ParcelContext, house: Curve,
+                       field: Optional[_DistanceField] = None) -> PlacementMetrics:
+    house_props = AreaMassProperties.Compute(house)
+
+    parcel_area = context.area
+    house_area = house_props.Area if house_props else 0.0
+    yard_area = parcel_area - house_area
+
+    min_setback = _calculate_min_distance(context, house, field=field)
+    utilization = (house_area / parcel_area) if parcel_area > 0 else 0.0
+
+    return PlacementMetrics(yard_area, house_area, min_setback, utilization)
+
+
+TOP_K = 20
+CHECKPOINT_VERSION = 1
+
+# Rotational symmetry orders worth detecting: divisors of the 20 boundary
+# samples, so equivalent placements are measured at identical points
+SYMMETRY_ORDERS = (20, 10, 5, 4, 2)
+SYMMETRY_TOLERANCE = 1e-6
+
+
+def _rotational_symmetry(house: Curve, centroid: Point3d) -> int:
+    """Largest n in SYMMETRY_ORDERS with the house invariant under a 360/n rotation about its centroid (else 1)"""
+    success, polyline = house.TryGetPolyline()
+    if not success or polyline is None:
+        return 1
+    points = [(p.X - centroid.X, p.Y - centroid.Y) for p in polyline]
+    if len(points) > 1 and math.hypot(points[0][0] - points[-1][0], points[0][1] - points[-1][1]) <= SYMMETRY_TOLERANCE:
+        points.pop()
+    if len(points) < 3:
+        return 1
+    tolerance = SYMMETRY_TOLERANCE * max(max(math.hypot(x, y) for x, y in points), 1.0)
+
+    for n in SYMMETRY_ORDERS:
+        # A rotation maps vertices onto vertices, n at a time
+        if len(points) % n:
+            continue
+        c, s = math.cos(2.0 * math.pi / n), math.sin(2.0 * math.pi / n)
+        if all(
+            any(math.hypot(x * c - y * s - u, x * s + y * c - v) <= tolerance for u, v in points)
+            for x, y in points
+        ):
+            return n
+    return 1
+
+
+def _canonical_angles(min_rot: float, max_rot: float, step_rot: float, symmetry: int) -> List[float]:
+    """Swept angles, skipping any equivalent (mod 360/symmetry) to an earlier one"""
+    period = 360.0 / symmetry
+    angles = []
+    seen = set()
+    angle = min_rot
+    while angle <= max_rot + 1e-6:
+        residue = (angle - min_rot) % period
+        if period - residue <= 1e-6:
+            residue = 0.0
+        key = int(round(residue * 1e6))
+        if symmetry == 1 or key not in seen:
+            seen.add(key)
+            angles.append(angle)
+        angle += step_rot
+    return angles
+
+
+def _quick_test_extents(house: Curve, centroid: Point3d, angles: List[float], hull, sample_count: int = 20):
+    """Per angle, the rotated boundary samples' extent about the centroid, plus their radius
+
+    Each entry is (min_x, min_y, max_x, max_y, support), support holding
+    the samples' largest offset along each hull normal. Returns (None, 0.0)
+    when the house can't be sampled.
+    """
+    params = house.DivideByCount(sample_count, True)
+    if params is None:
+        return None, 0.0
+    offsets = []
+    for t in params:
+        pt = house.PointAt(t)
+        offsets.append((pt.X - centroid.X, pt.Y - centroid.Y))
+    radius = max(math.hypot(x, y) for x, y in offsets)
+
+    extents = []
+    for angle in angles:
+        c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        rotated = [(x * c - y * s, x * s + y * c) for x, y in offsets]
+        xs = [x for x, _ in rotated]
+        ys = [y for _, y in rotated]
+        support = tuple(max(hx * x + hy * y for x, y in rotated) for hx, hy, _ in hull)
+        extents.append((min(xs), min(ys), max(xs), max(ys), support))
+    return extents, radius
+
+
+def _search_fingerprint(parcel_bounds, parcel_area, house_area, min_rot, max_rot, step_rot, grid_step) -> str:
+    """Identifies the search a checkpoint belongs to (grid origin/extent, shapes, steps)"""
+    return "%.6f,%.6f,%.6f,%.6f|%.6f|%.6f|%g,%g,%g|%g" % (
+        parcel_bounds.Min.X, parcel_bounds.Min.Y, parcel_bounds.Max.X, parcel_bounds.Max.Y,
+        parcel_area, house_area, min_rot, max_rot, step_rot, grid_step,
+    )
+
+
+def _result_to_state(order: int, res: PlacementResult) -> list:
+    m = res.metrics
+    return [order, res.rotation, res.translation.X, res.translation.Y, res.score,
+            m.yard_area, m.house_area, m.min_setback, m.parcel_utilization]
+
+
+def _result_from_state(state: list) -> Tuple[int, PlacementResult]:
+    order, rotation, tx, ty, score, yard, house, setback, util = state
+    metrics = PlacementMetrics(yard, house, setback, util)
+    return int(order), PlacementResult(Vector3d(tx, ty, 0.0), rotation, score, metrics)
+
+
+def _distance_field_settings(distance_field) -> Optional[Tuple[float, int]]:
+    """(max_error, max_cells) from the distance_field input, or None when disabled"""
+    if not distance_field:
+        return None
+    try:
+        settings = json.loads(distance_field) if isinstance(distance_field, str) else distance_field
+    except ValueError:
+        return None
+    if not isinstance(settings, dict):
+        return None
+    max_error = float(settings.get("max_error", 0.05))
+    max_cells = int(settings.get("max_cells", DISTANCE_FIELD_MAX_CELLS))
+    if max_error <= 0.0 or max_cells <= 0:
+        return None
+    return max_error, min(max_cells, DISTANCE_FIELD_MAX_CELLS)
+
+
+def _load_checkpoint(checkpoint, fingerprint: str):
+    """Parse a checkpoint for this search, or None to start from scratch"""
+    if not checkpoint:
+        return None
+    try:
+        state = json.loads(checkpoint) if isinstance(checkpoint, str) else checkpoint
+    except ValueError:
+        return None
+    if not isinstance(state, dict):
+        return None
+    if state.get("v") != CHECKPOINT_VERSION or state.get("fingerprint") != fingerprint:
+        return None
+    return state
+
+
+def _calculate_score(metrics: PlacementMetrics) -> float:
+    score = 0.0
+    score += (metrics.yard_area / 1000.0) * 0.3
+    score += metrics.min_setback * 0.4
+
+    ideal_util = 0.4
+    util_score = 1.0 - abs(metrics.parcel_utilization - ideal_util) * 2.0
+    if util_score < 0.0:
+        util_score = 0.0
+    score += util_score * 0.3
+    return score
+
+
+# ----------------------------------------------------------------------------
+# Main solver (expects to be called inside Grasshopper Python component)
+# ----------------------------------------------------------------------------
+
+def solve_sitefit(parcel_polygon, house_polygon, rotation_spec, grid_step, seed,
+                  checkpoint=None, time_budget_sec=None, parcel_context=None, distance_field=None):
+    context = parcel_context if parcel_context is not None else ParcelContext(parcel_polygon)
+    if house_polygon is None or not house_polygon.IsClosed:
+        raise ValueError("house_polygon must be a closed curve")
+
+    try:
+        rot_data = json.loads(rotation_spec) if rotation_spec else {}
+    except ValueError:
+        rot_data = {}
+
+    min_rot = float(rot_data.get("min", 0.0))
+    max_rot = float(rot_data.get("max", 180.0))
+    step_rot = float(rot_data.get("step", 5.0))
+    step_rot = max(step_rot, 0.1)
+
+    random.seed(seed)
+
+    house_props = AreaMassProperties.Compute(house_polygon)
+    if house_props is None:
+        raise ValueError("Cannot compute house properties")
+    house_centroid = house_props.Centroid
+
+    grid_step = max(grid_step, 0.1)
+    nx, ny = context.grid_size(grid_step)
+
+    field_settings = _distance_field_settings(distance_field)
+    field = context.distance_field(*field_settings) if field_settings else None
+
+    fingerprint = _search_fingerprint(
+        context.bounds,
+        context.area,
+        house_props.Area,
+        min_rot, max_rot, step_rot, grid_step,
+    )
+    if field is not None:
+        # Raster setbacks differ from exact ones, so don't mix them across slices
+        fingerprint += "|sdf:%.6f" % field.max_error
+
+    symmetry = _rotational_symmetry(house_polygon, house_centroid)
+    angles = _canonical_angles(min_rot, max_rot, step_rot, symmetry)
+    if symmetry > 1:
+        # Earlier checkpoints also counted the skipped angles
+        fingerprint += "|sym:%d" % symmetry
+
+    extents, house_radius = _quick_test_extents(house_polygon, house_centroid, angles, context.hull)
+    reject_margin = CONTAINMENT_TOLERANCE + QUICK_TEST_EPSILON
+    min_x = context.bounds.Min.X - reject_margin
+    min_y = context.bounds.Min.Y - reject_margin
+    max_x = context.bounds.Max.X + reject_margin
+    max_y = context.bounds.Max.Y + reject_margin
+    hull_limits = [d + reject_margin for _, _, d in context.hull]
+
+    # Top-k as a min-heap of (score, -order): ties keep the earliest-evaluated placement
+    top = []
+    order = 0
+    evaluated = 0
+    start_cell = 0
+    cascade = {"bbox_rejected": 0, "hull_rejected": 0, "circle_accepted": 0, "exact_tested": 0}
+    state = _load_checkpoint(checkpoint, fingerprint)
+    if state is not None:
+        for item in state.get("top", []):
+            item_order, res = _result_from_state(item)
+            heapq.heappush(top, (res.score, -item_order, res))
+        order = int(state.get("order", 0))
+        evaluated = int(state.get("evaluated", 0))
+        start_cell = int(state.get("next_cell", 0))
+        for key, count in (state.get("cascade") or {}).items():
+            if key in cascade:
+                cascade[key] = int(count)
+
+    started = time.monotonic()
+    budget = float(time_budget_sec) if time_budget_sec else None
+
+    cell = start_cell
+    total_cells = nx * ny
+    while cell < total_cells:
+        if budget is not None and cell > start_cell and time.monotonic() - started >= budget:
+            break
+
+        ix, iy = divmod(cell, ny)
+        cell += 1
+        if not context.cell_inside(grid_step, ix * ny + iy):
+            continue
+        test_pt = context.cell_point(grid_step, ix, iy)
+        clearance = None
+
+        for index, angle in enumerate(angles):
+            evaluated += 1
+            if extents is not None:
+                lo_x, lo_y, hi_x, hi_y, support = extents[index]
+                if (test_pt.X + lo_x < min_x or test_pt.Y + lo_y < min_y
+                        or test_pt.X + hi_x > max_x or test_pt.Y + hi_y > max_y):
+                    cascade["bbox_rejected"] += 1
+                    continue
+                if any(hx * test_pt.X + hy * test_pt.Y + h > limit
+                       for (hx, hy, _), h, limit in zip(context.hull, support, hull_limits)):
+                    cascade["hull_rejected"] += 1
+                    continue
+
+            translation = Vector3d(test_pt - house_centroid)
+            t_translate = Transform.Translation(translation)
+            pivot = house_centroid + translation
+            t_rotate = Transform.Rotation(Rhino.RhinoMath.ToRadians(angle), Vector3d.ZAxis, pivot)
+            t_combined = t_rotate * t_translate
+
+            transformed_house = house_polygon.DuplicateCurve()
+            transformed_house.Transform(t_combined)
+
+            inside = False
+            if extents is not None:
+                if clearance is None:
+                    # The cell point is inside, so every sample within this distance of it is too
+                    clearance = context.distance_to_boundary(test_pt) or 0.0
+                inside = clearance > house_radius + QUICK_TEST_EPSILON
+            if inside:
+                cascade["circle_accepted"] += 1
+            else:
+                cascade["exact_tested"] += 1
+                inside = _is_polygon_inside(context.curve, transformed_house, field=field)
+
+            if inside:
+                metrics = _calculate_metrics(context, transformed_house, field=field)
+                score = _calculate_score(metrics)
+                entry = (score, -order, PlacementResult(translation, angle, score, metrics))
+                order += 1
+                if len(top) < TOP_K:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
+
+    ranked = sorted(top, key=lambda e: (-e[0], -e[1]))
+    checkpoint_out = json.dumps({
+        "v": CHECKPOINT_VERSION,
+        "fingerprint": fingerprint,
+        "next_cell": cell,
+        "total_cells": total_cells,
+        "order": order,
+        "evaluated": evaluated,
+        "symmetry": symmetry,
+        "cascade": cascade,
+        "top": [_result_to_state(-neg_order, res) for _, neg_order, res in ranked],
+        "complete": cell >= total_cells,
+    }, separators=(",", ":"))
+
+    results = [res for _, _, res in ranked]
+    if not results:
+        return [], [], [], checkpoint_out
+
+    transforms_json = []
+    scores = []
+    kpis_json = []
+    for res in results:
+        transform_obj = {
+            "rotation": {
+                "axis": "z",
+                "value": res.rotation,
+                "units": "deg",
+            },
+            "translation": {
+                "x": res.translation.X,
+                "y": res.translation.Y,
+                "z": 0.0,
+                "units": "m",
+            },
+            "scale": {
+                "uniform": 1.0,
+            },
+        }
+        transforms_json.append(json.dumps(transform_obj, separators=(",", ":")))
+
+        scores.append(res.score)
+
+        metrics_obj = {
+            "yard_area_m2": res.metrics.yard_area,
+            "min_setback_m": res.metrics.min_setback,
+            "house_area_m2": res.metrics.house_area,
+            "orientation_deg": res.rotation,
+            "parcel_utilization": res.metrics.parcel_utilization,
+        }
+        if field is not None:
+            metrics_obj["setback_error_m"] = field.max_error
+        kpis_json.append(json.dumps(metrics_obj, separators=(",", ":")))
+
+    return transforms_json, scores, kpis_json, checkpoint_out
+
+
+def _variant_house(variant, house_polygon):
+    house = variant.get("house")
+    if house is None:
+        return house_polygon
+    points = [Point3d(float(x), float(y), 0.0) for x, y in house["coordinates"]]
+    if points and (points[0].X != points[-1].X or points[0].Y != points[-1].Y):
+        points.append(points[0])
+    return PolylineCurve(points)
+
+
+def solve_sitefit_sweep(parcel_polygon, house_polygon, rotation_spec, grid_step, seed, variants,
+                        distance_field=None) -> str:
+    """Solve each house/rotation variant over one shared ParcelContext
+
+    Returns variant_outputs: a JSON list with one {"results": [...]} per
+    variant, in the order given.
+    """
+    variant_list = json.loads(variants) if isinstance(variants, str) else variants
+    if not isinstance(variant_list, list) or not variant_list:
+        raise ValueError("variants must be a non-empty JSON list")
+
+    context = ParcelContext(parcel_polygon)
+    outputs = []
+    for variant in variant_list:
+        house = _variant_house(variant, house_polygon)
+        rotation = variant.get("rotation")
+        spec = json.dumps(rotation) if rotation is not None else rotation_spec
+        transforms, scores, kpis, _ = solve_sitefit(
+            parcel_polygon, house, spec, grid_step, seed,
+            parcel_context=context, distance_field=distance_field
+        )
+        outputs.append({
+            "results": [
+                {"transform": json.loads(t), "score": score, "metrics": json.loads(k)}
+                for t, score, k in zip(transforms, scores, kpis)
+            ]
+        })
+    return json.dumps(outputs, separators=(",", ":"))
+
+
+# ----------------------------------------------------------------------------
+# Grasshopper entry point
+# ----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    try:
+        # Optional inputs: absent on components built before checkpointing / sweeps
+        sweep_variants = globals().get("variants")
+        if sweep_variants:
+            placed_transforms = []
+            placement_scores = []
+            kpis = []
+            checkpoint_out = None
+            variant_outputs = solve_sitefit_sweep(
+                parcel_polygon,
+                house_polygon,
+                rotation_spec,
+                grid_step,
+                seed,
+                sweep_variants,
+                globals().get("distance_field"),
+            )
+        else:
+            result_transforms, result_scores, result_kpis, result_checkpoint = solve_sitefit(
+                parcel_polygon,
+                house_polygon,
+                rotation_spec,
+                grid_step,
+                seed,
+                globals().get("checkpoint"),
+                globals().get("time_budget_sec"),
+                distance_field=globals().get("distance_field"),
+            )
+
+            placed_transforms = result_transforms
+            placement_scores = result_scores
+            kpis = result_kpis
+            checkpoint_out = result_checkpoint
+            variant_outputs = None
+
+    except Exception as exc:
+        ghenv.Component.AddRuntimeMessage(GH_RuntimeMessageLevel.Error, str(exc))
@@ -17,6 +17,9 @@ dependency "core" {
     servicebus_namespace_id     = "mock-sb-id"
     key_vault_id                = "mock-kv-id"
     key_vault_uri               = "https://mock-kv.vault.azure.net/"
+    storage_account_id          = "mock-storage-id"
+    storage_account_name        = "mockstorage"
+    artifacts_container_name    = "artifacts"
   }
 }
 
@@ -45,6 +48,11 @@ inputs = {
   key_vault_id  = dependency.core.outputs.key_vault_id
   key_vault_uri = dependency.core.outputs.key_vault_uri
   
+  # Blob store for offloaded results
+  storage_account_id   = dependency.core.outputs.storage_account_id
+  storage_account_name = dependency.core.outputs.storage_account_name
+  blob_container_name  = dependency.core.outputs.artifacts_container_name
+  
   # AppServer URL (internal) - using internal FQDN with standard HTTP port
   appserver_url = "http://kuduso-dev-appserver.internal.blackwave-77d88b66.westeurope.azurecontainerapps.io:80/gh/{definition}:{version}/solve"
   
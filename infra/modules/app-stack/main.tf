@@ -83,6 +83,20 @@ resource "azurerm_role_assignment" "worker_servicebus" {
   principal_id         = azurerm_user_assigned_identity.worker.principal_id
 }
 
+# Role Assignment: Worker - writes offloaded results and partition archives
+resource "azurerm_role_assignment" "worker_blob" {
+  scope                = var.storage_account_id
+  role_definition_name = "Storage Blob Data Contributor"
+  principal_id         = azurerm_user_assigned_identity.worker.principal_id
+}
+
+# Role Assignment: API - streams offloaded results
+resource "azurerm_role_assignment" "api_blob" {
+  scope                = var.storage_account_id
+  role_definition_name = "Storage Blob Data Reader"
+  principal_id         = azurerm_user_assigned_identity.api.principal_id
+}
+
 # API Container App (External)
 resource "azurerm_container_app" "api" {
   name                         = "${var.name_prefix}-${var.app_name}-api"
@@ -145,6 +159,12 @@ resource "azurerm_container_app" "api" {
         value = local.queue_name
       }
       
+      # Contracts are copied into the image (manifests, schemas)
+      env {
+        name  = "CONTRACTS_DIR"
+        value = "/app/contracts"
+      }
+      
       # Database URL from Key Vault
       env {
         name        = "DATABASE_URL"
@@ -205,6 +225,7 @@ resource "azurerm_container_app" "api" {
   depends_on = [
     azurerm_role_assignment.api_kv_secrets,
     azurerm_role_assignment.api_acr_pull,
+    azurerm_role_assignment.api_blob,
     azurerm_servicebus_queue.app_queue
   ]
 }
@@ -258,6 +279,12 @@ resource "azurerm_container_app" "worker" {
         value = local.queue_name
       }
       
+      # Contracts are copied into the image (manifests, schemas)
+      env {
+        name  = "CONTRACTS_DIR"
+        value = "/app/contracts"
+      }
+      
       # Database URL from Key Vault
       env {
         name        = "DATABASE_URL"
@@ -276,6 +303,17 @@ resource "azurerm_container_app" "worker" {
         value = azurerm_user_assigned_identity.worker.client_id
       }
       
+      # Blob store for offloaded results (readable by the API)
+      env {
+        name  = "BLOB_ACCOUNT"
+        value = var.storage_account_name
+      }
+      
+      env {
+        name  = "BLOB_CONTAINER"
+        value = var.blob_container_name
+      }
+      
       liveness_probe {
         transport = "TCP"
         port      = var.worker_port
@@ -311,10 +349,91 @@ resource "azurerm_container_app" "worker" {
     azurerm_role_assignment.worker_kv_secrets,
     azurerm_role_assignment.worker_acr_pull,
     azurerm_role_assignment.worker_servicebus,
+    azurerm_role_assignment.worker_blob,
     azurerm_servicebus_queue.app_queue
   ]
 }
 
+# Retention Job (Scheduled)
+# Tops up future job/result partitions and archives months past retention
+# (worker-fastapi/retention.py). Inserts fail once no partition covers
+# now(), so this must keep running.
+resource "azurerm_container_app_job" "retention" {
+  name                         = "${var.name_prefix}-${var.app_name}-retention"
+  location                     = var.location
+  resource_group_name          = var.resource_group_name
+  container_app_environment_id = var.container_apps_environment_id
+  
+  replica_timeout_in_seconds = 3600
+  replica_retry_limit        = 1
+  
+  schedule_trigger_config {
+    cron_expression          = var.retention_schedule
+    parallelism              = 1
+    replica_completion_count = 1
+  }
+  
+  identity {
+    type         = "UserAssigned"
+    identity_ids = [azurerm_user_assigned_identity.worker.id]
+  }
+  
+  registry {
+    server   = var.container_registry_server
+    identity = azurerm_user_assigned_identity.worker.id
+  }
+  
+  template {
+    container {
+      name    = "retention"
+      image   = "${var.container_registry_server}/${var.worker_image}"
+      cpu     = var.worker_cpu
+      memory  = var.worker_memory
+      command = ["python", "retention.py"]
+      
+      env {
+        name  = "RETENTION_MONTHS"
+        value = tostring(var.retention_months)
+      }
+      
+      env {
+        name        = "DATABASE_URL"
+        secret_name = "database-url"
+      }
+      
+      env {
+        name  = "AZURE_CLIENT_ID"
+        value = azurerm_user_assigned_identity.worker.client_id
+      }
+      
+      # Archives go to the same store as offloaded results
+      env {
+        name  = "BLOB_ACCOUNT"
+        value = var.storage_account_name
+      }
+      
+      env {
+        name  = "BLOB_CONTAINER"
+        value = var.blob_container_name
+      }
+    }
+  }
+  
+  secret {
+    name                = "database-url"
+    key_vault_secret_id = "${var.key_vault_uri}secrets/${var.database_url_secret_name}"
+    identity            = azurerm_user_assigned_identity.worker.id
+  }
+  
+  tags = local.tags
+  
+  depends_on = [
+    azurerm_role_assignment.worker_kv_secrets,
+    azurerm_role_assignment.worker_acr_pull,
+    azurerm_role_assignment.worker_blob
+  ]
+}
+
 # KEDA Scaler for Worker (using custom scale rule)
 # Note: The azurerm_container_app resource doesn't fully support KEDA scale rules in Terraform yet
 # We'll need to apply this via Azure CLI or ARM template as a post-deployment step
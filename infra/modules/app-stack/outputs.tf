@@ -89,3 +89,9 @@ output "deployment_summary" {
     worker_replicas = "${var.worker_min_replicas}-${var.worker_max_replicas}"
   }
 }
+
+# Retention Job
+output "retention_job_name" {
+  description = "Name of the scheduled partition retention job"
+  value       = azurerm_container_app_job.retention.name
+}
@@ -51,6 +51,22 @@ variable "key_vault_uri" {
   type        = string
 }
 
+variable "storage_account_id" {
+  description = "ID of the storage account holding offloaded results"
+  type        = string
+}
+
+variable "storage_account_name" {
+  description = "Name of the storage account holding offloaded results (worker BLOB_ACCOUNT)"
+  type        = string
+}
+
+variable "blob_container_name" {
+  description = "Blob container for offloaded results and partition archives (worker BLOB_CONTAINER)"
+  type        = string
+  default     = "artifacts"
+}
+
 variable "appserver_url" {
   description = "Internal URL of the shared AppServer"
   type        = string
@@ -131,6 +147,19 @@ variable "worker_port" {
   default     = 8080
 }
 
+# Retention Job (partition top-up and archive, worker image)
+variable "retention_schedule" {
+  description = "Cron schedule (UTC) for the job/result partition retention job"
+  type        = string
+  default     = "30 2 * * *"
+}
+
+variable "retention_months" {
+  description = "Months of job/result partitions kept before archiving"
+  type        = number
+  default     = 6
+}
+
 # KEDA Configuration
 variable "keda_queue_length" {
   description = "Queue length threshold for KEDA scaling"
@@ -48,7 +48,7 @@ echo "📦 Building API (FastAPI)..."
 docker build -t $ACR_SERVER/api-fastapi:$GIT_SHA \
   -t $ACR_SERVER/api-fastapi:latest \
   -f "$PROJECT_ROOT/apps/sitefit/api-fastapi/Dockerfile" \
-  "$PROJECT_ROOT/apps/sitefit/api-fastapi"
+  "$PROJECT_ROOT"
 
 echo "⬆️  Pushing API..."
 docker push $ACR_SERVER/api-fastapi:$GIT_SHA
@@ -61,7 +61,7 @@ echo "📦 Building Worker (FastAPI)..."
 docker build -t $ACR_SERVER/worker-fastapi:$GIT_SHA \
   -t $ACR_SERVER/worker-fastapi:latest \
   -f "$PROJECT_ROOT/apps/sitefit/worker-fastapi/Dockerfile" \
-  "$PROJECT_ROOT/apps/sitefit/worker-fastapi"
+  "$PROJECT_ROOT"
 
 echo "⬆️  Pushing Worker..."
 docker push $ACR_SERVER/worker-fastapi:$GIT_SHA
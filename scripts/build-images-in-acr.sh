@@ -47,7 +47,7 @@ az acr build \
   --image api-fastapi:latest \
   --file apps/sitefit/api-fastapi/Dockerfile \
   --platform linux \
-  apps/sitefit/api-fastapi
+  .
 
 echo "✓ API built"
 
@@ -61,7 +61,7 @@ az acr build \
   --image worker-fastapi:latest \
   --file apps/sitefit/worker-fastapi/Dockerfile \
   --platform linux \
-  apps/sitefit/worker-fastapi
+  .
 
 echo "✓ Worker built"
 
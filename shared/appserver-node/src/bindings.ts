@@ -289,6 +289,10 @@ function setValueByPath(obj: any, path: string, value: any): void {
   const simpleMatch = path.match(/^\$\.(\w+)$/);
   if (simpleMatch) {
     const [, key] = simpleMatch;
+    // A parameter that produced no data leaves the key unset (e.g. optional outputs)
+    if (Array.isArray(value) && value.length === 0) {
+      return;
+    }
     // For simple paths, if value is an array with one item, unwrap it
     if (Array.isArray(value) && value.length === 1) {
       obj[key] = value[0];
@@ -28,7 +28,8 @@ export async function computeSolve(
   inputs: any,
   definition: string,
   version: string,
-  correlationId: string
+  correlationId: string,
+  deadlineMs?: number
 ): Promise<any> {
   const startTime = Date.now();
 
@@ -43,7 +44,11 @@ export async function computeSolve(
     // Step 1: Enforce manifest limits and get timeout
     logger.debug({ event: 'compute.step1.manifest', cid: correlationId });
     const manifestStart = Date.now();
-    const { timeout_ms } = enforceManifest(inputs, definition, version, correlationId);
+    const manifestLimits = enforceManifest(inputs, definition, version, correlationId);
+    // Never run past the job's absolute deadline
+    const timeout_ms = deadlineMs !== undefined
+      ? Math.max(0, Math.min(manifestLimits.timeout_ms, deadlineMs - Date.now()))
+      : manifestLimits.timeout_ms;
     logger.debug({ 
       event: 'compute.step1.complete', 
       cid: correlationId, 
@@ -1,11 +1,15 @@
 import express, { Request, Response } from 'express';
 import cors from 'cors';
 import { randomUUID } from 'crypto';
+import { context, trace, SpanKind, SpanStatusCode } from '@opentelemetry/api';
 import { validateInputs, validateOutputs } from './validate.js';
 import { mockSolve } from './mockSolver.js';
 import { computeSolve } from './computeSolver.js';
 import { checkComputeHealth } from './rhinoComputeClient.js';
 import { logger } from './logger.js';
+import { initTracing, tracer, extractContext } from './tracing.js';
+
+initTracing('appserver-node');
 
 const app = express();
 const PORT = process.env.PORT || 8080;
@@ -51,6 +55,23 @@ app.post('/gh/:def\\::ver/solve', async (req: Request, res: Response) => {
   const { def, ver } = req.params;
   const startTime = Date.now();
 
+  // Absolute job deadline propagated by the worker (ISO-8601)
+  const deadlineHeader = req.header('x-deadline');
+  const deadlineMs = deadlineHeader ? Date.parse(deadlineHeader) : NaN;
+  const deadline = Number.isNaN(deadlineMs) ? undefined : deadlineMs;
+
+  // Child of the worker's appserver.solve span (traceparent header)
+  const span = tracer.startSpan('appserver.solve', {
+    kind: SpanKind.SERVER,
+    attributes: {
+      'appserver.definition': def,
+      'appserver.version': ver,
+      'appserver.mode': USE_COMPUTE ? 'compute' : 'mock',
+      'correlation_id': cid
+    }
+  }, extractContext(req.headers));
+  const solveContext = trace.setSpan(context.active(), span);
+
   logger.info({ 
     cid, 
     def, 
@@ -62,6 +83,14 @@ app.post('/gh/:def\\::ver/solve', async (req: Request, res: Response) => {
   });
 
   try {
+    if (deadline !== undefined && startTime >= deadline) {
+      throw {
+        code: 504,
+        message: 'Job deadline exceeded before solve',
+        details: [{ deadline: deadlineHeader }]
+      };
+    }
+
     // Validate inputs against contract schema
     const validationStart = Date.now();
     const inputs = validateInputs(def, ver, req.body);
@@ -78,10 +107,10 @@ app.post('/gh/:def\\::ver/solve', async (req: Request, res: Response) => {
     let result;
     if (USE_COMPUTE) {
       logger.debug({ cid, event: 'routing.compute' });
-      result = await computeSolve(inputs, def, ver, cid);
+      result = await context.with(solveContext, () => computeSolve(inputs, def, ver, cid, deadline));
     } else {
       logger.debug({ cid, event: 'routing.mock' });
-      result = await mockSolve(inputs, def, ver);
+      result = await context.with(solveContext, () => mockSolve(inputs, def, ver));
     }
     
     logger.debug({ 
@@ -114,10 +143,14 @@ app.post('/gh/:def\\::ver/solve', async (req: Request, res: Response) => {
       mode: USE_COMPUTE ? 'compute' : 'mock'
     });
 
+    span.setAttribute('http.status_code', 200);
     res.status(200).json(result);
   } catch (error: any) {
     const duration_ms = Date.now() - startTime;
     const code = error.code || 500;
+
+    span.setAttribute('http.status_code', code);
+    span.setStatus({ code: SpanStatusCode.ERROR, message: error.message });
     
     logger.error({ 
       cid, 
@@ -137,6 +170,8 @@ app.post('/gh/:def\\::ver/solve', async (req: Request, res: Response) => {
       details: error.details || [],
       correlation_id: cid
     });
+  } finally {
+    span.end();
   }
 });
 
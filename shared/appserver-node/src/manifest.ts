@@ -35,6 +35,12 @@ interface ManifestValidation {
   reject_additional_properties?: boolean;
 }
 
+interface ManifestSweep {
+  supported?: boolean;
+  max_variants?: number;
+  timeout_sec?: number;
+}
+
 interface ManifestDefinition {
   timeout_sec: number;
   limits?: ManifestLimits;
@@ -44,6 +50,7 @@ interface ManifestDefinition {
     seed_required?: boolean;
   };
   validation?: ManifestValidation;
+  sweep?: ManifestSweep;
 }
 
 /**
@@ -92,15 +99,41 @@ export function enforceManifest(
   // These should be handled by JSON schema validation in the API layer.
   // The manifest's role is limited to operational limits like timeout_sec.
 
+  // A sweep solves every variant in one call: timeout_sec per variant,
+  // capped by the sweep's own timeout
+  let timeout_sec = manifest.timeout_sec;
+  const variants = Array.isArray(inputs?.variants) ? inputs.variants.length : 0;
+  if (variants > 0) {
+    if (!manifest.sweep?.supported) {
+      throw {
+        code: 400,
+        message: `Sweeps not supported: ${def}@${ver}`,
+        details: [{ variants }]
+      };
+    }
+    if (manifest.sweep.max_variants !== undefined && variants > manifest.sweep.max_variants) {
+      throw {
+        code: 400,
+        message: `Too many sweep variants: ${variants} > ${manifest.sweep.max_variants}`,
+        details: [{ variants, max_variants: manifest.sweep.max_variants }]
+      };
+    }
+    timeout_sec = Math.min(
+      manifest.timeout_sec * variants,
+      manifest.sweep.timeout_sec ?? manifest.timeout_sec * variants
+    );
+  }
+
   logger.info({
     event: 'manifest.validated',
     cid: correlationId,
-    timeout_sec: manifest.timeout_sec
+    timeout_sec,
+    variants
   });
 
   // Return timeout in milliseconds for the compute call
   return {
-    timeout_ms: manifest.timeout_sec * 1000
+    timeout_ms: timeout_sec * 1000
   };
 }
 
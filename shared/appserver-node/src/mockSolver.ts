@@ -14,6 +14,48 @@ interface MockSolveInputs {
   };
   grid_step?: number;
   seed?: number;
+  variants?: Array<{
+    house?: any;
+    rotation?: {
+      min?: number;
+      max?: number;
+      step?: number;
+    };
+  }>;
+}
+
+function mockPlacement(seed: number, theta: number, id: string) {
+  const dx = seed % 10;
+  const dy = seed % 10;
+
+  return {
+    id,
+    transform: {
+      rotation: {
+        axis: 'z' as const,
+        value: theta,
+        units: 'deg' as const
+      },
+      translation: {
+        x: dx,
+        y: dy,
+        z: 0,
+        units: 'm' as const
+      },
+      scale: {
+        uniform: 1
+      }
+    },
+    score: 85.5 + (seed % 10),
+    metrics: {
+      area_m2: 100,
+      overlap_pct: 0,
+      distance_to_edge_m: 2.5,
+      seed,
+      mock: true
+    },
+    tags: ['mock', 'feasible', 'optimal']
+  };
 }
 
 export async function mockSolve(
@@ -29,40 +71,19 @@ export async function mockSolve(
 
   // Deterministic mock result based on seed
   const theta = (seed * 15) % 360;
-  const dx = seed % 10;
-  const dy = seed % 10;
+
+  // Sweeps: one result set per variant (at the variant's rotation.min), top-level results empty
+  const variants = Array.isArray(inputs.variants)
+    ? inputs.variants.map((variant, index) => ({
+        results: [
+          mockPlacement(seed, variant.rotation?.min ?? theta, `result-${seed}-${index}`)
+        ]
+      }))
+    : undefined;
 
   const result = {
-    results: [
-      {
-        id: `result-${seed}`,
-        transform: {
-          rotation: {
-            axis: 'z' as const,
-            value: theta,
-            units: 'deg' as const
-          },
-          translation: {
-            x: dx,
-            y: dy,
-            z: 0,
-            units: 'm' as const
-          },
-          scale: {
-            uniform: 1
-          }
-        },
-        score: 85.5 + (seed % 10),
-        metrics: {
-          area_m2: 100,
-          overlap_pct: 0,
-          distance_to_edge_m: 2.5,
-          seed,
-          mock: true
-        },
-        tags: ['mock', 'feasible', 'optimal']
-      }
-    ],
+    results: variants ? [] : [mockPlacement(seed, theta, `result-${seed}`)],
+    ...(variants ? { variants } : {}),
     artifacts: [], // No artifacts in mock mode
     metadata: {
       definition,
@@ -3,7 +3,9 @@
  * Handles HTTP communication with Rhino.Compute server
  */
 
+import { context, trace, SpanKind, SpanStatusCode } from '@opentelemetry/api';
 import { logger } from './logger.js';
+import { tracer, injectContext } from './tracing.js';
 
 const COMPUTE_URL = process.env.COMPUTE_URL || 'http://localhost:8081';
 const COMPUTE_API_KEY = process.env.COMPUTE_API_KEY || '';
@@ -64,19 +66,27 @@ export async function callGrasshopper(
   const controller = new AbortController();
   const timeoutId = setTimeout(() => controller.abort(), timeoutMs);
 
+  const span = tracer.startSpan('rhino.compute.grasshopper', {
+    kind: SpanKind.CLIENT,
+    attributes: { 'http.url': url, 'correlation_id': correlationId }
+  });
+  // Propagate the trace to Rhino.Compute (ignored if it doesn't trace)
+  const headers = injectContext({
+    'Content-Type': 'application/json',
+    'RhinoComputeKey': COMPUTE_API_KEY,
+    'x-correlation-id': correlationId
+  }, trace.setSpan(context.active(), span));
+
   try {
     const response = await fetch(url, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'RhinoComputeKey': COMPUTE_API_KEY,
-        'x-correlation-id': correlationId
-      },
+      headers,
       body: JSON.stringify(request),
       signal: controller.signal
     });
 
     clearTimeout(timeoutId);
+    span.setAttribute('http.status_code', response.status);
 
     if (!response.ok) {
       const errorText = await response.text();
@@ -150,6 +160,7 @@ export async function callGrasshopper(
 
   } catch (error: any) {
     clearTimeout(timeoutId);
+    span.setStatus({ code: SpanStatusCode.ERROR, message: error.message });
 
     if (error.name === 'AbortError') {
       logger.error({
@@ -172,6 +183,8 @@ export async function callGrasshopper(
       url
     });
     throw new RhinoComputeError('Failed to connect to Compute', 503, { error: error.message });
+  } finally {
+    span.end();
   }
 }
 
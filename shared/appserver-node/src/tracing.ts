@@ -0,0 +1,98 @@
+/**
+ * OpenTelemetry tracing for the AppServer
+ * Continues the worker's trace (W3C traceparent header) and forwards it to Rhino.Compute.
+ *
+ * TRACING_EXPORTER: none (default) | console | file (JSON lines appended to TRACING_FILE,
+ * same layout as the Python services' file exporter)
+ */
+
+import { appendFile } from 'node:fs';
+import { context, propagation, trace, SpanKind, SpanStatusCode, type Context } from '@opentelemetry/api';
+import {
+  ExportResultCode,
+  W3CTraceContextPropagator,
+  hrTimeToMilliseconds,
+  type ExportResult
+} from '@opentelemetry/core';
+import { Resource } from '@opentelemetry/resources';
+import {
+  BatchSpanProcessor,
+  ConsoleSpanExporter,
+  type ReadableSpan,
+  type SpanExporter,
+  type SpanProcessor
+} from '@opentelemetry/sdk-trace-base';
+import { NodeTracerProvider } from '@opentelemetry/sdk-trace-node';
+
+const TRACING_EXPORTER = (process.env.TRACING_EXPORTER || 'none').toLowerCase();
+const TRACING_FILE = process.env.TRACING_FILE || '/tmp/kuduso-traces.jsonl';
+
+export const tracer = trace.getTracer('kuduso.appserver');
+
+/**
+ * Append finished spans to a local file, one JSON object per line
+ */
+class FileSpanExporter implements SpanExporter {
+  constructor(private path: string) {}
+
+  export(spans: ReadableSpan[], resultCallback: (result: ExportResult) => void): void {
+    const lines = spans.map(span => JSON.stringify({
+      name: span.name,
+      context: {
+        trace_id: `0x${span.spanContext().traceId}`,
+        span_id: `0x${span.spanContext().spanId}`
+      },
+      kind: `SpanKind.${SpanKind[span.kind]}`,
+      parent_id: span.parentSpanId ? `0x${span.parentSpanId}` : null,
+      start_time: new Date(hrTimeToMilliseconds(span.startTime)).toISOString(),
+      end_time: new Date(hrTimeToMilliseconds(span.endTime)).toISOString(),
+      status: { status_code: SpanStatusCode[span.status.code] },
+      attributes: span.attributes,
+      resource: { attributes: span.resource.attributes }
+    }));
+
+    appendFile(this.path, lines.join('\n') + '\n', (error) => {
+      resultCallback(error
+        ? { code: ExportResultCode.FAILED, error }
+        : { code: ExportResultCode.SUCCESS });
+    });
+  }
+
+  shutdown(): Promise<void> {
+    return Promise.resolve();
+  }
+}
+
+/**
+ * Register the tracer provider. Registered even without an exporter so incoming
+ * trace context is still continued and forwarded to Rhino.Compute.
+ */
+export function initTracing(serviceName: string): void {
+  const spanProcessors: SpanProcessor[] = [];
+  if (TRACING_EXPORTER === 'console') {
+    spanProcessors.push(new BatchSpanProcessor(new ConsoleSpanExporter()));
+  } else if (TRACING_EXPORTER === 'file') {
+    spanProcessors.push(new BatchSpanProcessor(new FileSpanExporter(TRACING_FILE)));
+  }
+
+  const provider = new NodeTracerProvider({
+    resource: new Resource({ 'service.name': serviceName }),
+    spanProcessors
+  });
+  provider.register({ propagator: new W3CTraceContextPropagator() });
+}
+
+/**
+ * Trace context carried by incoming request headers
+ */
+export function extractContext(headers: Record<string, unknown>): Context {
+  return propagation.extract(context.active(), headers);
+}
+
+/**
+ * Write traceparent/tracestate for `ctx` into outgoing request headers
+ */
+export function injectContext(headers: Record<string, string>, ctx: Context = context.active()): Record<string, string> {
+  propagation.inject(ctx, headers);
+  return headers;
+}
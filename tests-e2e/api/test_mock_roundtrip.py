@@ -10,13 +10,18 @@ Tests the complete flow:
 
 import pytest
 import httpx
+import asyncio
 import json
+import jsonschema
 import os
+import time
 from pathlib import Path
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8081")
 APPSERVER_URL = os.getenv("APPSERVER_URL", "http://localhost:8080")
 CONTRACTS_DIR = Path(__file__).parent.parent.parent / "contracts"
+# Queued jobs (sweeps) are solved by the worker
+WORKER_TIMEOUT_SEC = float(os.getenv("WORKER_TIMEOUT_SEC", "60"))
 
 
 def load_example(definition: str, version: str, example_type: str, filename: str):
@@ -128,6 +133,59 @@ async def test_invalid_input_bad_crs():
         assert response.status_code == 400
 
 
+@pytest.mark.asyncio
+async def test_unknown_contract_rejected():
+    """Test submissions for unknown or path-like contract versions are refused"""
+    
+    inputs = load_example("sitefit", "1.0.0", "valid", "minimal.json")
+    
+    async with httpx.AsyncClient() as client:
+        for version, expected in (("9.9.9", 400), ("../1.0.0", 422), ("..", 400)):
+            response = await client.post(
+                f"{API_BASE_URL}/jobs/run",
+                json={
+                    "app_id": "sitefit",
+                    "definition": "sitefit",
+                    "version": version,
+                    "inputs": inputs
+                },
+                timeout=10.0
+            )
+            assert response.status_code == expected, version
+
+
+@pytest.mark.asyncio
+async def test_internal_inputs_rejected():
+    """Test inputs reserved for the worker/API can't be submitted"""
+    
+    inputs = load_example("sitefit", "1.2.0", "valid", "minimal.json")
+    
+    async with httpx.AsyncClient() as client:
+        for name, value in (
+            ("checkpoint", {"next_cell": 0}),
+            ("time_budget_sec", 1),
+            ("variants", [{"rotation": {"min": 0, "max": 90, "step": 15}}]),
+            ("distance_field", {"max_error": 0.1})
+        ):
+            response = await client.post(
+                f"{API_BASE_URL}/jobs/run",
+                json={
+                    "app_id": "sitefit",
+                    "definition": "sitefit",
+                    "version": "1.2.0",
+                    "inputs": dict(inputs, **{name: value})
+                },
+                timeout=10.0
+            )
+            assert response.status_code == 400, name
+            errors = response.json()["detail"]["errors"]
+            assert errors == [{
+                "path": f"/{name}",
+                "message": f"'{name}' is set by the service and can't be submitted",
+                "validator": "internal"
+            }]
+
+
 @pytest.mark.asyncio
 async def test_appserver_direct_call():
     """Test calling AppServer directly (bypassing API)"""
@@ -180,6 +238,11 @@ async def test_correlation_id_propagation():
         
         # API should return the correlation ID
         assert data.get("correlation_id") == test_cid
+        
+        # ...and persist it for status lookups
+        status_response = await client.get(f"{API_BASE_URL}/jobs/status/{data['job_id']}")
+        assert status_response.status_code == 200
+        assert status_response.json().get("correlation_id") == test_cid
 
 
 @pytest.mark.asyncio
@@ -233,3 +296,217 @@ async def test_deterministic_results():
         # Compare results (should be identical for same seed)
         assert results[0]["results"][0]["transform"] == results[1]["results"][0]["transform"]
         assert results[0]["metadata"]["seed"] == results[1]["metadata"]["seed"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_status():
+    """Test statuses for several jobs in one request"""
+    
+    inputs = load_example("sitefit", "1.0.0", "valid", "minimal.json")
+    unknown_id = "00000000-0000-4000-8000-000000000000"
+    
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{API_BASE_URL}/jobs/run",
+            json={
+                "app_id": "sitefit",
+                "definition": "sitefit",
+                "version": "1.0.0",
+                "inputs": inputs
+            },
+            timeout=10.0
+        )
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        
+        bulk_response = await client.post(
+            f"{API_BASE_URL}/jobs/status:bulk",
+            json={"job_ids": [job_id, unknown_id]},
+            timeout=10.0
+        )
+        assert bulk_response.status_code == 200
+        data = bulk_response.json()
+        
+        assert [s["job_id"] for s in data["statuses"]] == [job_id]
+        assert data["missing"] == [unknown_id]
+
+
+@pytest.mark.asyncio
+async def test_job_listing_pagination():
+    """Test keyset pagination of the filtered job listing"""
+    
+    inputs = load_example("sitefit", "1.0.0", "valid", "minimal.json")
+    limit = 2
+    
+    async with httpx.AsyncClient() as client:
+        # Seed more jobs than one page holds (distinct seeds, so none are deduplicated)
+        submitted = []
+        for seed in range(limit + 1):
+            response = await client.post(
+                f"{API_BASE_URL}/jobs/run",
+                json={
+                    "app_id": "sitefit",
+                    "definition": "sitefit",
+                    "version": "1.0.0",
+                    "inputs": {**inputs, "seed": int.from_bytes(os.urandom(4), "big") * 10 + seed}
+                },
+                timeout=10.0
+            )
+            assert response.status_code == 200
+            submitted.append(response.json()["job_id"])
+        
+        first = await client.get(
+            f"{API_BASE_URL}/jobs",
+            params={"definition": "sitefit", "limit": limit},
+            timeout=10.0
+        )
+        assert first.status_code == 200
+        page = first.json()
+        assert len(page["jobs"]) == limit
+        assert page["next_cursor"], "more jobs than limit must yield a second page"
+        
+        second = await client.get(
+            f"{API_BASE_URL}/jobs",
+            params={"definition": "sitefit", "limit": limit, "cursor": page["next_cursor"]},
+            timeout=10.0
+        )
+        assert second.status_code == 200
+        next_page = second.json()
+        assert 0 < len(next_page["jobs"]) <= limit
+        
+        listed = page["jobs"] + next_page["jobs"]
+        ids = [job["job_id"] for job in listed]
+        assert len(set(ids)) == len(ids), "pages overlap"
+        keys = [(job["created_at"], job["job_id"]) for job in listed]
+        assert keys == sorted(keys, reverse=True)
+        # The jobs just submitted are the newest, so both pages hold them
+        assert set(submitted) <= set(ids)
+        
+        bad = await client.get(f"{API_BASE_URL}/jobs", params={"cursor": "not-a-cursor"}, timeout=10.0)
+        assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_preview_in_contract_shape():
+    """Test a preview submission answers with low-resolution outputs matching outputs.schema.json"""
+    
+    # A fresh seed so the submission isn't answered from a cached result
+    inputs = dict(load_example("sitefit", "1.2.0", "valid", "minimal.json"), seed=int.from_bytes(os.urandom(4), "big"))
+    with open(CONTRACTS_DIR / "sitefit" / "1.2.0" / "outputs.schema.json") as f:
+        outputs_schema = json.load(f)
+    
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{API_BASE_URL}/jobs/run",
+            json={
+                "app_id": "sitefit",
+                "definition": "sitefit",
+                "version": "1.2.0",
+                "inputs": inputs,
+                "preview": True
+            },
+            timeout=10.0
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "queued"
+        
+        preview = data["preview"]
+        jsonschema.validate(preview, outputs_schema)
+        assert preview["results"]
+        assert preview["metadata"]["engine"]["preview"] is True
+        assert preview["metadata"]["definition"] == "sitefit"
+        assert preview["metadata"]["version"] == "1.2.0"
+
+
+@pytest.mark.asyncio
+async def test_frontend_payload_gets_preview():
+    """Test the frontend's submission (apps/sitefit/frontend/src/pages/index.tsx) is answered with a preview"""
+    
+    # Mirrors the page's payload; a fresh seed so it isn't answered from a cached result
+    payload = {
+        "app_id": "sitefit",
+        "definition": "sitefit",
+        "version": "1.2.0",
+        "inputs": {
+            "crs": "EPSG:5514",
+            "parcel": {"coordinates": [[0, 0], [20, 0], [20, 30], [0, 30], [0, 0]]},
+            "house": {"coordinates": [[0, 0], [10, 0], [10, 8], [0, 8], [0, 0]]},
+            "seed": int.from_bytes(os.urandom(4), "big")
+        },
+        "preview": True
+    }
+    
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f"{API_BASE_URL}/jobs/run", json=payload, timeout=10.0)
+        assert response.status_code == 200
+        data = response.json()
+        assert data.get("preview"), data
+        assert data["preview"]["metadata"]["engine"]["preview"] is True
+
+
+@pytest.mark.asyncio
+async def test_sweep_creates_variant_jobs():
+    """Test a sweep returns one job per variant, the worker completes them and non-variant overrides are rejected"""
+    
+    inputs = dict(load_example("sitefit", "1.2.0", "valid", "minimal.json"), seed=int.from_bytes(os.urandom(4), "big"))
+    variants = [{"rotation": {"min": 0, "max": 90, "step": 15}}, {"rotation": {"min": 90, "max": 180, "step": 15}}]
+    
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{API_BASE_URL}/jobs/sweep",
+            json={
+                "app_id": "sitefit",
+                "definition": "sitefit",
+                "version": "1.2.0",
+                "inputs": inputs,
+                "variants": variants
+            },
+            timeout=10.0
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["variant_job_ids"]) == len(variants)
+        
+        # Poll until the worker has solved the sweep and fanned out its variants
+        job_ids = [data["job_id"]] + data["variant_job_ids"]
+        deadline = time.monotonic() + WORKER_TIMEOUT_SEC
+        while True:
+            bulk_response = await client.post(
+                f"{API_BASE_URL}/jobs/status:bulk",
+                json={"job_ids": job_ids},
+                timeout=10.0
+            )
+            assert bulk_response.status_code == 200
+            bulk = bulk_response.json()
+            assert bulk["missing"] == []
+            statuses = {s["job_id"]: s["status"] for s in bulk["statuses"]}
+            if all(status in ("succeeded", "failed", "cancelled") for status in statuses.values()):
+                break
+            assert time.monotonic() < deadline, statuses
+            await asyncio.sleep(1)
+        assert set(statuses.values()) == {"succeeded"}, statuses
+        
+        for variant_job_id, variant in zip(data["variant_job_ids"], variants):
+            result_response = await client.get(f"{API_BASE_URL}/jobs/result/{variant_job_id}", timeout=10.0)
+            assert result_response.status_code == 200
+            result = result_response.json()
+            assert len(result["results"]) >= 1
+            assert result["metadata"]["sweep_job_id"] == data["job_id"]
+        
+        sweep_response = await client.get(f"{API_BASE_URL}/jobs/result/{data['job_id']}", timeout=10.0)
+        assert sweep_response.status_code == 200
+        assert [v["job_id"] for v in sweep_response.json()["variants"]] == data["variant_job_ids"]
+        
+        bad = await client.post(
+            f"{API_BASE_URL}/jobs/sweep",
+            json={
+                "app_id": "sitefit",
+                "definition": "sitefit",
+                "version": "1.2.0",
+                "inputs": inputs,
+                "variants": [{"seed": 7}]
+            },
+            timeout=10.0
+        )
+        assert bad.status_code == 400
@@ -0,0 +1,256 @@
+"""
+EXPLAIN-based regression tests for query-matched indexes
+
+Seeds a tenant's worth of jobs/results, then checks the plans of the
+queries issued by apps/sitefit/{api,worker}-fastapi/database.py:
+1. Duplicate check by inputs_hash is answered from the partial covering index
+2. Attempt lookups by job id are answered from the covering id index
+3. The status endpoint is answered from the job_status primary key alone
+4. Result bodies are read from the job's month partition alone
+5. result accepts exactly one row per job
+"""
+
+import json
+import os
+import uuid
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+SEED_JOBS = int(os.getenv("SEED_JOBS", "5000"))
+SEED_HASHES = 50
+STATUSES = ("queued", "running", "succeeded", "failed")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="DATABASE_URL not set")
+
+psycopg2.extras.register_uuid()
+
+# Same SQL as Database.check_duplicate_by_hash (api-fastapi)
+DUPLICATE_BY_HASH_SQL = """
+    SELECT
+        id::text as job_id,
+        status,
+        created_at
+    FROM job
+    WHERE inputs_hash = %s
+    AND status IN ('queued', 'running', 'succeeded')
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+# Same SQL as Database.get_job_attempts (worker-fastapi)
+JOB_ATTEMPTS_SQL = "SELECT attempts FROM job WHERE id = %s"
+
+# Same SQL as Database.get_job_status (api-fastapi)
+JOB_STATUS_SQL = """
+    SELECT
+        job_id::text as job_id,
+        status,
+        attempts,
+        has_result,
+        correlation_id,
+        job_created_at as created_at
+    FROM job_status
+    WHERE job_id = %s
+"""
+
+# Same SQL as Database.get_result_body (api-fastapi)
+RESULT_BODY_SQL = """
+    SELECT outputs_json::text
+    FROM result
+    WHERE id = %s AND job_created_at = %s
+"""
+
+
+@pytest.fixture(scope="module")
+def conn():
+    connection = psycopg2.connect(DATABASE_URL)
+    connection.autocommit = True
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(scope="module")
+def seeded(conn):
+    """Seed jobs (a quarter of them with results) under a throwaway tenant"""
+    tenant_id = uuid.uuid4()
+    jobs = [
+        (
+            uuid.uuid4(),
+            tenant_id,
+            "sitefit",
+            "sitefit",
+            "1.0.0",
+            STATUSES[i % len(STATUSES)],
+            f"plan-test-{tenant_id}-{i % SEED_HASHES}",
+            json.dumps({"seed": i}),
+        )
+        for i in range(SEED_JOBS)
+    ]
+
+    with conn.cursor() as cur:
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO job (id, tenant_id, app_id, definition, version, status, inputs_hash, payload_json)
+            VALUES %s
+        """, jobs, page_size=1000)
+        cur.execute("""
+            INSERT INTO result (job_id, job_created_at, outputs_json, score)
+            SELECT id, created_at, '{"results": []}'::jsonb, 1
+            FROM job
+            WHERE tenant_id = %s AND status = 'succeeded'
+        """, (tenant_id,))
+        cur.execute("""
+            INSERT INTO job_status (job_id, job_created_at, status, has_result, correlation_id)
+            SELECT id, created_at, status, status = 'succeeded', 'plan-test-' || id
+            FROM job
+            WHERE tenant_id = %s
+        """, (tenant_id,))
+        # Index-only scans depend on the visibility map and fresh statistics
+        cur.execute("VACUUM (ANALYZE) job")
+        cur.execute("VACUUM (ANALYZE) result")
+        cur.execute("VACUUM (ANALYZE) job_status")
+
+    yield {"tenant_id": tenant_id, "jobs": jobs}
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM job_status
+            WHERE job_id IN (SELECT id FROM job WHERE tenant_id = %s)
+        """, (tenant_id,))
+        # result rows go with their jobs (ON DELETE CASCADE)
+        cur.execute("DELETE FROM job WHERE tenant_id = %s", (tenant_id,))
+
+
+def explain(conn, query, params):
+    """Plan JSON for a query, with seq/bitmap scans disabled so near-empty partitions can't flip the plan"""
+    with conn.cursor() as cur:
+        cur.execute("BEGIN")
+        cur.execute("SET LOCAL enable_seqscan = off")
+        cur.execute("SET LOCAL enable_bitmapscan = off")
+        cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cur.fetchone()[0][0]["Plan"]
+        cur.execute("ROLLBACK")
+    return plan
+
+
+def scan_nodes(plan):
+    """All nodes in a plan tree that read a relation"""
+    nodes = []
+    if "Relation Name" in plan:
+        nodes.append(plan)
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+
+def test_duplicate_by_hash_is_index_only(conn, seeded):
+    """check_duplicate_by_hash is served by job_inputs_hash_active_idx alone"""
+    inputs_hash = seeded["jobs"][0][6]
+    plan = explain(conn, DUPLICATE_BY_HASH_SQL, (inputs_hash,))
+
+    scans = scan_nodes(plan)
+    assert scans, plan
+    for node in scans:
+        assert node["Node Type"] == "Index Only Scan", node
+        # Partition indexes are named after their parent's columns
+        assert "inputs_hash" in node["Index Name"], node
+
+
+def test_duplicate_by_hash_returns_newest_reusable_job(conn, seeded):
+    """The partial index doesn't change results: newest queued/running/succeeded job wins"""
+    inputs_hash = f"plan-test-{seeded['tenant_id']}-newest"
+    older_id, newer_id, failed_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        # Rows join the seeded tenant, so the fixture teardown removes them
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO job (id, tenant_id, app_id, definition, version, status, inputs_hash, payload_json, created_at)
+            VALUES %s
+        """, [
+            (older_id, seeded["tenant_id"], "sitefit", "sitefit", "1.0.0", "succeeded", inputs_hash, "{}",
+             psycopg2.extensions.AsIs("now() - interval '2 minutes'")),
+            (newer_id, seeded["tenant_id"], "sitefit", "sitefit", "1.0.0", "queued", inputs_hash, "{}",
+             psycopg2.extensions.AsIs("now() - interval '1 minute'")),
+            # Newest of all, but failed jobs are never reused
+            (failed_id, seeded["tenant_id"], "sitefit", "sitefit", "1.0.0", "failed", inputs_hash, "{}",
+             psycopg2.extensions.AsIs("now()")),
+        ])
+        cur.execute(DUPLICATE_BY_HASH_SQL, (inputs_hash,))
+        row = cur.fetchone()
+
+    assert row is not None
+    assert row["job_id"] == str(newer_id)
+    assert row["status"] == "queued"
+
+
+def test_job_attempts_is_index_only(conn, seeded):
+    """get_job_attempts is served by job_id_idx (INCLUDE status, attempts)"""
+    job_id = seeded["jobs"][1][0]
+    plan = explain(conn, JOB_ATTEMPTS_SQL, (job_id,))
+
+    scans = scan_nodes(plan)
+    assert scans, plan
+    for node in scans:
+        assert node["Node Type"] == "Index Only Scan", node
+
+
+def test_job_status_is_index_only(conn, seeded):
+    """get_job_status reads only job_status_pkey (INCLUDE status, attempts, ...)"""
+    job_id = seeded["jobs"][2][0]
+    plan = explain(conn, JOB_STATUS_SQL, (job_id,))
+
+    scans = scan_nodes(plan)
+    assert len(scans) == 1, plan
+    assert scans[0]["Node Type"] == "Index Only Scan", scans[0]
+    assert scans[0]["Index Name"] == "job_status_pkey", scans[0]
+
+
+def test_result_body_reads_one_partition(conn, seeded):
+    """get_result_body is pruned to the job's month: one primary key lookup, not one per partition"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT r.id, r.job_created_at
+            FROM result r JOIN job j ON j.id = r.job_id AND j.created_at = r.job_created_at
+            WHERE j.tenant_id = %s
+            LIMIT 1
+        """, (seeded["tenant_id"],))
+        result_id, job_created_at = cur.fetchone()
+    plan = explain(conn, RESULT_BODY_SQL, (result_id, job_created_at))
+
+    scans = scan_nodes(plan)
+    assert len(scans) == 1, plan
+    assert scans[0]["Node Type"] == "Index Scan", scans[0]
+    assert scans[0]["Relation Name"].startswith("result_p"), scans[0]
+
+
+def test_one_result_per_job(conn, seeded):
+    """A second result row for the same job violates result_job_unique"""
+    job_id = uuid.uuid4()
+    insert_result = """
+        INSERT INTO result (job_id, job_created_at, outputs_json, score)
+        SELECT id, created_at, '{"results": []}'::jsonb, 1
+        FROM job
+        WHERE id = %s
+    """
+
+    with conn.cursor() as cur:
+        # Joins the seeded tenant, so the fixture teardown removes it (and its result)
+        cur.execute("""
+            INSERT INTO job (id, tenant_id, app_id, definition, version, status, inputs_hash, payload_json)
+            VALUES (%s, %s, 'sitefit', 'sitefit', '1.0.0', 'succeeded', %s, '{}')
+        """, (job_id, seeded["tenant_id"], f"plan-test-{job_id}"))
+        cur.execute(insert_result, (job_id,))
+        assert cur.rowcount == 1
+
+        with pytest.raises(psycopg2.errors.UniqueViolation) as exc_info:
+            cur.execute(insert_result, (job_id,))
+
+        cur.execute("SELECT count(*) FROM result WHERE job_id = %s", (job_id,))
+        assert cur.fetchone()[0] == 1
+
+    assert exc_info.value.diag.constraint_name.startswith("result_")
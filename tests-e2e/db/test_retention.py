@@ -0,0 +1,131 @@
+"""
+End-to-end test for partition retention (worker-fastapi/retention.py)
+
+Creates job/result partitions for a month long past any retention window,
+seeds jobs with results, status rows and artifacts, then archives the month:
+1. Both partitions are detached and dropped (result_job_fkey does not block it)
+2. Both exports land in the blob store and contain the month's rows
+3. Rows that referenced the archived jobs are cleaned up
+"""
+
+import gzip
+import importlib
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+# Imported by the worker modules retention.py pulls in
+pytest.importorskip("prometheus_client")
+pytest.importorskip("opentelemetry.sdk")
+import psycopg2.extras
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+WORKER_DIR = Path(__file__).parent.parent.parent / "apps" / "sitefit" / "worker-fastapi"
+MONTH = "2001_01"
+SEED_JOBS = 3
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="DATABASE_URL not set")
+
+psycopg2.extras.register_uuid()
+
+
+@pytest.fixture(scope="module")
+def conn():
+    connection = psycopg2.connect(DATABASE_URL)
+    connection.autocommit = True
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(scope="module")
+def retention(tmp_path_factory):
+    """The worker's retention module, writing archives to a local blob directory"""
+    blob_dir = tmp_path_factory.mktemp("blobs")
+    os.environ["BLOB_LOCAL_DIR"] = str(blob_dir)
+    os.environ.pop("BLOB_ACCOUNT", None)
+    sys.path.insert(0, str(WORKER_DIR))
+    try:
+        module = importlib.import_module("retention")
+    finally:
+        sys.path.remove(str(WORKER_DIR))
+    yield module, blob_dir
+
+
+@pytest.fixture
+def seeded_month(conn):
+    """Partitions for MONTH holding jobs with results, status rows and artifacts"""
+    job_ids = [uuid.uuid4() for _ in range(SEED_JOBS)]
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE job_p{MONTH} PARTITION OF job
+            FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2001-02-01 00:00:00+00')
+        """)
+        cur.execute(f"""
+            CREATE TABLE result_p{MONTH} PARTITION OF result
+            FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2001-02-01 00:00:00+00')
+        """)
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO job (id, app_id, definition, version, status, inputs_hash, payload_json, created_at)
+            VALUES %s
+        """, [
+            (job_id, "sitefit", "sitefit", "1.0.0", "succeeded", f"retention-test-{job_id}",
+             json.dumps({"seed": i}), "2001-01-15 12:00:00+00")
+            for i, job_id in enumerate(job_ids)
+        ])
+        cur.execute("""
+            INSERT INTO result (job_id, job_created_at, outputs_json, score)
+            SELECT id, created_at, '{"results": []}'::jsonb, 1 FROM job WHERE id = ANY(%s)
+        """, (job_ids,))
+        cur.execute("""
+            INSERT INTO job_status (job_id, job_created_at, status, has_result)
+            SELECT id, created_at, status, true FROM job WHERE id = ANY(%s)
+        """, (job_ids,))
+        cur.execute("""
+            INSERT INTO artifact (job_id, kind, url)
+            SELECT id, 'result', 'file:///tmp/' || id FROM job WHERE id = ANY(%s)
+        """, (job_ids,))
+
+    yield job_ids
+
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM artifact WHERE job_id = ANY(%s)", (job_ids,))
+        cur.execute("DELETE FROM job_status WHERE job_id = ANY(%s)", (job_ids,))
+        cur.execute(f"DROP TABLE IF EXISTS result_p{MONTH}")
+        cur.execute(f"DROP TABLE IF EXISTS job_p{MONTH}")
+
+
+def test_archive_month_with_results(conn, retention, seeded_month):
+    """archive_month detaches, exports and drops a month of jobs and their results"""
+    module, blob_dir = retention
+
+    summary = module.archive_month(MONTH)
+
+    assert summary["artifacts_deleted"] == SEED_JOBS
+    with conn.cursor() as cur:
+        for table in (f"job_p{MONTH}", f"result_p{MONTH}"):
+            cur.execute("SELECT to_regclass(%s)", (table,))
+            assert cur.fetchone()[0] is None, table
+        cur.execute("SELECT count(*) FROM job WHERE id = ANY(%s)", (seeded_month,))
+        assert cur.fetchone()[0] == 0
+        cur.execute("SELECT count(*) FROM job_status WHERE job_id = ANY(%s)", (seeded_month,))
+        assert cur.fetchone()[0] == 0
+        cur.execute("SELECT count(*) FROM artifact WHERE job_id = ANY(%s)", (seeded_month,))
+        assert cur.fetchone()[0] == 0
+
+    exports = {export["table"]: export["url"] for export in summary["exports"]}
+    assert set(exports) == {f"job_p{MONTH}", f"result_p{MONTH}"}
+    for table, url in exports.items():
+        path = Path(unquote(urlparse(url).path))
+        assert path.is_relative_to(blob_dir), url
+        with gzip.open(path, "rt") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == SEED_JOBS + 1, table  # header + one row per job
+        for job_id in seeded_month:
+            assert any(str(job_id) in line for line in lines[1:]), (table, job_id)